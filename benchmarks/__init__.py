@@ -0,0 +1,6 @@
+"""
+Microbenchmarks of the control path (see benchmarks/run.py).
+
+They run on a development machine without a camera, Hailo, servos or laser: the hardware and
+GStreamer bindings are replaced by the fakes in benchmarks/fakes.py.
+"""
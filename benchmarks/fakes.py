@@ -0,0 +1,282 @@
+"""
+Fakes for the benchmarks: hailo detections, the PCA9685 and its servos, the laser.
+
+install_import_stubs() must run before the src modules are imported. It only stubs bindings
+that are not installed (on the Pi the real gi and hailo are imported); the hardware and hailo
+objects used on the measured path are always fakes, patched into the module attributes the
+code under test looks up (patch_pan_tilt_hardware, patch_hailo).
+"""
+
+import os
+import sys
+import types
+import random
+import tempfile
+import importlib.util
+
+import yaml
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_STUBBED_MODULES = ('gi', 'hailo', 'board', 'busio', 'adafruit_pca9685', 'adafruit_motor', 'gpiod', 'cv2', 'setproctitle')
+
+
+class _Anything:
+    """Accepts any attribute access or call, for bindings only touched outside the measured path."""
+
+    def __init__(self, name='stub'):
+        self._name = name
+
+    def __getattr__(self, name):
+        return _Anything(f"{self._name}.{name}")
+
+    def __call__(self, *args, **kwargs):
+        return _Anything(f"{self._name}()")
+
+    def __or__(self, other):
+        return self
+
+    def __repr__(self):
+        return f"<{self._name}>"
+
+
+def install_import_stubs(names=_STUBBED_MODULES):
+    """Put stub modules in sys.modules for the bindings (of the given names) that are not installed."""
+    for name in names:
+        if name in sys.modules or importlib.util.find_spec(name) is not None:
+            continue
+        if name == 'gi':
+            gi = types.ModuleType('gi')
+            gi.require_version = lambda *args: None
+            repository = types.ModuleType('gi.repository')
+            for binding in ('Gst', 'GLib', 'GObject', 'GstVideo', 'GstApp'):
+                setattr(repository, binding, _Anything(binding))
+            # Clock constants are used in arithmetic, they need their real values
+            repository.Gst.SECOND = 1_000_000_000
+            repository.Gst.MSECOND = 1_000_000
+            repository.Gst.CLOCK_TIME_NONE = 2 ** 64 - 1
+            gi.repository = repository
+            sys.modules['gi'] = gi
+            sys.modules['gi.repository'] = repository
+        elif name == 'adafruit_motor':
+            package = types.ModuleType('adafruit_motor')
+            package.servo = types.ModuleType('adafruit_motor.servo')
+            package.servo.Servo = FakeServo
+            sys.modules['adafruit_motor'] = package
+            sys.modules['adafruit_motor.servo'] = package.servo
+        else:
+            module = types.ModuleType(name)
+            module.__getattr__ = lambda attribute, name=name: _Anything(f"{name}.{attribute}")
+            sys.modules[name] = module
+
+
+# -----------------------------------------------------------------------------------------------
+# Servos
+# -----------------------------------------------------------------------------------------------
+
+class FakeChannel:
+    def __init__(self):
+        self.duty_cycle = 0
+
+
+class FakePCA9685:
+    def __init__(self, i2c=None, address=0x40):
+        self.channels = [FakeChannel() for _ in range(16)]
+        self.frequency = 50
+        self.mode1_reg = 0
+
+    def deinit(self):
+        pass
+
+
+class FakeServo:
+    def __init__(self, channel, **kwargs):
+        self.channel = channel
+        self.angle = None
+
+
+def patch_pan_tilt_hardware(pan_tilt_module):
+    """Replace the PWM wiring looked up by src.pan_tilt_controller."""
+    pan_tilt_module.busio = types.SimpleNamespace(I2C=lambda scl, sda: None)
+    pan_tilt_module.board = types.SimpleNamespace(SCL=None, SDA=None)
+    pan_tilt_module.PCA9685 = FakePCA9685
+    pan_tilt_module.servo = types.SimpleNamespace(Servo=FakeServo)
+
+
+# -----------------------------------------------------------------------------------------------
+# Laser
+# -----------------------------------------------------------------------------------------------
+
+class FakeLaser:
+    def __init__(self):
+        self.on = False
+        self.switches = 0
+
+    def turn_on(self):
+        if not self.on:
+            self.on = True
+            self.switches += 1
+
+    def turn_off(self, force=False):
+        if self.on:
+            self.on = False
+            self.switches += 1
+
+    def is_on(self):
+        return self.on
+
+    def cleanup(self):
+        self.on = False
+
+
+# -----------------------------------------------------------------------------------------------
+# Hailo
+# -----------------------------------------------------------------------------------------------
+
+HAILO_DETECTION = 'detection'
+HAILO_UNIQUE_ID = 'unique_id'
+
+
+class FakeBBox:
+    __slots__ = ('_xmin', '_ymin', '_xmax', '_ymax')
+
+    def __init__(self, xmin, ymin, xmax, ymax):
+        self._xmin, self._ymin, self._xmax, self._ymax = xmin, ymin, xmax, ymax
+
+    def xmin(self):
+        return self._xmin
+
+    def ymin(self):
+        return self._ymin
+
+    def xmax(self):
+        return self._xmax
+
+    def ymax(self):
+        return self._ymax
+
+    def width(self):
+        return self._xmax - self._xmin
+
+    def height(self):
+        return self._ymax - self._ymin
+
+
+class FakeUniqueID:
+    __slots__ = ('_id',)
+
+    def __init__(self, track_id):
+        self._id = track_id
+
+    def get_id(self):
+        return self._id
+
+
+class FakeDetection:
+    __slots__ = ('label', 'confidence', 'bbox', 'ids')
+
+    def __init__(self, label, confidence, bbox, track_id=None):
+        self.label = label
+        self.confidence = confidence
+        self.bbox = bbox
+        self.ids = [FakeUniqueID(track_id)] if track_id is not None else []
+
+    def get_label(self):
+        return self.label
+
+    def get_confidence(self):
+        return self.confidence
+
+    def get_bbox(self):
+        return self.bbox
+
+    def get_objects_typed(self, object_type):
+        return self.ids if object_type == HAILO_UNIQUE_ID else []
+
+    def add_object(self, unique_id):
+        self.ids = [unique_id] # Replaces instead of appending, so that a frame can be replayed
+
+
+class FakeROI:
+    """Detections of one frame. remove_object() only counts, so the same frame can be replayed."""
+
+    def __init__(self, detections):
+        self.detections = detections
+        self.removed = 0
+
+    def get_objects_typed(self, object_type):
+        return list(self.detections) if object_type == HAILO_DETECTION else []
+
+    def remove_object(self, detection):
+        self.removed += 1
+
+
+class FakeBuffer:
+    def __init__(self, roi):
+        self.roi = roi
+
+
+class FakeProbeInfo:
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def get_buffer(self):
+        return self.buffer
+
+
+def make_frame(persons: int, others: int = 0, seed: int = 0, tracked: bool = True) -> FakeProbeInfo:
+    """
+    A frame with persons spread over the image plus low-confidence and non-person detections.
+    The persons carry a track ID unless tracked is False (for the in-process tracker to assign).
+    """
+    rng = random.Random(seed)
+    detections = []
+    for track_id in range(1, persons + 1):
+        x, y = rng.uniform(0.05, 0.85), rng.uniform(0.05, 0.75)
+        detections.append(FakeDetection('person', rng.uniform(0.8, 0.98), FakeBBox(x, y, x + 0.1, y + 0.2), track_id if tracked else None))
+    for _ in range(others):
+        x, y = rng.uniform(0.05, 0.85), rng.uniform(0.05, 0.75)
+        label = rng.choice(('person', 'dog', 'car'))
+        detections.append(FakeDetection(label, rng.uniform(0.05, 0.3) if label == 'person' else 0.9, FakeBBox(x, y, x + 0.1, y + 0.1)))
+    rng.shuffle(detections)
+    return FakeProbeInfo(FakeBuffer(FakeROI(detections)))
+
+
+def patch_hailo(module):
+    """Replace the hailo module looked up by a src module (e.g. src.object_targeting_app)."""
+    module.hailo = types.SimpleNamespace(
+        HAILO_DETECTION=HAILO_DETECTION,
+        HAILO_UNIQUE_ID=HAILO_UNIQUE_ID,
+        get_roi_from_buffer=lambda buffer: buffer.roi,
+        HailoUniqueID=FakeUniqueID,
+    )
+
+
+# -----------------------------------------------------------------------------------------------
+# Configuration
+# -----------------------------------------------------------------------------------------------
+
+def make_config_file(overrides: dict = None) -> str:
+    """
+    Copy the repository config.yaml into a temporary directory, with resources pointing at empty
+    HEF and post-process files so that it loads without the downloaded resources.
+
+    Returns:
+        str: Path of the temporary configuration file
+    """
+    directory = tempfile.mkdtemp(prefix='bench-config-')
+    with open(os.path.join(REPO_DIR, 'config.yaml')) as f:
+        raw = yaml.safe_load(f)
+
+    model = raw['paths']['model']
+    for name in (model['hef_file'], model['post_process_so']):
+        open(os.path.join(directory, name), 'wb').close()
+    raw['paths']['resources_dir'] = directory
+    raw['paths']['logs_dir'] = os.path.join(directory, 'logs')
+    for section, values in (overrides or {}).items():
+        raw.setdefault(section, {}).update(values)
+
+    path = os.path.join(directory, 'config.yaml')
+    with open(path, 'w') as f:
+        yaml.safe_dump(raw, f)
+    return path
@@ -0,0 +1,394 @@
+"""
+Control Path Microbenchmarks
+
+Times the per-frame control path (angle calculation, update decision, detection filtering and
+target selection in the detection callback) and the start-up helpers (pipeline string builders,
+configuration loading) with fake hailo, servo and laser objects, so it runs on any machine.
+
+Results are saved as a JSON baseline; a later run compares against it and fails (exit status 1)
+when a benchmark is slower than the baseline by more than the tolerance. Baselines only compare
+meaningfully on the same machine, so keep one per machine (e.g. one for the Pi 5, taken on the Pi).
+An error logged while a benchmark runs (e.g. the detection callback catching an exception) fails
+the run, since it would otherwise time the error path:
+
+    $ python -m benchmarks.run --save benchmarks/baselines/pi5.json
+    $ python -m benchmarks.run --compare benchmarks/baselines/pi5.json --tolerance 0.15
+    $ python -m benchmarks.run --filter detection_callback
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import timeit
+import platform
+import argparse
+import statistics
+from typing import Callable, Dict
+
+from . import fakes
+
+fakes.install_import_stubs()
+
+from src import config as config_module  # noqa: E402 (after the import stubs)
+from src import g_streamer_app  # noqa: E402
+from src import object_targeting_app  # noqa: E402
+from src import pan_tilt_controller  # noqa: E402
+from src.engagement_scheduler import EngagementScheduler  # noqa: E402
+from src.track_evidence import TrackEvidence  # noqa: E402
+from src.numpy_tracker import NumpyTracker  # noqa: E402
+from src.hotspot_map import HotspotMap  # noqa: E402
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark. The decorated function does the setup and returns the callable to time."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+# -----------------------------------------------------------------------------------------------
+# Fixtures
+# -----------------------------------------------------------------------------------------------
+
+_config = None
+
+
+def _load_config():
+    global _config
+    if _config is None:
+        _config = config_module.load_config(fakes.make_config_file())
+    return _config
+
+
+def _make_pan_tilt():
+    fakes.patch_pan_tilt_hardware(pan_tilt_controller)
+    return pan_tilt_controller.PanTiltController(_load_config())
+
+
+def _make_hotspots():
+    config = _load_config()
+    return HotspotMap(
+        config.hotspots,
+        (config.servo.pan.min_angle, config.servo.pan.max_angle),
+        (config.servo.tilt.min_angle, config.servo.tilt.max_angle),
+        os.path.join(config.paths.logs_dir, 'hotspot_map.npz'), # Temporary, never saved
+    )
+
+
+def _make_app(scheduler: bool = False, evidence: bool = False, tracker: bool = False, hotspots: bool = False):
+    """An ObjectTargetingApp with only the state the detection callback reads (no pipeline, no GLib)."""
+    fakes.patch_hailo(object_targeting_app)
+    config = _load_config()
+    app = object_targeting_app.ObjectTargetingApp.__new__(object_targeting_app.ObjectTargetingApp)
+    app.config = config
+    app.laser = fakes.FakeLaser()
+    app.pan_tilt = _make_pan_tilt()
+    app.resume_started = None
+    app.suspended = False
+    app.manual_aim = None
+    app.laser_paused = False
+    app.engaged = False
+    app.engaged_since = 0.0
+    app.tracked_id = None
+    app.telemetry = None
+    app.clip_recorder = None
+    app.visual_servo = None
+    app.scheduler = EngagementScheduler(config.scheduler) if scheduler else None
+    app.evidence = TrackEvidence(config.evidence) if evidence else None
+    app.tracker = NumpyTracker(config.tracker) if tracker else None
+    app.hotspots = _make_hotspots() if hotspots else None
+    app.models = None
+    app.last_target_seen = 0.0
+    app.parked_at_hotspot = False
+    app.first_hit_origin = None
+    return app
+
+
+def _points(count: int = 256):
+    """Deterministic normalized target positions, cycled through by the benchmarks."""
+    return [((i * 0.618) % 1.0, (i * 0.382) % 1.0) for i in range(count)]
+
+
+# -----------------------------------------------------------------------------------------------
+# Benchmarks
+# -----------------------------------------------------------------------------------------------
+
+@benchmark('calculate_angles')
+def _calculate_angles():
+    pan_tilt = _make_pan_tilt()
+    points = _points()
+    index = [0]
+
+    def run():
+        index[0] = (index[0] + 1) & 255
+        return pan_tilt.calculate_angles(*points[index[0]])
+    return run
+
+
+@benchmark('should_update')
+def _should_update():
+    pan_tilt = _make_pan_tilt()
+    angles = [pan_tilt.calculate_angles(x, y) for x, y in _points()]
+    index = [0]
+
+    def run():
+        index[0] = (index[0] + 1) & 255
+        return pan_tilt.should_update(*angles[index[0]])
+    return run
+
+
+@benchmark('update_if_needed')
+def _update_if_needed():
+    pan_tilt = _make_pan_tilt()
+    points = _points()
+    index = [0]
+
+    def run():
+        index[0] = (index[0] + 1) & 255
+        return pan_tilt.update_if_needed(*points[index[0]])
+    return run
+
+
+def _detection_callback(persons: int, others: int, scheduler: bool = False, evidence: bool = False, tracker: bool = False,
+                        hotspots: bool = False):
+    app = _make_app(scheduler, evidence, tracker, hotspots)
+    if tracker:
+        frames = [fakes.make_frame(persons, others, 0, tracked=False)] * 16 # Static scene, the tracks persist
+    else:
+        frames = [fakes.make_frame(persons, others, seed) for seed in range(16)]
+    index = [0]
+
+    def run():
+        index[0] = (index[0] + 1) & 15
+        return app._detection_callback(None, frames[index[0]], None)
+    return run
+
+
+@benchmark('detection_callback_empty')
+def _detection_callback_empty():
+    return _detection_callback(0, 4)
+
+
+@benchmark('detection_callback_1_person')
+def _detection_callback_1_person():
+    return _detection_callback(1, 4)
+
+
+@benchmark('detection_callback_10_persons')
+def _detection_callback_10_persons():
+    return _detection_callback(10, 10)
+
+
+@benchmark('detection_callback_10_persons_scheduler')
+def _detection_callback_10_persons_scheduler():
+    return _detection_callback(10, 10, scheduler=True)
+
+
+@benchmark('detection_callback_10_persons_evidence')
+def _detection_callback_10_persons_evidence():
+    return _detection_callback(10, 10, evidence=True)
+
+
+@benchmark('detection_callback_10_persons_numpy_tracker')
+def _detection_callback_10_persons_numpy_tracker():
+    return _detection_callback(10, 10, tracker=True)
+
+
+@benchmark('detection_callback_10_persons_hotspots')
+def _detection_callback_10_persons_hotspots():
+    return _detection_callback(10, 10, hotspots=True)
+
+
+def _numpy_tracker(detections: int):
+    """Targets crossing the frame at constant speed, 30 frames per second of fake time."""
+    import numpy as np
+    rng = np.random.default_rng(detections)
+    start = rng.uniform(0.05, 0.6, (detections, 2))
+    speed = rng.uniform(-0.005, 0.005, (detections, 2))
+    frames = []
+    for i in range(64):
+        corner = start + speed * i
+        frames.append(np.hstack([corner, corner + 0.08]).astype(np.float32))
+    tracker = NumpyTracker(_load_config().tracker)
+    state = {'index': 0, 'now': 0.0}
+
+    def run():
+        state['index'] = (state['index'] + 1) & 63
+        state['now'] += 1 / 30
+        return tracker.update(frames[state['index']], state['now'])
+    return run
+
+
+for _count in (1, 10, 50):
+    benchmark(f'numpy_tracker_update_{_count}_detections')(lambda count=_count: _numpy_tracker(count))
+
+
+@benchmark('track_evidence_update_10_tracks')
+def _track_evidence_update():
+    evidence = TrackEvidence(_load_config().evidence)
+    frames = [{track_id: 0.5 + 0.04 * ((track_id + i) % 10) for track_id in range(i, i + 10)} for i in range(64)]
+    index = [0]
+
+    def run():
+        index[0] = (index[0] + 1) & 63
+        return evidence.update(frames[index[0]])
+    return run
+
+
+@benchmark('hotspot_flush_300_samples')
+def _hotspot_flush():
+    # 10 seconds of engaged frames at 30 fps, around two hotspots
+    hotspots = _make_hotspots()
+    samples = [(-40 + (i % 7), 10 + (i % 5)) if i % 3 else (25 + (i % 4), -5 + (i % 3)) for i in range(300)]
+
+    def run():
+        hotspots.pending.extend(samples)
+        return hotspots.flush()
+    return run
+
+
+@benchmark('source_pipeline')
+def _source_pipeline():
+    return lambda: g_streamer_app.SOURCE_PIPELINE('rpi')
+
+
+@benchmark('inference_pipeline')
+def _inference_pipeline():
+    config = _load_config()
+    return lambda: g_streamer_app.INFERENCE_PIPELINE(
+        hef_path=config.paths.hef_path,
+        post_process_so=config.paths.post_process_path,
+        batch_size=1,
+        additional_params=f"nms-score-threshold={config.detection.nms_score_threshold}",
+    )
+
+
+@benchmark('load_config')
+def _load_config_benchmark():
+    path = fakes.make_config_file()
+    return lambda: config_module.load_config(path)
+
+
+# -----------------------------------------------------------------------------------------------
+# Runner
+# -----------------------------------------------------------------------------------------------
+
+def measure(function: Callable[[], object], repeat: int, min_time: float) -> dict:
+    """
+    Time a callable: the loop count is chosen so that one run takes at least min_time, then the
+    run is repeated. The median is what baselines are compared on, the minimum is reported too.
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_time / 0.2))
+    runs = [seconds / number * 1e9 for seconds in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'median_ns': statistics.median(runs),
+        'min_ns': min(runs),
+        'loops': number,
+        'runs': repeat,
+    }
+
+
+class BenchmarkError(RuntimeError):
+    pass
+
+
+class _RaiseOnError(logging.Handler):
+    """Turns a logged error into an exception, out of the code that caught and logged it."""
+
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.benchmark = None
+
+    def emit(self, record):
+        raise BenchmarkError(f"{self.benchmark}: error logged: {record.getMessage()}")
+
+
+def run_benchmarks(names, repeat: int, min_time: float) -> dict:
+    results = {}
+    handler = _RaiseOnError()
+    logging.getLogger().addHandler(handler)
+    try:
+        for name in names:
+            handler.benchmark = name
+            results[name] = measure(BENCHMARKS[name](), repeat, min_time)
+            print(f"{name:45s} {results[name]['median_ns'] / 1000:10.2f} µs   (min {results[name]['min_ns'] / 1000:.2f} µs)")
+    finally:
+        logging.getLogger().removeHandler(handler)
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'node': platform.node(),
+            'processor': platform.processor(),
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Print the comparison with a baseline, return the names of the benchmarks that regressed."""
+    regressions = []
+    print(f"\nCompared with the baseline of {baseline['meta'].get('timestamp')} on {baseline['meta'].get('node')} (tolerance {tolerance:.0%}):")
+    for name, result in current['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            print(f"{name:45s} {'(not in baseline)':>10s}")
+            continue
+        ratio = result['median_ns'] / reference['median_ns']
+        regressed = ratio > 1.0 + tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"{name:45s} {ratio:9.2f}x  {'SLOWER' if regressed else 'ok'}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Control path microbenchmarks')
+    parser.add_argument('--filter', default='', help='Only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=7, help='Timed runs per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per timed run')
+    parser.add_argument('--save', help='Write the results as a JSON baseline to this path')
+    parser.add_argument('--compare', help='Compare with this JSON baseline, exit with status 1 on a regression')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Allowed slowdown against the baseline (0.15 = 15%%)')
+    parser.add_argument('--list', action='store_true', help='List the benchmarks and exit')
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if args.list:
+        print('\n'.join(names))
+        return
+    if not names:
+        sys.exit(f"No benchmark matches '{args.filter}'")
+
+    try:
+        results = run_benchmarks(names, args.repeat, args.min_time)
+    except BenchmarkError as e:
+        sys.exit(str(e))
+
+    if args.save:
+        directory = os.path.dirname(args.save)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than the baseline: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Asynchronous Logging Module
+
+This module moves log I/O off the GStreamer streaming thread. Records are put on a
+bounded queue by a non-blocking handler and written to disk by a background listener.
+Formatting is deferred to the listener thread, and each call-site is rate-limited so
+a per-frame log statement cannot flood the queue.
+"""
+
+import time
+import queue
+import logging
+import logging.handlers
+import threading
+from typing import Dict, Tuple
+
+from .config import LoggingConfig
+
+
+class CallSiteRateLimiter(logging.Filter):
+    """
+    Token-bucket rate limiter keyed by the call-site (file + line) of each record.
+
+    Every call-site gets `burst` tokens that refill at `per_second` tokens per second.
+    A record arriving at a call-site with no tokens left is suppressed and counted.
+    WARNING and above are never suppressed.
+    """
+
+    def __init__(self, per_second: float = 5.0, burst: int = 10, clock=time.monotonic):
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst
+        self.clock = clock
+        self.suppressed = 0
+        self._buckets: Dict[Tuple[str, int], list] = {}  # call-site -> [tokens, last refill time]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.per_second <= 0:
+            return True
+
+        now = self.clock()
+        key = (record.pathname, record.lineno)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [self.burst - 1, now]
+            return True
+
+        # Refill tokens for the time elapsed since the last record from this call-site
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.per_second)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            self.suppressed += 1
+            return False
+        bucket[0] = tokens - 1
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the caller.
+
+    Unlike the standard QueueHandler, records are enqueued unformatted (message and
+    args are kept separate) so the string formatting happens on the listener thread.
+    If the queue is full the record is dropped and counted instead of blocking.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.enqueued = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Tracebacks reference live frames, render them now while they are still valid
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class _DrainingQueueListener(logging.handlers.QueueListener):
+    """Queue listener whose stop() waits for room for its sentinel instead of failing on a full queue."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # The listener thread is draining, a slot frees up
+
+
+class AsyncLogPipeline:
+    """
+    Root logger setup where records flow: logger -> rate limiter -> bounded queue -> file.
+
+    Args:
+        log_path (str): Path of the log file written by the background listener
+        level (int): Root logger level
+        queue_size (int): Maximum number of records waiting to be written
+        per_second (float): Per call-site refill rate of the rate limiter (0 disables it)
+        burst (int): Per call-site burst size of the rate limiter
+        fmt (str): Format string applied on the listener thread
+    """
+
+    def __init__(
+        self,
+        log_path: str,
+        level: int = logging.INFO,
+        queue_size: int = 1024,
+        per_second: float = 5.0,
+        burst: int = 10,
+        fmt: str = '%(asctime)s - %(levelname)s - %(message)s'
+    ):
+        self._lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=queue_size)
+
+        # Synchronous file handler, only ever called from the listener thread
+        self.file_handler = logging.FileHandler(log_path)
+        self.file_handler.setFormatter(logging.Formatter(fmt))
+
+        self.rate_limiter = CallSiteRateLimiter(per_second=per_second, burst=burst)
+        self.queue_handler = DroppingQueueHandler(self.queue)
+        self.queue_handler.addFilter(self.rate_limiter)
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(self.queue_handler)
+
+        self.listener = _DrainingQueueListener(self.queue, self.file_handler, respect_handler_level=True)
+        self.listener.start()
+        self._running = True
+
+    def stats(self) -> dict:
+        """
+        Get counters of the logging pipeline.
+
+        Returns:
+            dict: enqueued, dropped (queue full), rate_limited and queued (currently waiting) records
+        """
+        return {
+            'enqueued': self.queue_handler.enqueued,
+            'dropped': self.queue_handler.dropped,
+            'rate_limited': self.rate_limiter.suppressed,
+            'queued': self.queue.qsize(),
+        }
+
+    def stop(self):
+        """Flush pending records and stop the listener thread. Safe to call more than once."""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+
+        logging.getLogger().removeHandler(self.queue_handler)
+        self.listener.stop()  # Drains the queue before returning
+
+        # Written straight to the file: the queue it is about may be the one that is full
+        stats = self.stats()
+        if stats['dropped'] or stats['rate_limited']:
+            self.file_handler.handle(logging.getLogger(__name__).makeRecord(
+                __name__, logging.WARNING, __file__, 0,
+                "Async logging dropped %d records (queue full) and rate-limited %d records",
+                (stats['dropped'], stats['rate_limited']), None,
+            ))
+        self.file_handler.close()
+
+
+def setup_async_logging(log_path: str, config: LoggingConfig) -> AsyncLogPipeline:
+    """
+    Create the asynchronous logging pipeline from the logging configuration.
+
+    Args:
+        log_path (str): Path of the log file
+        config (LoggingConfig): The logging section of the configuration
+
+    Returns:
+        AsyncLogPipeline: The running pipeline, call stop() on shutdown
+    """
+    return AsyncLogPipeline(
+        log_path,
+        level=logging.getLevelName(config.level),
+        queue_size=config.queue_size,
+        per_second=config.rate_per_second,
+        burst=config.rate_burst,
+    )
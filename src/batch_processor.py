@@ -0,0 +1,318 @@
+"""
+Offline Batch Processor
+
+Runs detection and tracking over a directory of recorded clips, several clips at a time.
+Each worker process runs its own pipeline ending in a fakesink with sync disabled, so clips
+are processed as fast as the Hailo device allows instead of in real time. Detections and
+tracks of every clip are saved as compressed NumPy archives (or Parquet when pyarrow is
+installed), and an aggregate throughput report is written at the end.
+
+Usage:
+    $ python -m src.batch_processor recordings/ --output batch_output --workers 3
+
+Note: With more than one worker the hailonet elements share the device through the
+HailoRT multi-process service, which must be running (hailort.service).
+"""
+
+import gi
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import logging
+import multiprocessing
+import numpy as np
+
+import hailo
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+from .config import load_config, ConfigurationError, AppConfig
+from .g_streamer_app import (
+    SOURCE_PIPELINE,
+    INFERENCE_PIPELINE,
+    TRACKER_PIPELINE,
+    USER_CALLBACK_PIPELINE,
+)
+
+CLIP_EXTENSIONS = ('.mp4', '.mov', '.h264')  # qtdemux containers, and the raw H.264 clips of the event recorder
+
+# A clip that stalls (bad demux, decoder hang) must not block its worker forever: it gets
+# CLIP_TIMEOUT_MARGIN + CLIP_TIMEOUT_FACTOR x its duration, or DEFAULT_CLIP_TIMEOUT when the
+# duration is unknown (raw H.264 has none), unless --clip-timeout sets a fixed limit
+CLIP_TIMEOUT_MARGIN = 60.0
+CLIP_TIMEOUT_FACTOR = 4.0
+DEFAULT_CLIP_TIMEOUT = 600.0
+PREROLL_TIMEOUT = 10  # Seconds waited for the duration to be known
+
+
+def build_batch_pipeline_string(clip_path: str, config: AppConfig, multi_process: bool) -> str:
+    """
+    Create the pipeline string used to process a single clip.
+
+    Args:
+        clip_path (str): Path of the recorded clip
+        config (AppConfig): Loaded configuration
+        multi_process (bool): Share the Hailo device with other worker processes
+
+    Returns:
+        str: The GStreamer pipeline string
+    """
+    inference_params = (
+        f"nms-score-threshold={config.detection.nms_score_threshold} "
+        f"nms-iou-threshold={config.detection.nms_iou_threshold} "
+        "output-format-type=HAILO_FORMAT_TYPE_FLOAT32"
+    )
+    if multi_process:
+        inference_params += " multi-process-service=true"
+
+    return (
+        f"{SOURCE_PIPELINE(clip_path)} "
+        f"{INFERENCE_PIPELINE(config.paths.hef_path, config.paths.post_process_path, batch_size=1, additional_params=inference_params)} ! "
+        f"{TRACKER_PIPELINE()} ! "
+        f"{USER_CALLBACK_PIPELINE()} ! "
+        "fakesink name=batch_sink sync=false async=false"
+    )
+
+
+class _DetectionCollector:
+    """Pad probe accumulating one row per detection of the processed clip."""
+
+    def __init__(self):
+        self.frames = 0
+        self.frame = []
+        self.pts = []
+        self.label = []
+        self.confidence = []
+        self.bbox = []
+        self.track_id = []
+
+    def __call__(self, pad, info, user_data) -> Gst.PadProbeReturn:
+        buffer = info.get_buffer()
+        if not buffer:
+            return Gst.PadProbeReturn.OK
+
+        rois = hailo.get_roi_from_buffer(buffer)
+        for det in rois.get_objects_typed(hailo.HAILO_DETECTION):
+            bbox = det.get_bbox()
+            tracking_ids = det.get_objects_typed(hailo.HAILO_UNIQUE_ID)
+            self.frame.append(self.frames)
+            self.pts.append(buffer.pts)
+            self.label.append(det.get_label())
+            self.confidence.append(det.get_confidence())
+            self.bbox.append((bbox.xmin(), bbox.ymin(), bbox.xmax(), bbox.ymax()))
+            self.track_id.append(tracking_ids[0].get_id() if tracking_ids else -1)
+        self.frames += 1
+        return Gst.PadProbeReturn.OK
+
+    def to_arrays(self) -> dict:
+        return {
+            'frame': np.asarray(self.frame, dtype=np.int32),
+            'pts': np.asarray(self.pts, dtype=np.uint64),
+            'label': np.asarray(self.label, dtype=np.str_),
+            'confidence': np.asarray(self.confidence, dtype=np.float32),
+            'bbox': np.asarray(self.bbox, dtype=np.float32).reshape(-1, 4),
+            'track_id': np.asarray(self.track_id, dtype=np.int64),
+        }
+
+
+def _save_detections(arrays: dict, output_base: str, output_format: str) -> str:
+    """Write the detection arrays of one clip, returns the written path."""
+    if output_format == 'parquet':
+        bbox = arrays['bbox']
+        table = pyarrow.table({
+            'frame': arrays['frame'],
+            'pts': arrays['pts'],
+            'label': arrays['label'],
+            'confidence': arrays['confidence'],
+            'xmin': bbox[:, 0], 'ymin': bbox[:, 1], 'xmax': bbox[:, 2], 'ymax': bbox[:, 3],
+            'track_id': arrays['track_id'],
+        })
+        path = f'{output_base}.parquet'
+        pq.write_table(table, path, compression='zstd')
+    else:
+        path = f'{output_base}.npz'
+        np.savez_compressed(path, **arrays)
+    return path
+
+
+def output_base_for(clip_path: str, input_dir: str, output_dir: str) -> str:
+    """Output path (without extension) of a clip, mirroring its path relative to the input directory."""
+    relative = os.path.relpath(clip_path, input_dir)
+    return os.path.join(output_dir, os.path.splitext(relative)[0])
+
+
+def clip_timeout_from_duration(duration_seconds) -> float:
+    """Seconds a clip of the given duration (None if unknown) may take before it is considered stalled."""
+    if duration_seconds is None or duration_seconds <= 0:
+        return DEFAULT_CLIP_TIMEOUT
+    return CLIP_TIMEOUT_MARGIN + CLIP_TIMEOUT_FACTOR * duration_seconds
+
+
+def _clip_duration(pipeline) -> float:
+    """Duration of the clip in seconds once the pipeline prerolled, None if unknown."""
+    pipeline.get_state(PREROLL_TIMEOUT * Gst.SECOND)
+    ok, duration = pipeline.query_duration(Gst.Format.TIME)
+    return duration / Gst.SECOND if ok and duration > 0 else None
+
+
+def process_clip(clip_path: str, config: AppConfig, output_base: str, output_format: str, multi_process: bool,
+                 clip_timeout: float = 0.0) -> dict:
+    """
+    Run the detection pipeline over a single clip until end-of-stream. Runs in a worker process.
+
+    Args:
+        output_base (str): Path of the detections file without its extension (see output_base_for)
+        clip_timeout (float): Seconds before the clip is abandoned as stalled, 0 to derive it from its duration
+
+    Returns:
+        dict: Per-clip statistics (clip, frames, detections, seconds, fps, output, error)
+    """
+    Gst.init(None)
+    stats = {'clip': clip_path, 'frames': 0, 'detections': 0, 'seconds': 0.0, 'fps': 0.0, 'output': None, 'error': None}
+
+    collector = _DetectionCollector()
+    try:
+        pipeline = Gst.parse_launch(build_batch_pipeline_string(clip_path, config, multi_process))
+        identity = pipeline.get_by_name('identity_callback')
+        if identity is None:
+            raise RuntimeError("identity_callback element not found in the pipeline")
+        identity.get_static_pad('src').add_probe(Gst.PadProbeType.BUFFER, collector, None)
+    except Exception as e:
+        # e.g. a GLib.Error for a missing GStreamer element: reported with the clip, the batch goes on
+        stats['error'] = f"Failed to create pipeline: {e}"
+        return stats
+
+    start = time.monotonic()
+    pipeline.set_state(Gst.State.PLAYING)
+    timeout = clip_timeout or clip_timeout_from_duration(_clip_duration(pipeline))
+    remaining = max(0.0, timeout - (time.monotonic() - start))
+    message = pipeline.get_bus().timed_pop_filtered(int(remaining * Gst.SECOND), Gst.MessageType.EOS | Gst.MessageType.ERROR)
+    stats['seconds'] = time.monotonic() - start
+    pipeline.set_state(Gst.State.NULL)
+
+    if message is None:
+        stats['error'] = f"Timed out after {timeout:.0f}s, the clip stalled"
+    elif message.type == Gst.MessageType.ERROR:
+        err, debug = message.parse_error()
+        stats['error'] = f"{err}, {debug}"
+
+    arrays = collector.to_arrays()
+    stats['frames'] = collector.frames
+    stats['detections'] = len(arrays['frame'])
+    stats['fps'] = collector.frames / stats['seconds'] if stats['seconds'] > 0 else 0.0
+
+    try:
+        os.makedirs(os.path.dirname(output_base), exist_ok=True)
+        stats['output'] = _save_detections(arrays, output_base, output_format)
+    except OSError as e:
+        stats['error'] = f"Failed to save detections: {e}"
+    return stats
+
+
+def _process_clip_star(args):
+    return process_clip(*args)
+
+
+def build_report(results: list, clips: int, workers: int, wall_seconds: float) -> dict:
+    """Aggregate the per-clip statistics of a batch (sorted by clip) into its report."""
+    total_frames = sum(stats['frames'] for stats in results)
+    return {
+        'clips': clips,
+        'failed': sum(1 for stats in results if stats['error']),
+        'workers': workers,
+        'frames': total_frames,
+        'detections': sum(stats['detections'] for stats in results),
+        'wall_seconds': wall_seconds,
+        'aggregate_fps': total_frames / wall_seconds if wall_seconds > 0 else 0.0,
+        'results': sorted(results, key=lambda stats: stats['clip']),
+    }
+
+
+def write_report(report: dict, output_dir: str) -> str:
+    """Write the report as report.json in the output directory, returns its path."""
+    path = os.path.join(output_dir, 'report.json')
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def run_batch(input_dir: str, config: AppConfig, output_dir: str, workers: int, output_format: str = 'npz',
+              clip_timeout: float = 0.0) -> dict:
+    """
+    Process all clips of a directory with a pool of worker processes.
+
+    Returns:
+        dict: Aggregate report with per-clip statistics
+    """
+    clips = sorted(
+        path for path in glob.glob(os.path.join(input_dir, '**', '*'), recursive=True)
+        if path.lower().endswith(CLIP_EXTENSIONS)
+    )
+    os.makedirs(output_dir, exist_ok=True)
+    if not clips:
+        logging.warning(f"No clips ({', '.join(CLIP_EXTENSIONS)}) found in {input_dir}")
+
+    multi_process = workers > 1
+    tasks = [
+        (clip, config, output_base_for(clip, input_dir, output_dir), output_format, multi_process, clip_timeout)
+        for clip in clips
+    ]
+
+    start = time.monotonic()
+    results = []
+    # Spawned (not forked) workers, each with a fresh GStreamer and HailoRT state
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes=workers, maxtasksperchild=1) as pool:
+        for stats in pool.imap_unordered(_process_clip_star, tasks):
+            results.append(stats)
+            status = f"error: {stats['error']}" if stats['error'] else f"{stats['fps']:.1f} fps"
+            print(f"[{len(results)}/{len(clips)}] {stats['clip']}: {stats['frames']} frames, {stats['detections']} detections, {status}")
+    wall_seconds = time.monotonic() - start
+
+    report = build_report(results, len(clips), workers, wall_seconds)
+    write_report(report, output_dir)
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='AI Bird Deterrent offline batch processor')
+    parser.add_argument('input_dir', type=str, help='Directory of recorded clips (searched recursively)')
+    parser.add_argument('--config', type=str, default='config.yaml', help='Path to configuration file (default: config.yaml)')
+    parser.add_argument('--output', type=str, default='batch_output', help='Output directory (default: batch_output)')
+    parser.add_argument('--workers', type=int, default=max(1, min(4, os.cpu_count() or 1) - 1), help='Number of worker processes')
+    parser.add_argument('--format', choices=['npz', 'parquet'], default='npz', help='Detections file format (parquet requires pyarrow)')
+    parser.add_argument('--clip-timeout', type=float, default=0.0,
+                        help='Seconds before a stalled clip is abandoned (default: derived from the clip duration)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        config = load_config(args.config)
+    except ConfigurationError as e:
+        print(f"Configuration error: {e}")
+        sys.exit(1)
+    if args.format == 'parquet' and pq is None:
+        print("Parquet output requires pyarrow, install it or use --format npz")
+        sys.exit(1)
+
+    report = run_batch(args.input_dir, config, args.output, args.workers, args.format, args.clip_timeout)
+    print(
+        f"Processed {report['clips']} clips ({report['failed']} failed) with {report['workers']} workers: "
+        f"{report['frames']} frames in {report['wall_seconds']:.1f}s = {report['aggregate_fps']:.1f} fps aggregate"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,60 +2,907 @@
 Configuration Module
 
 This module handles loading and validating the application configuration from YAML.
+
+The YAML is validated once at startup and turned into immutable, typed configuration objects
+(frozen dataclasses with __slots__). Derived constants used on every frame, such as the
+FOV x scaling factor of each servo axis, are precomputed here so the hot path only reads
+plain attributes. Any invalid value is reported with its full key path (e.g. 'servo.pan.threshold').
 """
 
 import os
+import re
 import yaml
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
 
 class ConfigurationError(Exception):
     """Raised when there's an error in the configuration."""
     pass
 
-def load_config(config_path: str = "config.yaml") -> Dict[str, Any]:
+_MISSING = object()
+
+
+class _Section:
+    """
+    Typed accessor over one mapping of the raw YAML, which knows its own key path for error messages.
+    """
+
+    def __init__(self, raw: Optional[Dict[str, Any]], path: str = ''):
+        if raw is None:
+            raw = {}
+        if not isinstance(raw, dict):
+            raise ConfigurationError(f"{path or 'configuration'}: expected a mapping, got {type(raw).__name__}")
+        self.raw = raw
+        self.path = path
+
+    def _key_path(self, key: str) -> str:
+        return f"{self.path}.{key}" if self.path else key
+
+    def _get(self, key: str, default):
+        if key in self.raw and self.raw[key] is not None:
+            return self.raw[key]
+        if default is _MISSING:
+            raise ConfigurationError(f"{self._key_path(key)}: missing required setting")
+        return default
+
+    def section(self, key: str, required: bool = False) -> '_Section':
+        if required and key not in self.raw:
+            raise ConfigurationError(f"{self._key_path(key)}: missing required section")
+        return _Section(self.raw.get(key), self._key_path(key))
+
+    def number(self, key: str, default=_MISSING, min_value: float = None, max_value: float = None) -> float:
+        value = self._get(key, default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ConfigurationError(f"{self._key_path(key)}: expected a number, got {value!r}")
+        if min_value is not None and value < min_value:
+            raise ConfigurationError(f"{self._key_path(key)}: {value} is below the minimum of {min_value}")
+        if max_value is not None and value > max_value:
+            raise ConfigurationError(f"{self._key_path(key)}: {value} is above the maximum of {max_value}")
+        return float(value)
+
+    def integer(self, key: str, default=_MISSING, min_value: int = None, max_value: int = None) -> int:
+        value = self._get(key, default)
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ConfigurationError(f"{self._key_path(key)}: expected an integer, got {value!r}")
+        if min_value is not None and value < min_value:
+            raise ConfigurationError(f"{self._key_path(key)}: {value} is below the minimum of {min_value}")
+        if max_value is not None and value > max_value:
+            raise ConfigurationError(f"{self._key_path(key)}: {value} is above the maximum of {max_value}")
+        return value
+
+    def string(self, key: str, default=_MISSING, choices: tuple = None) -> str:
+        value = self._get(key, default)
+        if not isinstance(value, str):
+            raise ConfigurationError(f"{self._key_path(key)}: expected a string, got {value!r}")
+        if choices is not None and value not in choices:
+            raise ConfigurationError(f"{self._key_path(key)}: {value!r} is not one of {', '.join(choices)}")
+        return value
+
+    def keys(self) -> list:
+        return list(self.raw.keys())
+
+    def boolean(self, key: str, default=_MISSING) -> bool:
+        value = self._get(key, default)
+        if not isinstance(value, bool):
+            raise ConfigurationError(f"{self._key_path(key)}: expected true or false, got {value!r}")
+        return value
+
+
+# -----------------------------------------------------------------------------------------------
+# Configuration objects
+# -----------------------------------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class PathsConfig:
+    resources_dir: str
+    logs_dir: str
+    hef_path: str
+    post_process_path: str
+
+
+@dataclass(frozen=True, slots=True)
+class CameraConfig:
+    width: int
+    height: int
+    format: str
+
+
+@dataclass(frozen=True, slots=True)
+class SourceConfig:
+    type: str  # 'rpi' (camera), or 'synthetic' / 'raw' (appsrc, see src/synthetic_source.py)
+    width: int
+    height: int
+    fps: int
+    seed: int
+    blobs: int  # synthetic: number of moving bird-like blobs
+    blob_size: int  # synthetic: mean blob width in pixels
+    raw_path: str  # raw: file of concatenated RGB frames
+    max_frames: int  # End of stream after this many frames (0: endless)
+    dual_stream: bool  # rpi / videotest: separate inference and full-resolution streams
+    inference_width: int
+    inference_height: int
+    full_format: str
+    full_width: int
+    full_height: int
+
+
+@dataclass(frozen=True, slots=True)
+class DetectionConfig:
+    nms_score_threshold: float
+    nms_iou_threshold: float
+    max_frames_missing: int
+
+
+@dataclass(frozen=True, slots=True)
+class AxisConfig:
+    channel: int
+    center: float
+    min_angle: float
+    max_angle: float
+    threshold: float  # Minimum angle change to trigger movement
+    scaling_factor: float
+    power_factor: float
+    angle_scale: float  # Derived: field of view x scaling factor, degrees per unit of deviation
+
+
+@dataclass(frozen=True, slots=True)
+class ServoConfig:
+    pan: AxisConfig
+    tilt: AxisConfig
+    i2c_address: int
+
+
+@dataclass(frozen=True, slots=True)
+class StrobePattern:
+    name: str
+    duty: float  # Fraction of each PWM period the laser is on
+    duty_cycle: int  # Derived: 16-bit PCA9685 duty cycle register value
+
+
+@dataclass(frozen=True, slots=True)
+class LaserConfig:
+    gpio_chip: str
+    pin: int
+    min_on_seconds: float
+    min_off_seconds: float
+    max_on_seconds: float  # Continuous-on safety timeout, 0 disables it
+    lockout_seconds: float
+    mode: str  # 'gpio' (on/off line) or 'pwm' (spare PCA9685 channel running strobe patterns)
+    pwm_channel: int
+    pattern: str  # Strobe pattern used when the laser turns on in pwm mode
+    patterns: Tuple[StrobePattern, ...]
+
+    def get_pattern(self, name: str) -> StrobePattern:
+        for pattern in self.patterns:
+            if pattern.name == name:
+                return pattern
+        raise KeyError(name)
+
+
+@dataclass(frozen=True, slots=True)
+class FovConfig:
+    horizontal: float
+    vertical: float
+
+
+@dataclass(frozen=True, slots=True)
+class LoggingConfig:
+    level: str
+    use_async: bool  # 'async' in YAML
+    queue_size: int
+    rate_per_second: float
+    rate_burst: int
+
+
+@dataclass(frozen=True, slots=True)
+class RecordingConfig:
+    enabled: bool
+    output_dir: str
+    pre_roll_seconds: float
+    post_roll_seconds: float
+    max_buffer_mb: float
+    width: int
+    height: int
+    bitrate_kbps: int
+
+
+@dataclass(frozen=True, slots=True)
+class PreviewConfig:
+    enabled: bool
+    host: str
+    port: int
+    width: int
+    height: int
+    max_fps: int
+    jpeg_quality: int
+
+
+@dataclass(frozen=True, slots=True)
+class PipelineConfig:
+    dynamic_branches: bool  # Recorder and preview attached to the running pipeline instead of built into it
+
+
+@dataclass(frozen=True, slots=True)
+class MemoryConfig:
+    enabled: bool
+    budget_mb: float
+    mode: str
+    report_interval_seconds: int
+
+
+@dataclass(frozen=True, slots=True)
+class VisualServoConfig:
+    enabled: bool
+    downsample: int
+    roi_size: float
+    min_brightness: int
+    kp: float
+    ki: float
+    kd: float
+    max_correction_degrees: float
+    tolerance: float
+    budget_ms: float
+
+
+@dataclass(frozen=True, slots=True)
+class ThermalConfig:
+    enabled: bool
+    temperature_path: str  # sysfs thermal zone, millidegrees Celsius
+    stat_path: str  # procfs CPU statistics
+    poll_interval_seconds: float
+    step_up_celsius: float  # Degrade one step at or above this temperature
+    hysteresis_celsius: float  # Revert one step only below step_up_celsius - hysteresis_celsius
+    high_load: float
+    low_load: float
+    min_dwell_seconds: float
+    reduced_inference_fps: int
+    convert_threads: int
+
+
+@dataclass(frozen=True, slots=True)
+class TimeOfDay:
+    anchor: str  # 'clock' (offset from local midnight), 'sunrise' or 'sunset'
+    offset_minutes: float
+
+
+@dataclass(frozen=True, slots=True)
+class OperatingWindow:
+    start: TimeOfDay
+    end: TimeOfDay
+
+
+@dataclass(frozen=True, slots=True)
+class OperatingWindowsConfig:
+    enabled: bool
+    latitude: float
+    longitude: float
+    check_interval_seconds: float
+    windows: Tuple[OperatingWindow, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class TelemetryConfig:
+    enabled: bool
+    unit_id: str  # Empty: the hostname
+    aggregator_host: str
+    aggregator_port: int
+    flush_interval_seconds: float
+    health_interval_seconds: float
+    max_batch_events: int
+    ack_timeout_seconds: float
+    queue_size: int
+    spool_max_mb: float
+
+
+@dataclass(frozen=True, slots=True)
+class ControlConfig:
+    enabled: bool
+    socket_path: str
+    max_clients: int
+    max_request_bytes: int
+
+
+@dataclass(frozen=True, slots=True)
+class ProfilerConfig:
+    enabled: bool  # Allow profiling on SIGUSR1 / control request (nothing runs until triggered)
+    default_seconds: float
+    max_seconds: float
+    interval_ms: float
+
+
+@dataclass(frozen=True, slots=True)
+class ControlPlaneConfig:
+    enabled: bool  # Run the servos and the laser in a dedicated process
+    control_rate_hz: float
+    watchdog_seconds: float  # Laser forced off when no command arrives for this long
+    startup_timeout_seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class SchedulerConfig:
+    enabled: bool
+    dwell_seconds: float
+    cooldown_seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class TrackerConfig:
+    backend: str  # 'hailo' (hailotracker element) or 'numpy' (in-process NumpyTracker)
+    iou_threshold: float  # Minimum IoU with the predicted box for an overlap match
+    max_center_distance: float  # Centroid distance (normalized) still matched without overlap
+    confirm_seconds: float  # Matched this long before a new track gets an ID
+    keep_lost_seconds: float  # A confirmed track coasts this long without detections
+    velocity_smoothing: float  # Weight of the newest velocity measurement
+    max_tracks: int
+
+
+@dataclass(frozen=True, slots=True)
+class ModelsConfig:
+    enabled: bool
+    hef_paths: Tuple[Tuple[str, str], ...]  # (name, absolute HEF path), all loaded at startup
+    idle_model: str  # Used while no target is in view
+    engaged_model: str  # Used while targets are in view
+    frame_budget_ms: float  # The idle model is used while the engaged one runs slower than this (0: off)
+    budget_backoff_seconds: float  # After going over budget, the engaged model is retried this much later
+    min_dwell_seconds: float  # Minimum time between two switches
+    poll_interval_seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class EvidenceConfig:
+    enabled: bool
+    window_frames: int  # Samples fused per track
+    min_frames: int  # Samples needed before a track can be engaged
+    engage_threshold: float  # Fused score needed to engage
+    release_threshold: float  # Engaged tracks are released below this fused score
+    max_tracks: int  # Rows of the evidence array, the least recently seen track is evicted beyond
+
+
+@dataclass(frozen=True, slots=True)
+class HotspotConfig:
+    enabled: bool
+    park: bool  # Park at the hotspot when idle; off, the map is only learned (a time-to-first-hit baseline)
+    resolution_degrees: float
+    smoothing_degrees: float  # Radius of the neighbourhood a hotspot is summed over
+    half_life_hours: float
+    min_weight: float  # Decayed samples a hotspot needs before the turret parks there
+    idle_seconds: float  # Without targets this long, the turret parks
+    flush_interval_seconds: float
+    save_interval_seconds: float
+    max_pending: int  # Samples queued between flushes, the oldest are dropped beyond
+
+
+@dataclass(frozen=True, slots=True)
+class ExclusionZone:
+    name: str
+    polygon: Tuple[Tuple[float, float], ...]  # (pan, tilt) vertices in degrees relative to the servo centers
+
+
+@dataclass(frozen=True, slots=True)
+class ExclusionConfig:
+    enabled: bool
+    resolution_degrees: float
+    margin_degrees: float
+    servo_seconds_per_degree: float  # Used to estimate how long the laser stays blanked while traversing
+    zones: Tuple[ExclusionZone, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class AppConfig:
+    paths: PathsConfig
+    camera: CameraConfig
+    source: SourceConfig
+    detection: DetectionConfig
+    servo: ServoConfig
+    laser: LaserConfig
+    fov: FovConfig
+    logging: LoggingConfig
+    recording: RecordingConfig
+    preview: PreviewConfig
+    pipeline: PipelineConfig
+    memory: MemoryConfig
+    visual_servo: VisualServoConfig
+    exclusion: ExclusionConfig
+    scheduler: SchedulerConfig
+    control_plane: ControlPlaneConfig
+    profiler: ProfilerConfig
+    control: ControlConfig
+    telemetry: TelemetryConfig
+    operating_windows: OperatingWindowsConfig
+    thermal: ThermalConfig
+    evidence: EvidenceConfig
+    tracker: TrackerConfig
+    hotspots: HotspotConfig
+    models: ModelsConfig
+
+
+# -----------------------------------------------------------------------------------------------
+# Section builders
+# -----------------------------------------------------------------------------------------------
+
+def _build_paths(section: _Section, base_dir: str) -> PathsConfig:
+    resources_dir = section.string('resources_dir', default='')
+    if not resources_dir:
+        raise ConfigurationError("resources_dir not specified in configuration")
+
+    # Make paths absolute if they're relative
+    if not os.path.isabs(resources_dir):
+        resources_dir = os.path.join(base_dir, resources_dir)
+
+    # Validate required model files exist
+    model = section.section('model')
+    hef_path = os.path.join(resources_dir, model.string('hef_file', default=''))
+    post_process_path = os.path.join(resources_dir, model.string('post_process_so', default=''))
+
+    if not os.path.exists(hef_path):
+        raise ConfigurationError(f"HEF file not found: {hef_path}")
+    if not os.path.exists(post_process_path):
+        raise ConfigurationError(f"Post-process SO file not found: {post_process_path}")
+
+    return PathsConfig(
+        resources_dir=resources_dir,
+        logs_dir=section.string('logs_dir', default='logs'),
+        hef_path=hef_path,
+        post_process_path=post_process_path,
+    )
+
+
+def _build_axis(section: _Section, fov: float, default_power: float) -> AxisConfig:
+    min_angle = section.number('min_angle', min_value=-180, max_value=180)
+    max_angle = section.number('max_angle', min_value=-180, max_value=180)
+    if min_angle >= max_angle:
+        raise ConfigurationError(f"{section.path}: min_angle ({min_angle}) must be below max_angle ({max_angle})")
+
+    scaling_factor = section.number('scaling_factor', default=0.9, min_value=0)
+    return AxisConfig(
+        channel=section.integer('channel', min_value=0, max_value=15),
+        center=section.number('center', min_value=0, max_value=180),
+        min_angle=min_angle,
+        max_angle=max_angle,
+        threshold=section.number('threshold', min_value=0),
+        scaling_factor=scaling_factor,
+        power_factor=section.number('power_factor', default=default_power, min_value=0.1),
+        angle_scale=fov * scaling_factor,
+    )
+
+
+def _build_servo(section: _Section, fov: FovConfig) -> ServoConfig:
+    pan = _build_axis(section.section('pan', required=True), fov.horizontal, default_power=1.5)
+    tilt = _build_axis(section.section('tilt', required=True), fov.vertical, default_power=1.3)
+    if pan.channel == tilt.channel:
+        raise ConfigurationError(f"{section.path}: pan and tilt cannot share PCA9685 channel {pan.channel}")
+    return ServoConfig(
+        pan=pan,
+        tilt=tilt,
+        i2c_address=section.integer('i2c_address', min_value=0x03, max_value=0x77),
+    )
+
+
+def _build_laser(section: _Section, servo: ServoConfig) -> LaserConfig:
+    mode = section.string('mode', default='gpio', choices=('gpio', 'pwm'))
+
+    pwm = section.section('pwm')
+    pwm_channel = pwm.integer('channel', default=15, min_value=0, max_value=15)
+    if mode == 'pwm' and pwm_channel in (servo.pan.channel, servo.tilt.channel):
+        raise ConfigurationError(f"{pwm.path}.channel: channel {pwm_channel} is already used by a servo")
+
+    patterns_section = pwm.section('patterns')
+    patterns = [StrobePattern(name='steady', duty=1.0, duty_cycle=0xFFFF)]
+    for name in patterns_section.keys():
+        duty = patterns_section.number(name, min_value=0, max_value=1)
+        patterns = [pattern for pattern in patterns if pattern.name != name]
+        patterns.append(StrobePattern(name=name, duty=duty, duty_cycle=round(duty * 0xFFFF)))
+    pattern = pwm.string('pattern', default='steady', choices=tuple(pattern.name for pattern in patterns))
+
+    return LaserConfig(
+        gpio_chip=section.string('gpio_chip'),
+        pin=section.integer('pin', min_value=0),
+        min_on_seconds=section.number('min_on_seconds', default=0.0, min_value=0),
+        min_off_seconds=section.number('min_off_seconds', default=0.0, min_value=0),
+        max_on_seconds=section.number('max_on_seconds', default=0.0, min_value=0),
+        lockout_seconds=section.number('lockout_seconds', default=5.0, min_value=0),
+        mode=mode,
+        pwm_channel=pwm_channel,
+        pattern=pattern,
+        patterns=tuple(patterns),
+    )
+
+
+def _build_logging(section: _Section) -> LoggingConfig:
+    rate_limit = section.section('rate_limit')
+    return LoggingConfig(
+        level=section.string('level', default='INFO', choices=('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')),
+        use_async=section.boolean('async', default=False),
+        queue_size=section.integer('queue_size', default=1024, min_value=1),
+        rate_per_second=rate_limit.number('per_second', default=5.0, min_value=0),
+        rate_burst=rate_limit.integer('burst', default=10, min_value=1),
+    )
+
+
+def _build_recording(section: _Section) -> RecordingConfig:
+    return RecordingConfig(
+        enabled=section.boolean('enabled', default=False),
+        output_dir=section.string('output_dir', default='clips'),
+        pre_roll_seconds=section.number('pre_roll_seconds', default=3.0, min_value=0),
+        post_roll_seconds=section.number('post_roll_seconds', default=5.0, min_value=0),
+        max_buffer_mb=section.number('max_buffer_mb', default=16, min_value=1),
+        width=section.integer('width', default=1280, min_value=16),
+        height=section.integer('height', default=720, min_value=16),
+        bitrate_kbps=section.integer('bitrate_kbps', default=4000, min_value=100),
+    )
+
+
+def _build_preview(section: _Section) -> PreviewConfig:
+    return PreviewConfig(
+        enabled=section.boolean('enabled', default=False),
+        host=section.string('host', default='127.0.0.1'),
+        port=section.integer('port', default=8080, min_value=1, max_value=65535),
+        width=section.integer('width', default=640, min_value=16),
+        height=section.integer('height', default=360, min_value=16),
+        max_fps=section.integer('max_fps', default=10, min_value=1),
+        jpeg_quality=section.integer('jpeg_quality', default=70, min_value=0, max_value=100),
+    )
+
+
+def _build_pipeline(section: _Section) -> PipelineConfig:
+    return PipelineConfig(
+        dynamic_branches=section.boolean('dynamic_branches', default=False),
+    )
+
+
+def _build_memory(section: _Section) -> MemoryConfig:
+    return MemoryConfig(
+        enabled=section.boolean('enabled', default=False),
+        budget_mb=section.number('budget_mb', default=256, min_value=1),
+        mode=section.string('mode', default='warn', choices=('warn', 'auto')),
+        report_interval_seconds=section.integer('report_interval_seconds', default=60, min_value=0),
+    )
+
+
+def _build_visual_servo(section: _Section) -> VisualServoConfig:
+    return VisualServoConfig(
+        enabled=section.boolean('enabled', default=False),
+        downsample=section.integer('downsample', default=2, min_value=1),
+        roi_size=section.number('roi_size', default=0.2, min_value=0.01, max_value=1),
+        min_brightness=section.integer('min_brightness', default=60, min_value=1, max_value=255),
+        kp=section.number('kp', default=0.5, min_value=0),
+        ki=section.number('ki', default=1.0, min_value=0),
+        kd=section.number('kd', default=0.0, min_value=0),
+        max_correction_degrees=section.number('max_correction_degrees', default=10.0, min_value=0),
+        tolerance=section.number('tolerance', default=0.02, min_value=0, max_value=1),
+        budget_ms=section.number('budget_ms', default=3.0, min_value=0),
+    )
+
+
+def _build_thermal(section: _Section) -> ThermalConfig:
+    high_load = section.number('high_load', default=0.95, min_value=0, max_value=1)
+    low_load = section.number('low_load', default=0.8, min_value=0, max_value=1)
+    if low_load > high_load:
+        raise ConfigurationError(f"{section.path}.low_load must not exceed high_load")
+    return ThermalConfig(
+        enabled=section.boolean('enabled', default=False),
+        temperature_path=section.string('temperature_path', default='/sys/class/thermal/thermal_zone0/temp'),
+        stat_path=section.string('stat_path', default='/proc/stat'),
+        poll_interval_seconds=section.number('poll_interval_seconds', default=5.0, min_value=0.5),
+        step_up_celsius=section.number('step_up_celsius', default=75.0),
+        hysteresis_celsius=section.number('hysteresis_celsius', default=8.0, min_value=0),
+        high_load=high_load,
+        low_load=low_load,
+        min_dwell_seconds=section.number('min_dwell_seconds', default=30.0, min_value=0),
+        reduced_inference_fps=section.integer('reduced_inference_fps', default=10, min_value=1),
+        convert_threads=section.integer('convert_threads', default=1, min_value=1),
+    )
+
+
+_CLOCK_TIME = re.compile(r'^(\d{1,2}):(\d{2})$')
+_SUN_TIME = re.compile(r'^(sunrise|sunset)\s*(?:([+-])\s*(\d+(?:\.\d+)?))?$')
+
+
+def _parse_time_of_day(value, path: str) -> TimeOfDay:
+    """Parse "HH:MM", "sunrise", "sunset", "sunrise-30" or "sunset+45" (offsets in minutes)."""
+    text = str(value).strip().lower()
+    clock = _CLOCK_TIME.match(text)
+    if clock:
+        hour, minute = int(clock.group(1)), int(clock.group(2))
+        if (hour < 24 and minute < 60) or (hour, minute) == (24, 0): # "24:00" is the end of the day
+            return TimeOfDay(anchor='clock', offset_minutes=hour * 60 + minute)
+    sun = _SUN_TIME.match(text)
+    if sun:
+        offset = float(sun.group(3) or 0) * (-1 if sun.group(2) == '-' else 1)
+        return TimeOfDay(anchor=sun.group(1), offset_minutes=offset)
+    raise ConfigurationError(f"{path}: invalid time {value!r}, expected HH:MM, sunrise[+/-minutes] or sunset[+/-minutes]")
+
+
+def _build_operating_windows(section: _Section) -> OperatingWindowsConfig:
+    windows_raw = section.raw.get('windows') or []
+    if not isinstance(windows_raw, list):
+        raise ConfigurationError(f"{section.path}.windows: expected a list of windows")
+
+    windows = []
+    for index, window_raw in enumerate(windows_raw):
+        window = _Section(window_raw, f"{section.path}.windows[{index}]")
+        windows.append(OperatingWindow(
+            start=_parse_time_of_day(window.string('start'), f"{window.path}.start"),
+            end=_parse_time_of_day(window.string('end'), f"{window.path}.end"),
+        ))
+
+    return OperatingWindowsConfig(
+        enabled=section.boolean('enabled', default=False),
+        latitude=section.number('latitude', default=0.0, min_value=-90, max_value=90),
+        longitude=section.number('longitude', default=0.0, min_value=-180, max_value=180),
+        check_interval_seconds=section.number('check_interval_seconds', default=30.0, min_value=1),
+        windows=tuple(windows),
+    )
+
+
+def _build_telemetry(section: _Section) -> TelemetryConfig:
+    return TelemetryConfig(
+        enabled=section.boolean('enabled', default=False),
+        unit_id=section.string('unit_id', default=''),
+        aggregator_host=section.string('aggregator_host', default='127.0.0.1'),
+        aggregator_port=section.integer('aggregator_port', default=9870, min_value=1, max_value=65535),
+        flush_interval_seconds=section.number('flush_interval_seconds', default=5.0, min_value=0.1),
+        health_interval_seconds=section.number('health_interval_seconds', default=30.0, min_value=1),
+        max_batch_events=section.integer('max_batch_events', default=200, min_value=1),
+        ack_timeout_seconds=section.number('ack_timeout_seconds', default=1.0, min_value=0.01),
+        queue_size=section.integer('queue_size', default=10000, min_value=10),
+        spool_max_mb=section.number('spool_max_mb', default=50.0, min_value=0),
+    )
+
+
+def _build_control(section: _Section) -> ControlConfig:
+    return ControlConfig(
+        enabled=section.boolean('enabled', default=False),
+        socket_path=section.string('socket_path', default='logs/control.sock'),
+        max_clients=section.integer('max_clients', default=64, min_value=1),
+        max_request_bytes=section.integer('max_request_bytes', default=65536, min_value=1024),
+    )
+
+
+def _build_profiler(section: _Section) -> ProfilerConfig:
+    return ProfilerConfig(
+        enabled=section.boolean('enabled', default=True),
+        default_seconds=section.number('default_seconds', default=10.0, min_value=0.1),
+        max_seconds=section.number('max_seconds', default=120.0, min_value=0.1),
+        interval_ms=section.number('interval_ms', default=5.0, min_value=0.5),
+    )
+
+
+def _build_control_plane(section: _Section) -> ControlPlaneConfig:
+    return ControlPlaneConfig(
+        enabled=section.boolean('enabled', default=False),
+        control_rate_hz=section.number('control_rate_hz', default=100.0, min_value=1, max_value=1000),
+        watchdog_seconds=section.number('watchdog_seconds', default=0.5, min_value=0.01),
+        startup_timeout_seconds=section.number('startup_timeout_seconds', default=10.0, min_value=0.1),
+    )
+
+
+def _build_scheduler(section: _Section) -> SchedulerConfig:
+    return SchedulerConfig(
+        enabled=section.boolean('enabled', default=False),
+        dwell_seconds=section.number('dwell_seconds', default=1.5, min_value=0.05),
+        cooldown_seconds=section.number('cooldown_seconds', default=10.0, min_value=0),
+    )
+
+
+def _build_source(section: _Section, base_dir: str) -> SourceConfig:
+    source_type = section.string('type', default='rpi', choices=('rpi', 'videotest', 'synthetic', 'raw'))
+    raw_path = section.string('raw_path', default='')
+    if raw_path and not os.path.isabs(raw_path):
+        raw_path = os.path.join(base_dir, raw_path)
+    if source_type == 'raw' and not os.path.exists(raw_path):
+        raise ConfigurationError(f"{section.path}.raw_path: raw frame file not found: {raw_path!r}")
+    dual_stream = section.boolean('dual_stream', default=False)
+    if dual_stream and source_type not in ('rpi', 'videotest'):
+        raise ConfigurationError(f"{section.path}.dual_stream needs type rpi or videotest, not {source_type!r}")
+    return SourceConfig(
+        type=source_type,
+        width=section.integer('width', default=1280, min_value=16),
+        height=section.integer('height', default=720, min_value=16),
+        fps=section.integer('fps', default=30, min_value=1),
+        seed=section.integer('seed', default=1, min_value=0),
+        blobs=section.integer('blobs', default=5, min_value=0),
+        blob_size=section.integer('blob_size', default=24, min_value=4),
+        raw_path=raw_path,
+        max_frames=section.integer('max_frames', default=0, min_value=0),
+        dual_stream=dual_stream,
+        inference_width=section.integer('inference_width', default=640, min_value=16),
+        inference_height=section.integer('inference_height', default=640, min_value=16),
+        full_format=section.string('full_format', default='I420'),
+        full_width=section.integer('full_width', default=1920, min_value=16),
+        full_height=section.integer('full_height', default=1080, min_value=16),
+    )
+
+
+def _build_tracker(section: _Section) -> TrackerConfig:
+    return TrackerConfig(
+        backend=section.string('backend', default='hailo', choices=('hailo', 'numpy')),
+        iou_threshold=section.number('iou_threshold', default=0.3, min_value=0, max_value=1),
+        max_center_distance=section.number('max_center_distance', default=0.1, min_value=0),
+        confirm_seconds=section.number('confirm_seconds', default=0.2, min_value=0),
+        keep_lost_seconds=section.number('keep_lost_seconds', default=1.0, min_value=0),
+        velocity_smoothing=section.number('velocity_smoothing', default=0.5, min_value=0, max_value=1),
+        max_tracks=section.integer('max_tracks', default=64, min_value=1),
+    )
+
+
+def _build_models(section: _Section, paths: PathsConfig) -> ModelsConfig:
+    enabled = section.boolean('enabled', default=False)
+    hef_files = section.section('hef_files')
+    hef_paths = []
+    for name in hef_files.keys():
+        hef_path = os.path.join(paths.resources_dir, hef_files.string(name))
+        if enabled and not os.path.exists(hef_path):
+            raise ConfigurationError(f"{hef_files.path}.{name}: HEF file not found: {hef_path}")
+        hef_paths.append((name, hef_path))
+
+    names = tuple(name for name, _ in hef_paths)
+    if enabled and not names:
+        raise ConfigurationError(f"{hef_files.path}: at least one model is needed")
+    idle_model = section.string('idle_model', default=names[0] if names else '')
+    engaged_model = section.string('engaged_model', default=names[-1] if names else '')
+    for key, model in (('idle_model', idle_model), ('engaged_model', engaged_model)):
+        if names and model not in names:
+            raise ConfigurationError(f"{section.path}.{key}: {model!r} is not one of the hef_files models ({', '.join(names)})")
+    return ModelsConfig(
+        enabled=enabled,
+        hef_paths=tuple(hef_paths),
+        idle_model=idle_model,
+        engaged_model=engaged_model,
+        frame_budget_ms=section.number('frame_budget_ms', default=0.0, min_value=0),
+        budget_backoff_seconds=section.number('budget_backoff_seconds', default=30.0, min_value=0),
+        min_dwell_seconds=section.number('min_dwell_seconds', default=3.0, min_value=0),
+        poll_interval_seconds=section.number('poll_interval_seconds', default=1.0, min_value=0.1),
+    )
+
+
+def _build_evidence(section: _Section) -> EvidenceConfig:
+    window_frames = section.integer('window_frames', default=8, min_value=1, max_value=256)
+    min_frames = section.integer('min_frames', default=3, min_value=1)
+    if min_frames > window_frames:
+        raise ConfigurationError(f"{section.path}.min_frames must not exceed window_frames ({window_frames})")
+    engage_threshold = section.number('engage_threshold', default=0.6, min_value=0, max_value=1)
+    release_threshold = section.number('release_threshold', default=0.4, min_value=0, max_value=1)
+    if release_threshold > engage_threshold:
+        raise ConfigurationError(f"{section.path}.release_threshold must not exceed engage_threshold ({engage_threshold})")
+    return EvidenceConfig(
+        enabled=section.boolean('enabled', default=False),
+        window_frames=window_frames,
+        min_frames=min_frames,
+        engage_threshold=engage_threshold,
+        release_threshold=release_threshold,
+        max_tracks=section.integer('max_tracks', default=64, min_value=1),
+    )
+
+
+def _build_hotspots(section: _Section) -> HotspotConfig:
+    return HotspotConfig(
+        enabled=section.boolean('enabled', default=False),
+        park=section.boolean('park', default=True),
+        resolution_degrees=section.number('resolution_degrees', default=2.0, min_value=0.1),
+        smoothing_degrees=section.number('smoothing_degrees', default=4.0, min_value=0),
+        half_life_hours=section.number('half_life_hours', default=72.0, min_value=0.01),
+        min_weight=section.number('min_weight', default=30.0, min_value=0),
+        idle_seconds=section.number('idle_seconds', default=5.0, min_value=0),
+        flush_interval_seconds=section.number('flush_interval_seconds', default=5.0, min_value=1),
+        save_interval_seconds=section.number('save_interval_seconds', default=300.0, min_value=1),
+        max_pending=section.integer('max_pending', default=4096, min_value=1),
+    )
+
+
+def _build_exclusion(section: _Section) -> ExclusionConfig:
+    zones_raw = section.raw.get('zones') or []
+    if not isinstance(zones_raw, list):
+        raise ConfigurationError(f"{section.path}.zones: expected a list of zones")
+
+    zones = []
+    for index, zone_raw in enumerate(zones_raw):
+        zone = _Section(zone_raw, f"{section.path}.zones[{index}]")
+        vertices = zone.raw.get('polygon')
+        if not isinstance(vertices, list) or len(vertices) < 3:
+            raise ConfigurationError(f"{zone.path}.polygon: expected a list of at least 3 [pan, tilt] vertices")
+        polygon = []
+        for vertex in vertices:
+            if (not isinstance(vertex, list) or len(vertex) != 2 or
+                    any(isinstance(v, bool) or not isinstance(v, (int, float)) for v in vertex)):
+                raise ConfigurationError(f"{zone.path}.polygon: invalid vertex {vertex!r}, expected [pan, tilt]")
+            polygon.append((float(vertex[0]), float(vertex[1])))
+        zones.append(ExclusionZone(name=zone.string('name', default=f"zone {index}"), polygon=tuple(polygon)))
+
+    return ExclusionConfig(
+        enabled=section.boolean('enabled', default=False),
+        resolution_degrees=section.number('resolution_degrees', default=0.5, min_value=0.05),
+        margin_degrees=section.number('margin_degrees', default=2.0, min_value=0),
+        servo_seconds_per_degree=section.number('servo_seconds_per_degree', default=0.003, min_value=0),
+        zones=tuple(zones),
+    )
+
+
+def build_config(raw: Dict[str, Any], base_dir: str) -> AppConfig:
+    """
+    Validate a parsed YAML mapping and build the typed configuration.
+
+    Args:
+        raw (Dict[str, Any]): Parsed YAML
+        base_dir (str): Directory relative resource paths are resolved against
+
+    Returns:
+        AppConfig: Immutable, validated configuration
+
+    Raises:
+        ConfigurationError: On the first invalid or missing setting
+    """
+    root = _Section(raw)
+
+    fov_section = root.section('fov', required=True)
+    fov = FovConfig(
+        horizontal=fov_section.number('horizontal', min_value=1, max_value=180),
+        vertical=fov_section.number('vertical', min_value=1, max_value=180),
+    )
+
+    camera = root.section('camera')
+    detection = root.section('detection', required=True)
+    servo = _build_servo(root.section('servo', required=True), fov)
+    paths = _build_paths(root.section('paths', required=True), base_dir)
+
+    return AppConfig(
+        paths=paths,
+        camera=CameraConfig(
+            width=camera.integer('width', default=640, min_value=16),
+            height=camera.integer('height', default=640, min_value=16),
+            format=camera.string('format', default='RGB'),
+        ),
+        source=_build_source(root.section('source'), base_dir),
+        detection=DetectionConfig(
+            nms_score_threshold=detection.number('nms_score_threshold', min_value=0, max_value=1),
+            nms_iou_threshold=detection.number('nms_iou_threshold', min_value=0, max_value=1),
+            max_frames_missing=detection.section('person_tracking').integer('max_frames_missing', default=10, min_value=0),
+        ),
+        servo=servo,
+        laser=_build_laser(root.section('laser', required=True), servo),
+        fov=fov,
+        logging=_build_logging(root.section('logging')),
+        recording=_build_recording(root.section('recording')),
+        preview=_build_preview(root.section('preview')),
+        pipeline=_build_pipeline(root.section('pipeline')),
+        memory=_build_memory(root.section('memory')),
+        visual_servo=_build_visual_servo(root.section('visual_servo')),
+        exclusion=_build_exclusion(root.section('exclusion')),
+        scheduler=_build_scheduler(root.section('scheduler')),
+        control_plane=_build_control_plane(root.section('control_plane')),
+        profiler=_build_profiler(root.section('profiler')),
+        control=_build_control(root.section('control')),
+        telemetry=_build_telemetry(root.section('telemetry')),
+        operating_windows=_build_operating_windows(root.section('operating_windows')),
+        thermal=_build_thermal(root.section('thermal')),
+        evidence=_build_evidence(root.section('evidence')),
+        tracker=_build_tracker(root.section('tracker')),
+        hotspots=_build_hotspots(root.section('hotspots')),
+        models=_build_models(root.section('models'), paths),
+    )
+
+
+def load_config(config_path: str = "config.yaml") -> AppConfig:
     """
     Load and validate the configuration from a YAML file.
-    
+
     Args:
         config_path (str): Path to the configuration file
-        
+
     Returns:
-        Dict[str, Any]: Loaded and validated configuration
-        
+        AppConfig: Loaded and validated configuration
+
     Raises:
         ConfigurationError: If configuration is invalid or missing required fields
     """
     if not os.path.exists(config_path):
         raise ConfigurationError(f"Configuration file not found: {config_path}")
-    
+
     try:
         with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+            raw = yaml.safe_load(f)
     except yaml.YAMLError as e:
         raise ConfigurationError(f"Failed to parse configuration file: {e}")
-    
-    # Validate and process paths
-    resources_dir = config.get('paths', {}).get('resources_dir')
-    if not resources_dir:
-        raise ConfigurationError("resources_dir not specified in configuration")
-    
-    # Make paths absolute if they're relative
-    if not os.path.isabs(resources_dir):
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        config['paths']['resources_dir'] = os.path.join(base_dir, resources_dir)
-    
-    # Validate required model files exist
-    model_config = config.get('paths', {}).get('model', {})
-    hef_path = os.path.join(config['paths']['resources_dir'], model_config.get('hef_file', ''))
-    post_process_path = os.path.join(config['paths']['resources_dir'], model_config.get('post_process_so', ''))
-    
-    if not os.path.exists(hef_path):
-        raise ConfigurationError(f"HEF file not found: {hef_path}")
-    if not os.path.exists(post_process_path):
-        raise ConfigurationError(f"Post-process SO file not found: {post_process_path}")
-    
-    # Add processed paths to config
-    config['paths']['model']['hef_path'] = hef_path
-    config['paths']['model']['post_process_path'] = post_process_path
-    
-    return config
\ No newline at end of file
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return build_config(raw, base_dir)
@@ -0,0 +1,280 @@
+"""
+Control Server Module
+
+Local control API of a running unit: JSON-RPC 2.0 over a Unix socket, one request per line.
+The sockets are non-blocking and served by GLib IO watches on the default main context, so
+requests are handled by the main loop between its other events and never block the pipeline,
+and an idle client costs one file descriptor and one watch.
+
+Methods are registered by the application (see ObjectTargetingApp._register_control_methods).
+
+    $ python -m src.control_server status
+    $ python -m src.control_server laser.pause
+    $ python -m src.control_server aim '{"pan": 10, "tilt": -5}'
+"""
+
+import gi
+gi.require_version('GLib', '2.0')
+from gi.repository import GLib
+
+import os
+import sys
+import json
+import socket
+import inspect
+import logging
+import tempfile
+import argparse
+from typing import Callable, Dict
+
+from .config import ControlConfig
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class _Client:
+    __slots__ = ('sock', 'inbuf', 'outbuf', 'watch_id', 'out_watch_id')
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.inbuf = bytearray()
+        self.outbuf = bytearray()
+        self.watch_id = None
+        self.out_watch_id = None
+
+
+class ControlServer:
+    def __init__(self, config: ControlConfig):
+        """
+        Initialize the control server (not listening until start() is called).
+
+        Args:
+            config (ControlConfig): The control section of the configuration
+        """
+        self.socket_path = config.socket_path
+        self.max_clients = config.max_clients
+        self.max_request_bytes = config.max_request_bytes
+        self.methods: Dict[str, Callable] = {}
+        self.clients: Dict[int, _Client] = {}
+        self.server = None
+        self.accept_watch_id = None
+        self.requests = 0
+
+    def register(self, name: str, handler: Callable):
+        """
+        Register a method. The handler is called with the request params as keyword arguments
+        and returns a JSON-serializable result; it raises ValueError for invalid params (params that do
+        not fit its signature are rejected before it is called, any other exception is an internal error).
+        """
+        self.methods[name] = handler
+
+    def start(self):
+        """Listen on the Unix socket and add the accept watch to the GLib main context."""
+        directory = os.path.dirname(self.socket_path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        # Local control of the laser: owner only. Bound in a private 0700 directory and moved into
+        # place once chmod'ed, so there is no window in which others can connect (the umask is
+        # process-wide and other threads are running, so it is left alone)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        private_dir = tempfile.mkdtemp(prefix='.control-', dir=directory)
+        private_path = os.path.join(private_dir, 'control.sock')
+        try:
+            self.server.bind(private_path)
+            os.chmod(private_path, 0o600)
+            os.replace(private_path, self.socket_path) # Also replaces the stale socket of a previous run
+        finally:
+            if os.path.exists(private_path):
+                os.unlink(private_path)
+            os.rmdir(private_dir)
+        self.server.listen(16)
+        self.server.setblocking(False)
+        self.accept_watch_id = GLib.io_add_watch(self.server.fileno(), GLib.PRIORITY_DEFAULT, GLib.IOCondition.IN, self._on_accept)
+        logging.info(f"Control API listening on {self.socket_path}")
+
+    def _on_accept(self, fd, condition) -> bool:
+        try:
+            sock, _ = self.server.accept()
+        except BlockingIOError:
+            return True
+        except OSError as e:
+            logging.error(f"Control API accept failed: {e}")
+            return True
+
+        if len(self.clients) >= self.max_clients:
+            sock.close()
+            logging.warning(f"Control API client refused, {self.max_clients} clients already connected")
+            return True
+
+        sock.setblocking(False)
+        client = _Client(sock)
+        client.watch_id = GLib.io_add_watch(
+            sock.fileno(), GLib.PRIORITY_DEFAULT,
+            GLib.IOCondition.IN | GLib.IOCondition.HUP | GLib.IOCondition.ERR,
+            self._on_readable, client,
+        )
+        self.clients[sock.fileno()] = client
+        return True
+
+    def _on_readable(self, fd, condition, client: _Client) -> bool:
+        try:
+            data = client.sock.recv(65536)
+        except BlockingIOError:
+            return True
+        except OSError:
+            data = b''
+        if not data:
+            self._close(client)
+            return False
+
+        client.inbuf += data
+        while True:
+            newline = client.inbuf.find(b'\n')
+            if newline < 0:
+                break
+            line = bytes(client.inbuf[:newline])
+            del client.inbuf[:newline + 1]
+            if line.strip():
+                response = self.handle_line(line)
+                if response is not None:
+                    client.outbuf += response.encode() + b'\n'
+
+        if len(client.inbuf) > self.max_request_bytes:
+            client.outbuf += json.dumps(self._error(None, INVALID_REQUEST, "Request too large")).encode() + b'\n'
+            self._flush(client)
+            self._close(client)
+            return False
+
+        self._flush(client)
+        return True
+
+    def _flush(self, client: _Client):
+        """Send what the socket accepts now, wait for writability for the rest."""
+        try:
+            while client.outbuf:
+                sent = client.sock.send(client.outbuf)
+                del client.outbuf[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            client.outbuf.clear()
+
+        if client.outbuf and client.out_watch_id is None:
+            client.out_watch_id = GLib.io_add_watch(client.sock.fileno(), GLib.PRIORITY_DEFAULT, GLib.IOCondition.OUT, self._on_writable, client)
+        elif not client.outbuf and client.out_watch_id is not None:
+            GLib.source_remove(client.out_watch_id)
+            client.out_watch_id = None
+
+    def _on_writable(self, fd, condition, client: _Client) -> bool:
+        client.out_watch_id = None # Returning False removes this watch, _flush re-adds it if needed
+        self._flush(client)
+        return False
+
+    def _close(self, client: _Client):
+        for watch_id in (client.watch_id, client.out_watch_id):
+            if watch_id is not None:
+                GLib.source_remove(watch_id)
+        client.watch_id = client.out_watch_id = None
+        self.clients.pop(client.sock.fileno(), None)
+        client.sock.close()
+
+    @staticmethod
+    def _error(request_id, code: int, message: str) -> dict:
+        return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+    def handle_line(self, line: bytes):
+        """Handle one request line (a request or a batch), return the response line (None for notifications)."""
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return json.dumps(self._error(None, PARSE_ERROR, "Parse error"))
+
+        if isinstance(message, list):
+            responses = [response for response in map(self.dispatch, message) if response is not None]
+            return json.dumps(responses, default=str) if responses else None
+        response = self.dispatch(message)
+        return json.dumps(response, default=str) if response is not None else None
+
+    def dispatch(self, request) -> dict:
+        """Call the method of one JSON-RPC request, return the response (None for notifications)."""
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return self._error(None, INVALID_REQUEST, "Invalid request")
+        request_id = request.get('id')
+        params = request.get('params') or {}
+        handler = self.methods.get(request['method'])
+        self.requests += 1
+
+        if handler is None:
+            response = self._error(request_id, METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+        elif not isinstance(params, dict):
+            response = self._error(request_id, INVALID_PARAMS, "params must be an object")
+        else:
+            try:
+                inspect.signature(handler).bind(**params)
+            except TypeError as e:
+                # Checked against the signature, so a TypeError from the handler body is a bug, not a client mistake
+                response = self._error(request_id, INVALID_PARAMS, str(e))
+            else:
+                try:
+                    response = {'jsonrpc': '2.0', 'id': request_id, 'result': handler(**params)}
+                except ValueError as e:
+                    response = self._error(request_id, INVALID_PARAMS, str(e))
+                except Exception as e:
+                    logging.exception(f"Control API method {request['method']} failed: {e}")
+                    response = self._error(request_id, INTERNAL_ERROR, str(e))
+        return response if 'id' in request else None
+
+    def stop(self):
+        """Close all clients and the listening socket, remove the socket file. Idempotent."""
+        for client in list(self.clients.values()):
+            self._close(client)
+        if self.accept_watch_id is not None:
+            GLib.source_remove(self.accept_watch_id)
+            self.accept_watch_id = None
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            logging.info(f"Control API stopped ({self.requests} requests served)")
+
+
+def send_request(socket_path: str, method: str, params: dict = None, timeout: float = 5.0):
+    """Send one request to a running unit and return its result (raises RuntimeError on a JSON-RPC error)."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params or {}}).encode() + b'\n')
+        response = b''
+        while not response.endswith(b'\n'):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+    message = json.loads(response)
+    if 'error' in message:
+        raise RuntimeError(message['error']['message'])
+    return message['result']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Send a control request to a running bird deterrent')
+    parser.add_argument('method', help='Method name, e.g. status, laser.pause, laser.resume, aim, set, profile')
+    parser.add_argument('params', nargs='?', default='{}', help='JSON object with the method parameters')
+    parser.add_argument('--socket', default='logs/control.sock', help='Control socket path (control.socket_path)')
+    args = parser.parse_args()
+
+    try:
+        result = send_request(args.socket, args.method, json.loads(args.params))
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
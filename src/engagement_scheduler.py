@@ -0,0 +1,132 @@
+"""
+Engagement Scheduler Module
+
+Time-slices the laser across several tracked birds instead of staying on one until the tracker
+loses it. Each target gets a fixed dwell; when it is over the target goes into a cooldown cache
+(entries expire on their own) and the scheduler moves to the nearest eligible target in
+servo-angle space (greedy nearest neighbour from the current aim), which keeps servo travel
+between visits short.
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from .config import SchedulerConfig
+
+
+class EngagementScheduler:
+    def __init__(self, config: SchedulerConfig, clock=time.monotonic):
+        """
+        Initialize the engagement scheduler.
+
+        Args:
+            config (SchedulerConfig): The scheduler section of the configuration
+            clock: Monotonic time source in seconds
+        """
+        self.dwell_seconds = config.dwell_seconds
+        self.cooldown_seconds = config.cooldown_seconds
+        self.clock = clock
+
+        self.current_id = None
+        self.visit_started = None
+        self.cooldowns = {} # track_id -> time at which the track may be engaged again
+        self.hit_until = {} # track_id -> time until which further full visits of the track are not counted as hits
+
+        # Statistics
+        self.hits = deque() # Times of the hits (full-dwell visits, once per track per cooldown) within the last minute
+        self.total_hits = 0
+        self.abandoned = 0 # Visits that ended before the dwell was over (target lost)
+        self.switches = 0
+        self.travel_degrees = 0.0 # Servo travel between targets
+
+    def _end_visit(self, now: float, completed: bool):
+        if completed:
+            # A lone bird is re-engaged while it cools down: count it once per cooldown, not per dwell
+            if self.hit_until.get(self.current_id, 0.0) <= now:
+                self.hit_until[self.current_id] = now + self.cooldown_seconds
+                self.total_hits += 1
+                self.hits.append(now)
+                self._prune_hits(now)
+        else:
+            self.abandoned += 1
+        self.cooldowns[self.current_id] = now + self.cooldown_seconds
+        self.current_id = None
+        self.visit_started = None
+
+    def select(self, candidates: Dict[int, Tuple[float, float]], aim: Tuple[float, float]) -> Optional[int]:
+        """
+        Pick the track to engage this frame.
+
+        Args:
+            candidates (dict): track_id -> (pan, tilt) angles needed to aim at that track
+            aim (tuple): Current (pan, tilt) aim of the servos
+
+        Returns:
+            Optional[int]: Track to engage, None if there are no candidates
+        """
+        now = self.clock()
+
+        # Expire cooldowns, the cache never outgrows the tracks seen in the last cooldown period
+        if self.cooldowns:
+            self.cooldowns = {track_id: until for track_id, until in self.cooldowns.items() if until > now}
+        if self.hit_until:
+            self.hit_until = {track_id: until for track_id, until in self.hit_until.items() if until > now}
+
+        previous_id = self.current_id
+        if self.current_id is not None:
+            if self.current_id not in candidates:
+                self._end_visit(now, completed=False)
+            elif now - self.visit_started < self.dwell_seconds:
+                return self.current_id
+            else:
+                self._end_visit(now, completed=True)
+
+        if not candidates:
+            return None
+
+        # Prefer tracks that are not cooling down; with none left, keep engaging rather than idle
+        eligible = [track_id for track_id in candidates if track_id not in self.cooldowns] or list(candidates)
+
+        def travel(track_id):
+            pan, tilt = candidates[track_id]
+            return max(abs(pan - aim[0]), abs(tilt - aim[1])) # Both servos move at once, the longer move dominates
+
+        next_id = min(eligible, key=travel)
+        if next_id != previous_id:
+            self.travel_degrees += travel(next_id)
+            self.switches += 1
+        self.current_id = next_id
+        self.visit_started = now
+        logging.debug("Engaging track %s (%d candidates)", next_id, len(candidates))
+        return next_id
+
+    def reset(self):
+        """No targets left: end the current visit (the cooldowns are kept)."""
+        if self.current_id is not None:
+            now = self.clock()
+            self._end_visit(now, completed=now - self.visit_started >= self.dwell_seconds)
+
+    def _prune_hits(self, now: float):
+        while self.hits and now - self.hits[0] > 60.0:
+            self.hits.popleft()
+
+    def stats(self) -> dict:
+        """
+        Get scheduling statistics.
+
+        Returns:
+            dict: birds_per_minute (hits in the last 60s: full-dwell visits, each track counted at most
+                  once per cooldown period), total hits, abandoned
+                  visits, target switches, mean servo travel per switch and tracks cooling down
+        """
+        self._prune_hits(self.clock())
+        return {
+            'birds_per_minute': len(self.hits),
+            'hits': self.total_hits,
+            'abandoned': self.abandoned,
+            'switches': self.switches,
+            'mean_travel_degrees': self.travel_degrees / self.switches if self.switches else 0.0,
+            'cooling_down': len(self.cooldowns),
+        }
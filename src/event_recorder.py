@@ -0,0 +1,204 @@
+"""
+Event Clip Recorder Module
+
+This module keeps the last few seconds of encoded video in a bounded in-memory ring and,
+when an engagement starts, saves the ring (pre-roll) plus the following seconds (post-roll)
+to disk as a clip. Encoding runs on a leaky tee branch and file writes run on a background
+thread, so neither can stall the inference path.
+"""
+
+import gi
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+import os
+import time
+import queue
+import logging
+import threading
+from collections import deque
+
+from .config import RecordingConfig
+
+WRITE_QUEUE_FRAMES = 512 # Frames waiting for the writer, beyond it frames are dropped
+
+
+class EventClipRecorder:
+    def __init__(self, config: RecordingConfig, appsink_name: str = 'clip_recorder_appsink', clock=time.monotonic):
+        """
+        Initialize the event clip recorder.
+
+        Args:
+            config (RecordingConfig): The recording section of the configuration:
+                - output_dir (str): Directory the clips are written to
+                - pre_roll_seconds (float): Seconds of video kept before an engagement
+                - post_roll_seconds (float): Seconds of video recorded after the last trigger
+                - max_buffer_mb (float): Hard limit on the memory used by the ring
+            appsink_name (str): Name of the appsink element at the end of the recorder branch
+            clock: Monotonic time source in seconds, for the post-roll
+        """
+        self.output_dir = config.output_dir
+        self.pre_roll_ns = int(config.pre_roll_seconds * Gst.SECOND)
+        self.post_roll_seconds = config.post_roll_seconds
+        self.max_buffer_bytes = int(config.max_buffer_mb * 1024 * 1024)
+        self.appsink_name = appsink_name
+        self.clock = clock
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Ring of (pts, data, is_keyframe) encoded frames, bounded by time and bytes
+        self._ring = deque()
+        self._ring_bytes = 0
+        self._lock = threading.Lock()
+
+        # Recording state, only touched under the lock
+        self._recording = False
+        self._record_until = 0.0
+        self._trigger_pending = False
+        self._skip_to_keyframe = False # A frame was dropped, the clip resumes at the next keyframe
+
+        # Disk writes happen on their own thread. Only frames are dropped when the writer falls
+        # behind: a lost 'open' or 'close' would mix two clips, so the queue itself is unbounded
+        self._write_queue = queue.Queue()
+        self.max_queued_writes = WRITE_QUEUE_FRAMES
+        self._writer = threading.Thread(target=self._writer_loop, name='clip_writer', daemon=True)
+        self._writer.start()
+
+        # Counters
+        self.clips_written = 0
+        self.dropped_writes = 0
+
+        logging.info(
+            "Event clip recorder initialized: pre-roll=%ss, post-roll=%ss, ring limit=%d bytes, output=%s",
+            self.pre_roll_ns / Gst.SECOND, self.post_roll_seconds, self.max_buffer_bytes, self.output_dir
+        )
+
+    def attach(self, pipeline: Gst.Pipeline):
+        """Connect to the recorder appsink of a created pipeline."""
+        appsink = pipeline.get_by_name(self.appsink_name)
+        if appsink is None:
+            logging.warning(f"Recorder appsink '{self.appsink_name}' not found in pipeline, clips disabled")
+            return
+        appsink.connect('new-sample', self._on_new_sample)
+
+    def trigger(self):
+        """
+        Signal that an engagement started (or is still going on).
+
+        Cheap enough to be called from the detection callback: it only sets a flag,
+        the ring is flushed on the recorder branch thread.
+        """
+        with self._lock:
+            if self._recording:
+                self._record_until = self.clock() + self.post_roll_seconds
+            else:
+                self._trigger_pending = True
+
+    def _on_new_sample(self, appsink) -> Gst.FlowReturn:
+        """Called by the appsink for every encoded frame of the recorder branch."""
+        sample = appsink.emit('pull-sample')
+        if sample is None:
+            return Gst.FlowReturn.OK
+
+        buffer = sample.get_buffer()
+        success, map_info = buffer.map(Gst.MapFlags.READ)
+        if not success:
+            return Gst.FlowReturn.OK
+        try:
+            data = bytes(map_info.data)
+        finally:
+            buffer.unmap(map_info)
+        is_keyframe = not buffer.has_flags(Gst.BufferFlags.DELTA_UNIT)
+
+        with self._lock:
+            self._push_ring(buffer.pts, data, is_keyframe)
+
+            if self._trigger_pending:
+                self._trigger_pending = False
+                self._start_clip()
+            elif self._recording:
+                self._enqueue_data(data, is_keyframe)
+                if self.clock() >= self._record_until:
+                    self._recording = False
+                    self._write_queue.put(('close', None))
+
+        return Gst.FlowReturn.OK
+
+    def _push_ring(self, pts: int, data: bytes, is_keyframe: bool):
+        """Append a frame to the ring and trim it to the pre-roll duration and byte limit."""
+        self._ring.append((pts, data, is_keyframe))
+        self._ring_bytes += len(data)
+
+        while self._ring and (
+            self._ring_bytes > self.max_buffer_bytes or
+            (pts != Gst.CLOCK_TIME_NONE and pts - self._ring[0][0] > self.pre_roll_ns)
+        ):
+            _, old_data, _ = self._ring.popleft()
+            self._ring_bytes -= len(old_data)
+
+    def _start_clip(self):
+        """Open a new clip and hand the pre-roll (starting at a keyframe) to the writer."""
+        # Milliseconds in the name, so clips started within the same second do not overwrite each other
+        now = time.time()
+        name = time.strftime('clip_%Y%m%d_%H%M%S', time.localtime(now)) + f"_{int(now * 1000) % 1000:03d}.h264"
+        path = os.path.join(self.output_dir, name)
+        self._recording = True
+        self._record_until = self.clock() + self.post_roll_seconds
+        self._write_queue.put(('open', path))
+
+        # A decoder can only start at a keyframe, skip the frames before the first one
+        self._skip_to_keyframe = False
+        started = False
+        for _, data, is_keyframe in self._ring:
+            started = started or is_keyframe
+            if started:
+                self._enqueue_data(data, is_keyframe)
+
+    def _enqueue_data(self, data: bytes, is_keyframe: bool):
+        """Queue a frame of the open clip, or drop it (and the frames up to the next keyframe) when the writer is behind."""
+        if is_keyframe:
+            self._skip_to_keyframe = False
+        elif self._skip_to_keyframe:
+            self.dropped_writes += 1
+            return
+        if self._write_queue.qsize() >= self.max_queued_writes:
+            self.dropped_writes += 1
+            self._skip_to_keyframe = True # The frames depending on this one would not decode
+            return
+        self._write_queue.put(('data', data))
+
+    def _writer_loop(self):
+        """Background thread writing clips to disk."""
+        clip = None
+        while True:
+            kind, payload = self._write_queue.get()
+            try:
+                if kind == 'open':
+                    if clip:
+                        clip.close()
+                    clip = open(payload, 'wb')
+                    logging.info(f"Recording event clip to {payload}")
+                elif kind == 'data' and clip:
+                    clip.write(payload)
+                elif kind == 'close' and clip:
+                    clip.close()
+                    clip = None
+                    self.clips_written += 1
+                elif kind == 'stop':
+                    if clip:
+                        clip.close()
+                        self.clips_written += 1
+                    return
+            except OSError as e:
+                logging.error(f"Failed to write event clip: {e}")
+                clip = None
+
+    def stop(self):
+        """Close any open clip and stop the writer thread. Safe to call more than once."""
+        if not self._writer.is_alive():
+            return
+        with self._lock:
+            self._recording = False
+        self._write_queue.put(('stop', None))
+        self._writer.join(timeout=2.0)
+        if self.dropped_writes:
+            logging.warning(f"Event clip recorder dropped {self.dropped_writes} frames (writer too slow)")
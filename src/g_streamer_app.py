@@ -150,9 +150,11 @@ def get_default_parser():
 
 def get_source_type(input_source):
     # This function will return the source type based on the input source
-    # return values can be "file", "mipi" or "usb"
+    # return values can be "file", "mipi" or "usb", or "synthetic" / "raw" for the appsrc sources
     if input_source.startswith("/dev/video"):
         return 'usb'
+    elif input_source in ('synthetic', 'raw', 'videotest'):
+        return input_source
     else:
         if input_source.startswith("rpi"):
             return 'rpi'
@@ -197,16 +199,28 @@ def SOURCE_PIPELINE(video_source, video_format='RGB', video_width=640, video_hei
             f'libcamerasrc name={name} ! '
             f'video/x-raw, format={video_format}, width=1920, height=1080 ! '
         )
+    elif source_type == 'videotest':
+        source_element = (
+            f'videotestsrc name={name} is-live=true pattern=ball ! '
+            f'video/x-raw, format={video_format}, width=1920, height=1080, framerate=30/1 ! '
+        )
+    elif source_type in ('synthetic', 'raw'):
+        # Fed by AppSourceFeeder (src/synthetic_source.py), which also sets the caps
+        source_element = (
+            f'appsrc name={name} is-live=true do-timestamp=false max-buffers=2 block=true ! '
+        )
     elif source_type == 'usb':
         source_element = (
             f'v4l2src device={video_source} name={name} ! '
             'video/x-raw, width=640, height=480 ! '
         )
     else:
+        # Raw H.264 (the event recorder clips) has no container to demux
+        demux = '' if video_source.lower().endswith('.h264') else 'qtdemux ! '
         source_element = (
             f'filesrc location="{video_source}" name={name} ! '
             f'{QUEUE(name=f"{name}_queue_dec264")} ! '
-            'qtdemux ! h264parse ! avdec_h264 max-threads=2 ! '
+            f'{demux}h264parse ! avdec_h264 max-threads=2 ! '
         )
     source_pipeline = (
         f'{source_element} '
@@ -600,4 +614,139 @@ def TRACKER_PIPELINE(name='hailo_tracker'):
         'keep-new-frames=15 '         # Half second to confirm new track
         'keep-lost-frames=5 '        # Half second before considering track lost
     )
-    return tracker_pipeline
\ No newline at end of file
+    return tracker_pipeline
+
+def DUAL_SOURCE_PIPELINE(video_source, video_format='RGB', video_width=640, video_height=640,
+                         full_format='I420', full_width=1920, full_height=1080, full_res=True, framerate=30, name='source'):
+    """
+    Creates a GStreamer pipeline string for a two-stream source: a network-resolution stream that
+    continues at the end of the string (towards inference), and optionally a full-resolution stream
+    ending in the tee '{name}_full_tee', for the recording and preview branches only.
+    The camera ISP produces both streams, so nothing on the inference path scales or converts a
+    full-resolution frame. 'videotest' stands in for the camera with two videotestsrc.
+
+    Args:
+        video_source (str): 'rpi' (libcamerasrc) or 'videotest'.
+        video_format (str, optional): Format of the inference stream. Defaults to 'RGB'.
+        video_width (int, optional): Width of the inference stream. Defaults to 640.
+        video_height (int, optional): Height of the inference stream. Defaults to 640.
+        full_format (str, optional): Format of the full-resolution stream. Defaults to 'I420' (what the encoder takes).
+        full_width (int, optional): Width of the full-resolution stream. Defaults to 1920.
+        full_height (int, optional): Height of the full-resolution stream. Defaults to 1080.
+        full_res (bool, optional): Whether to produce the full-resolution stream at all. Defaults to True.
+        framerate (int, optional): Frame rate of the test sources. Defaults to 30.
+        name (str, optional): The prefix name for the pipeline elements. Defaults to 'source'.
+
+    Returns:
+        str: A string representing the GStreamer pipeline for the source, ending in the inference stream.
+    """
+    inference_caps = f'video/x-raw, format={video_format}, width={video_width}, height={video_height}'
+    full_caps = f'video/x-raw, format={full_format}, width={full_width}, height={full_height}'
+    full_branch = (
+        f'{QUEUE(name=f"{name}_full_q", max_size_buffers=2, leaky="downstream")} ! '
+        f'tee name={name}_full_tee allow-not-linked=true '
+    )
+
+    if get_source_type(video_source) == 'videotest':
+        inference_caps += f', framerate={framerate}/1'
+        full_caps += f', framerate={framerate}/1'
+        source_pipeline = ''
+        if full_res:
+            source_pipeline += f'videotestsrc name={name}_full is-live=true pattern=ball ! {full_caps} ! {full_branch} '
+        source_pipeline += f'videotestsrc name={name} is-live=true pattern=ball ! {inference_caps} ! '
+    elif full_res:
+        # The main stream (src) is the full resolution one, the ISP downscales into the second (src_0)
+        source_pipeline = (
+            f'libcamerasrc name={name} '
+            f'{name}.src ! {full_caps} ! {full_branch} '
+            f'{name}.src_0 ! {inference_caps} ! '
+        )
+    else:
+        source_pipeline = f'libcamerasrc name={name} ! {inference_caps} ! '
+
+    return source_pipeline + f'{QUEUE(name=f"{name}_q")} ! '
+
+def RECORDER_PIPELINE(width=1280, height=720, bitrate_kbps=4000, key_int_max=30, name='clip_recorder'):
+    """
+    Creates a GStreamer pipeline string for the event clip recorder branch.
+    Meant to hang off a tee: the leading leaky queue drops frames when the encoder falls behind,
+    so the branch never back-pressures the inference path. Encoded H.264 frames end in an appsink
+    which feeds the in-memory pre-roll ring of EventClipRecorder.
+
+    Args:
+        width (int, optional): The width of the recorded video. Defaults to 1280.
+        height (int, optional): The height of the recorded video. Defaults to 720.
+        bitrate_kbps (int, optional): The encoder bitrate in kbit/s. Defaults to 4000.
+        key_int_max (int, optional): Maximum distance between keyframes, bounds the pre-roll start granularity. Defaults to 30.
+        name (str, optional): The prefix name for the pipeline elements. Defaults to 'clip_recorder'.
+
+    Returns:
+        str: A string representing the GStreamer pipeline for the recorder branch.
+    """
+    recorder_pipeline = (
+        f'{QUEUE(name=f"{name}_q", max_size_buffers=2, leaky="downstream")} ! '
+        f'videoscale name={name}_videoscale n-threads=2 ! '
+        f'video/x-raw, width={width}, height={height} ! '
+        f'videoconvert name={name}_videoconvert n-threads=2 qos=false ! '
+        f'video/x-raw, format=I420 ! '
+        f'x264enc name={name}_encoder tune=zerolatency speed-preset=ultrafast bitrate={bitrate_kbps} key-int-max={key_int_max} ! '
+        f'video/x-h264, stream-format=byte-stream, alignment=au ! '
+        f'appsink name={name}_appsink emit-signals=true sync=false drop=true max-buffers=10 '
+    )
+    return recorder_pipeline
+
+
+def PREVIEW_PIPELINE(width=640, height=360, max_fps=10, jpeg_quality=70, name='preview'):
+    """
+    Creates a GStreamer pipeline string for the on-demand MJPEG preview branch.
+    Meant to hang off a tee. The valve starts closed (drop=true) so nothing after it runs until
+    a client connects; the leaky single-buffer queue keeps the branch from back-pressuring the tee.
+
+    Args:
+        width (int, optional): The width of the preview. Defaults to 640.
+        height (int, optional): The height of the preview. Defaults to 360.
+        max_fps (int, optional): The maximum preview frame rate. Defaults to 10.
+        jpeg_quality (int, optional): The JPEG encoder quality (0-100). Defaults to 70.
+        name (str, optional): The prefix name for the pipeline elements. Defaults to 'preview'.
+
+    Returns:
+        str: A string representing the GStreamer pipeline for the preview branch.
+    """
+    preview_pipeline = (
+        f'{QUEUE(name=f"{name}_q", max_size_buffers=1, leaky="downstream")} ! '
+        f'valve name={name}_valve drop=true ! '
+        f'videorate name={name}_videorate drop-only=true max-rate={max_fps} ! '
+        f'videoscale name={name}_videoscale ! '
+        f'video/x-raw, width={width}, height={height} ! '
+        f'videoconvert name={name}_videoconvert qos=false ! '
+        f'jpegenc name={name}_jpegenc quality={jpeg_quality} ! '
+        f'appsink name={name}_appsink emit-signals=true sync=false drop=true max-buffers=1 '
+    )
+    return preview_pipeline
+
+
+def MODEL_SWITCH_PIPELINE(inference_pipelines, name='model'):
+    """
+    Creates a GStreamer pipeline string that runs one of several inference pipelines at a time.
+    An output-selector sends every frame to the active model only, and an input-selector passes on
+    the results of the active model only; both are switched together at runtime (see
+    ModelSwitcher). All models are negotiated and their HEFs configured at startup, and an inactive
+    model gets no frames, so it takes no time on the Hailo.
+
+    Args:
+        inference_pipelines (dict): Model name -> inference pipeline string, e.g. INFERENCE_PIPELINE(..., name=f'inference_{model}')
+        name (str, optional): The prefix name for the selector elements. Defaults to 'model'.
+
+    Returns:
+        str: A string representing the GStreamer pipeline, linked on like an inference pipeline.
+    """
+    model_branches = ''.join(
+        f'{name}_selector. ! {inference_pipeline} ! {name}_join. '
+        for inference_pipeline in inference_pipelines.values()
+    )
+    model_switch_pipeline = (
+        f'output-selector name={name}_selector '
+        f'{model_branches}'
+        f'input-selector name={name}_join sync-streams=false '
+    )
+    return model_switch_pipeline
@@ -0,0 +1,329 @@
+"""
+Hardware Process Module
+
+Runs PanTiltController and LaserController in a dedicated process, so I2C and GPIO access never
+compete for the GIL with the GLib main loop, the pad probe and the PyGObject callbacks.
+
+The detection callback publishes its commands through a shared-memory command slot guarded by
+a sequence number (a seqlock: the writer makes the sequence odd while it writes, readers retry
+until they see the same even sequence before and after copying the slot). The hardware process
+applies the latest command at its own control rate and writes a heartbeat and its state into a
+shared status slot. If the sequence number stops changing for longer than the watchdog period
+(the producer hung or died), the hardware process turns the laser off on its own.
+"""
+
+import os
+import time
+import ctypes
+import signal
+import logging
+import threading
+import multiprocessing
+from typing import Optional, Tuple
+
+from .config import AppConfig
+from .pan_tilt_controller import PanTiltController, angles_for_position
+from .laser_controller import LaserController, ON, OFF
+
+# Command slot layout (doubles)
+CMD_SEQ, CMD_AIM, CMD_X, CMD_Y, CMD_CORR_PAN, CMD_CORR_TILT, CMD_LASER, CMD_SLEEP, CMD_LASER_FORCE = range(9)
+COMMAND_SIZE = 9
+
+# CMD_AIM values: what CMD_X / CMD_Y hold
+AIM_NONE, AIM_IMAGE, AIM_ANGLES = 0.0, 1.0, 2.0
+
+# Status slot layout (doubles)
+ST_HEARTBEAT, ST_TIME, ST_PAN, ST_TILT, ST_LASER_ON, ST_SAFETY_TRIPS, ST_WATCHDOG_TRIPS, ST_OVERRUNS = range(8)
+STATUS_SIZE = 8
+
+
+def init_hardware(config: AppConfig) -> Tuple[PanTiltController, LaserController]:
+    """Create the pan/tilt and laser controllers, wired together as the configuration asks."""
+    pan_tilt = PanTiltController(config=config)
+    laser_config = config.laser
+    if laser_config.mode == 'pwm':
+        # Strobe patterns are generated by a spare channel of the PCA9685 driving the servos
+        laser = LaserController(config=laser_config, pwm_channel=pan_tilt.pca.channels[laser_config.pwm_channel])
+    else:
+        laser = LaserController(config=laser_config)
+
+    # Never fire into an exclusion zone, or while the servos cross one
+    if pan_tilt.exclusion_mask is not None:
+        laser.set_interlock(pan_tilt.aim_is_safe)
+    return pan_tilt, laser
+
+
+def read_slot(slot, retries: int = 100) -> Optional[list]:
+    """Copy a seqlock-guarded slot, None if no consistent copy could be taken."""
+    for _ in range(retries):
+        seq = slot[0]
+        if int(seq) % 2:
+            continue # Writer in progress
+        values = slot[:]
+        if slot[0] == seq:
+            return values
+    return None
+
+
+def _hardware_main(config: AppConfig, command, status, stop_event, parent_pid: int):
+    """Entry point of the hardware process."""
+    # Ctrl-C reaches the whole process group: the parent coordinates shutdown through stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    logs_dir = config.paths.logs_dir
+    os.makedirs(logs_dir, exist_ok=True)
+    logging.basicConfig(
+        filename=os.path.join(logs_dir, 'hardware.log'),
+        level=logging.getLevelName(config.logging.level),
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    plane = config.control_plane
+    period = 1.0 / plane.control_rate_hz
+    pan_tilt, laser = init_hardware(config)
+    logging.info(f"Hardware process {os.getpid()} running at {plane.control_rate_hz} Hz")
+
+    last_seq = None
+    last_change = time.monotonic()
+    watchdog_tripped = False
+    sleeping = False
+    heartbeat = 0
+    try:
+        next_tick = time.monotonic()
+        while not stop_event.is_set():
+            now = time.monotonic()
+            if os.getppid() != parent_pid:
+                logging.error("Producer process died, shutting down the hardware")
+                break
+
+            values = read_slot(command)
+            if values is not None:
+                changed = values[CMD_SEQ] != last_seq
+                if changed:
+                    last_seq = values[CMD_SEQ]
+                    last_change = now
+                    if watchdog_tripped:
+                        logging.info("Producer commands resumed")
+                        watchdog_tripped = False
+
+                if values[CMD_SLEEP]:
+                    if not sleeping:
+                        laser.turn_off(force=True)
+                        pan_tilt.sleep()
+                        sleeping = True
+                    last_change = now # No commands are expected while suspended
+                elif sleeping:
+                    pan_tilt.wake()
+                    sleeping = False
+
+                if sleeping:
+                    pass # Laser off, servos unpowered until woken up
+                elif now - last_change > plane.watchdog_seconds:
+                    if not watchdog_tripped:
+                        laser.turn_off(force=True)
+                        watchdog_tripped = True
+                        status[ST_WATCHDOG_TRIPS] += 1
+                        logging.warning(f"No command for {plane.watchdog_seconds}s, laser forced off")
+                else:
+                    if changed: # The servos only move on new commands, not on every control tick
+                        if values[CMD_AIM] == AIM_IMAGE:
+                            pan_tilt.update_if_needed(values[CMD_X], values[CMD_Y], (values[CMD_CORR_PAN], values[CMD_CORR_TILT]))
+                        elif values[CMD_AIM] == AIM_ANGLES:
+                            pan_tilt.move(values[CMD_X], values[CMD_Y])
+                    if values[CMD_LASER]:
+                        laser.turn_on()
+                    else:
+                        laser.turn_off(force=bool(values[CMD_LASER_FORCE]))
+
+            # Heartbeat and state for the producer (single writer, plain stores)
+            heartbeat += 1
+            status[ST_PAN] = pan_tilt.current_pan
+            status[ST_TILT] = pan_tilt.current_tilt
+            status[ST_LASER_ON] = 1.0 if laser.is_on() else 0.0
+            status[ST_SAFETY_TRIPS] = laser.safety_trips
+            status[ST_TIME] = time.monotonic() # CLOCK_MONOTONIC is shared by all processes
+            status[ST_HEARTBEAT] = heartbeat
+
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                stop_event.wait(delay)
+            else:
+                status[ST_OVERRUNS] += 1
+                next_tick = time.monotonic() # Do not try to catch up on missed ticks
+    finally:
+        laser.cleanup()
+        pan_tilt.cleanup()
+        logging.info("Hardware process stopped")
+        logging.shutdown()
+
+
+class HardwareClient:
+    def __init__(self, config: AppConfig):
+        """
+        Start the hardware process and wait for its first heartbeat.
+
+        Args:
+            config (AppConfig): Application configuration, passed to the hardware process
+
+        Raises:
+            RuntimeError: If the hardware process does not come up within startup_timeout_seconds
+        """
+        plane = config.control_plane
+        self.config = config
+        self.watchdog_seconds = plane.watchdog_seconds
+
+        # spawn, not fork: the parent already runs GLib/GStreamer threads
+        context = multiprocessing.get_context('spawn')
+        self.command = context.RawArray(ctypes.c_double, COMMAND_SIZE)
+        self.status = context.RawArray(ctypes.c_double, STATUS_SIZE)
+        self.stop_event = context.Event()
+        self._write_lock = threading.Lock() # Single writer: the streaming thread and cleanup may both publish
+        self.published = 0
+
+        self.process = context.Process(
+            target=_hardware_main,
+            args=(config, self.command, self.status, self.stop_event, os.getpid()),
+            name='hardware',
+            daemon=True,
+        )
+        self.process.start()
+
+        deadline = time.monotonic() + plane.startup_timeout_seconds
+        while self.status[ST_HEARTBEAT] == 0:
+            if not self.process.is_alive() or time.monotonic() > deadline:
+                self.stop()
+                raise RuntimeError("Hardware process failed to start, see logs/hardware.log")
+            time.sleep(0.01)
+        logging.info(f"Hardware process started (pid {self.process.pid})")
+
+    def _write(self, updates: dict):
+        """Write command fields (slot index -> value) into the shared slot, as one seqlock write."""
+        with self._write_lock:
+            command = self.command
+            command[CMD_SEQ] += 1 # Odd: write in progress
+            for index, value in updates.items():
+                command[index] = value
+            command[CMD_SEQ] += 1 # Even: consistent again
+            self.published += 1
+
+    def set_target(self, center_x: float, center_y: float, correction: Tuple[float, float] = (0.0, 0.0)):
+        """Aim at a normalized image position (the angles are computed by the hardware process)."""
+        self._write({CMD_AIM: AIM_IMAGE, CMD_X: center_x, CMD_Y: center_y, CMD_CORR_PAN: correction[0], CMD_CORR_TILT: correction[1]})
+
+    def set_angles(self, pan_angle: float, tilt_angle: float):
+        """Move the servos to angles relative to center."""
+        self._write({CMD_AIM: AIM_ANGLES, CMD_X: pan_angle, CMD_Y: tilt_angle})
+
+    def set_laser(self, on: bool, force: bool = False):
+        """Laser on, or off (force skips the minimum on dwell time, as LaserController.turn_off)."""
+        self._write({CMD_LASER: 1.0 if on else 0.0, CMD_LASER_FORCE: 1.0 if force and not on else 0.0})
+
+    def set_sleep(self, sleeping: bool):
+        """Laser off and PCA9685 asleep (True), or awake again (False)."""
+        self._write({CMD_SLEEP: 1.0 if sleeping else 0.0})
+
+    def heartbeat_age(self) -> float:
+        """Seconds since the hardware process last wrote its status."""
+        return time.monotonic() - self.status[ST_TIME]
+
+    def is_healthy(self) -> bool:
+        return self.process.is_alive() and self.heartbeat_age() <= self.watchdog_seconds
+
+    def stats(self) -> dict:
+        """
+        Get the control plane state.
+
+        Returns:
+            dict: alive, heartbeat age (s), heartbeats, commands published, laser on, safety and
+                  watchdog trips, control loop overruns
+        """
+        status = self.status[:]
+        return {
+            'alive': self.process.is_alive(),
+            'heartbeat_age': time.monotonic() - status[ST_TIME],
+            'heartbeats': int(status[ST_HEARTBEAT]),
+            'published': self.published,
+            'laser_on': bool(status[ST_LASER_ON]),
+            'safety_trips': int(status[ST_SAFETY_TRIPS]),
+            'watchdog_trips': int(status[ST_WATCHDOG_TRIPS]),
+            'overruns': int(status[ST_OVERRUNS]),
+        }
+
+    def stop(self, timeout: float = 5.0):
+        """Turn the laser off, stop the hardware process (it centers the servos and releases the hardware). Idempotent."""
+        if self.process.is_alive():
+            self.set_laser(False, force=True)
+            self.stop_event.set()
+            self.process.join(timeout)
+            if self.process.is_alive():
+                logging.error("Hardware process did not stop, terminating it")
+                self.process.terminate() # SIGTERM, still handled as a clean stop
+                self.process.join(timeout)
+
+
+class RemotePanTilt:
+    """Stands in for PanTiltController in the producer process, forwarding to the hardware process."""
+
+    def __init__(self, client: HardwareClient, config: AppConfig):
+        self.client = client
+        self.pan_config = config.servo.pan
+        self.tilt_config = config.servo.tilt
+        self.exclusion_mask = None # Enforced in the hardware process, next to the laser
+
+    def calculate_angles(self, center_x: float, center_y: float) -> Tuple[float, float]:
+        return angles_for_position(center_x, center_y, self.pan_config, self.tilt_config)
+
+    def update_if_needed(self, center_x: float, center_y: float, correction: Tuple[float, float] = (0.0, 0.0)) -> bool:
+        self.client.set_target(center_x, center_y, correction)
+        return True
+
+    def move(self, pan_angle: float, tilt_angle: float):
+        self.client.set_angles(pan_angle, tilt_angle)
+
+    def sleep(self):
+        self.client.set_sleep(True)
+
+    def wake(self):
+        self.client.set_sleep(False)
+
+    def get_position(self) -> tuple:
+        status = self.client.status
+        return (status[ST_PAN], status[ST_TILT])
+
+    def cleanup(self):
+        self.client.stop()
+
+
+class RemoteLaser:
+    """Stands in for LaserController in the producer process, forwarding to the hardware process."""
+
+    def __init__(self, client: HardwareClient):
+        self.client = client
+
+    def turn_on(self) -> bool:
+        """
+        Request the laser on.
+
+        Returns:
+            bool: True if the hardware process reports the laser on. The request is applied on its
+                  next control tick, so this is the state of the previous one: it stays False while
+                  the interlock, a lockout or the off dwell time hold the laser off.
+        """
+        self.client.set_laser(True)
+        return self.is_on()
+
+    def turn_off(self, force: bool = False) -> bool:
+        self.client.set_laser(False, force=force)
+        return not self.is_on()
+
+    def is_on(self) -> bool:
+        return bool(self.client.status[ST_LASER_ON])
+
+    def stats(self) -> dict:
+        stats = self.client.stats()
+        return {'state': ON if stats['laser_on'] else OFF, 'safety_trips': stats['safety_trips']}
+
+    def cleanup(self):
+        self.client.stop()
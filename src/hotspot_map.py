@@ -0,0 +1,180 @@
+"""
+Hotspot Map Module
+
+Learns where targets show up, so the turret can wait there instead of at the center: time to
+first hit is dominated by servo travel from wherever the turret rests when a bird lands.
+
+The map is a 2D occupancy histogram in servo-angle space (pan, tilt relative to the calibrated
+centers) with exponential decay, so hotspots that go quiet fade out with the configured half-life.
+The detection callback only appends the aim angles of each engaged frame to a bounded queue;
+the GLib main loop periodically drains it with one vectorized accumulation into the fixed grid,
+decays the grid for the elapsed time and picks the park position: the cell whose neighbourhood
+holds the most weight.
+
+The grid, and the time-to-first-hit sums per start position, are saved under logs_dir and loaded
+at startup, so a restart neither forgets the hotspots nor the before/after comparison.
+"""
+
+import os
+import time
+import logging
+import numpy as np
+from collections import deque
+from typing import Optional, Tuple
+
+from .config import HotspotConfig
+
+FROM_HOTSPOT = 'hotspot'
+FROM_ELSEWHERE = 'elsewhere'
+
+
+def box_sum(grid: np.ndarray, cells: int) -> np.ndarray:
+    """Sum of each cell's square neighbourhood of the given radius in cells (zero beyond the edges)."""
+    if cells <= 0:
+        return grid
+    # Separable: a window sum down the columns, then along the rows
+    rows, columns = grid.shape
+    padded = np.pad(grid, ((cells, cells), (0, 0)))
+    vertical = np.zeros_like(grid)
+    for dy in range(2 * cells + 1):
+        vertical += padded[dy:dy + rows]
+    padded = np.pad(vertical, ((0, 0), (cells, cells)))
+    total = np.zeros_like(grid)
+    for dx in range(2 * cells + 1):
+        total += padded[:, dx:dx + columns]
+    return total
+
+
+class HotspotMap:
+    def __init__(self, config: HotspotConfig, pan_limits: Tuple[float, float], tilt_limits: Tuple[float, float],
+                 path: str, clock=time.time):
+        """
+        Initialize the map over the reachable servo range, loading the saved one if it matches.
+
+        Args:
+            config (HotspotConfig): The hotspots section of the configuration
+            pan_limits (tuple): (min, max) pan angle relative to center
+            tilt_limits (tuple): (min, max) tilt angle relative to center
+            path (str): File the map is saved to and loaded from (.npz)
+            clock: Wall-clock time source in seconds; decay spans restarts, so not monotonic
+        """
+        self.resolution = config.resolution_degrees
+        self.half_life = config.half_life_hours * 3600
+        self.min_weight = config.min_weight
+        self.smoothing_cells = int(round(config.smoothing_degrees / self.resolution))
+        self.path = path
+        self.clock = clock
+
+        self.pan_min, self.pan_max = pan_limits
+        self.tilt_min, self.tilt_max = tilt_limits
+        self.columns = int(np.ceil((self.pan_max - self.pan_min) / self.resolution)) + 1
+        self.rows = int(np.ceil((self.tilt_max - self.tilt_min) / self.resolution)) + 1
+
+        self.grid = np.zeros((self.rows, self.columns), dtype=np.float64)
+        self.updated_at = self.clock()
+        self.pending = deque(maxlen=config.max_pending) # (pan, tilt) samples, appended by the callback
+        self.first_hit_seconds = {FROM_HOTSPOT: 0.0, FROM_ELSEWHERE: 0.0}
+        self.first_hit_count = {FROM_HOTSPOT: 0, FROM_ELSEWHERE: 0}
+        self.park_position = None # Read by the callback, rebound (never mutated) by flush()
+        self.load()
+        self.flush() # Decays a loaded map for the downtime
+
+    def record(self, pan: float, tilt: float):
+        """Add one aim sample. Called from the streaming thread: a single deque append."""
+        self.pending.append((pan, tilt))
+
+    def flush(self) -> bool:
+        """
+        Decay the grid to now and accumulate the pending samples into it. Runs as a GLib timer.
+
+        Returns:
+            bool: True, to keep the timer
+        """
+        now = self.clock()
+        if now > self.updated_at:
+            self.grid *= 0.5 ** ((now - self.updated_at) / self.half_life)
+        self.updated_at = now
+
+        count = len(self.pending)
+        if count:
+            samples = np.array([self.pending.popleft() for _ in range(count)], dtype=np.float64)
+            columns = np.clip(((samples[:, 0] - self.pan_min) / self.resolution).astype(np.intp), 0, self.columns - 1)
+            rows = np.clip(((samples[:, 1] - self.tilt_min) / self.resolution).astype(np.intp), 0, self.rows - 1)
+            self.grid += np.bincount(rows * self.columns + columns, minlength=self.grid.size).reshape(self.grid.shape)
+
+        self.park_position = self._hotspot()
+        return True
+
+    def _hotspot(self) -> Optional[Tuple[float, float]]:
+        """(pan, tilt) at the center of the densest neighbourhood, None until it holds min_weight."""
+        density = box_sum(self.grid, self.smoothing_cells)
+        row, column = np.unravel_index(int(np.argmax(density)), density.shape)
+        if density[row, column] < self.min_weight:
+            return None
+        return (
+            float(min(self.pan_min + (column + 0.5) * self.resolution, self.pan_max)),
+            float(min(self.tilt_min + (row + 0.5) * self.resolution, self.tilt_max)),
+        )
+
+    def record_first_hit(self, seconds: float, from_hotspot: bool):
+        """Add the time to first hit of an engagement, by where the turret waited before it."""
+        origin = FROM_HOTSPOT if from_hotspot else FROM_ELSEWHERE
+        self.first_hit_seconds[origin] += seconds
+        self.first_hit_count[origin] += 1
+
+    def mean_time_to_first_hit(self) -> dict:
+        return {
+            origin: self.first_hit_seconds[origin] / count if count else None
+            for origin, count in self.first_hit_count.items()
+        }
+
+    def save(self) -> bool:
+        """
+        Write the map atomically (temp file, then rename). Runs as a GLib timer.
+
+        Returns:
+            bool: True, to keep the timer
+        """
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temp_path = self.path + '.tmp.npz'
+            np.savez(
+                temp_path,
+                grid=self.grid,
+                updated_at=self.updated_at,
+                bounds=np.array([self.pan_min, self.pan_max, self.tilt_min, self.tilt_max, self.resolution]),
+                first_hit_seconds=np.array([self.first_hit_seconds[FROM_HOTSPOT], self.first_hit_seconds[FROM_ELSEWHERE]]),
+                first_hit_count=np.array([self.first_hit_count[FROM_HOTSPOT], self.first_hit_count[FROM_ELSEWHERE]]),
+            )
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.error(f"Failed to save the hotspot map to {self.path}: {e}")
+        return True
+
+    def load(self):
+        """Restore a saved map; one saved for other servo limits or another resolution is ignored."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as saved:
+                bounds = [self.pan_min, self.pan_max, self.tilt_min, self.tilt_max, self.resolution]
+                if saved['grid'].shape != self.grid.shape or not np.allclose(saved['bounds'], bounds):
+                    logging.warning(f"Hotspot map {self.path} was saved for other servo limits, starting empty")
+                    return
+                self.grid = saved['grid'].astype(np.float64)
+                self.updated_at = float(saved['updated_at'])
+                for index, origin in enumerate((FROM_HOTSPOT, FROM_ELSEWHERE)):
+                    self.first_hit_seconds[origin] = float(saved['first_hit_seconds'][index])
+                    self.first_hit_count[origin] = int(saved['first_hit_count'][index])
+            logging.info(f"Hotspot map loaded from {self.path}")
+        except (OSError, KeyError, ValueError) as e:
+            logging.warning(f"Failed to load the hotspot map from {self.path}, starting empty: {e}")
+
+    def stats(self) -> dict:
+        return {
+            'weight': float(self.grid.sum()),
+            'pending': len(self.pending),
+            'park_position': self.park_position,
+            'first_hits': dict(self.first_hit_count),
+            'mean_time_to_first_hit': self.mean_time_to_first_hit(),
+        }
@@ -1,32 +1,98 @@
-import gpiod
+import time
 import logging
+import threading
+
+from .config import LaserConfig
+
+'''
+The laser is driven through a small state machine:
+
+    OFF --turn_on()--> ON --turn_off()--> OFF
+                       |
+                       +--on longer than max_on_seconds--> LOCKOUT --lockout_seconds--> OFF
+
+The last value written to the GPIO line is cached, so the per-frame turn_on()/turn_off() calls
+of the detection callback only reach the hardware (a syscall) when the state actually changes.
+Minimum dwell times keep the laser from flickering on detection noise, and the continuous-on
+timeout is enforced by a timer so it trips even if the callback stops being called.
+
+In 'pwm' mode the laser is wired to a spare PCA9685 channel instead of a GPIO pin. The PCA9685
+generates the strobe itself (its PWM period is shared with the servos, 50 Hz), so a pattern is
+just a duty cycle: Python writes the channel register only on on/off transitions and when the
+pattern changes, never to time individual blinks.
+'''
+
+OFF = 'off'
+ON = 'on'
+LOCKOUT = 'lockout'
+
 
 class LaserController:
-    def __init__(self, config: dict):
+    def __init__(self, config: LaserConfig, line=None, clock=time.monotonic, pwm_channel=None):
         """
         Initialize the laser controller.
-        
+
         Args:
-            config (dict): Configuration dictionary containing laser settings:
+            config (LaserConfig): Laser settings:
                 - gpio_chip (str): The GPIO chip name (e.g., "gpiochip0")
                 - pin (int): The GPIO pin number for the laser
+                - min_on_seconds / min_off_seconds (float): Minimum dwell time in each state
+                - max_on_seconds (float): Continuous-on safety timeout (0 disables it)
+                - lockout_seconds (float): Forced off time after the safety timeout trips
+                - mode (str): 'gpio' or 'pwm'
+                - pattern / patterns: Strobe patterns (duty cycles) used in pwm mode
+            line: Already requested output line to use instead of opening the GPIO chip (e.g. a fake line in tests)
+            clock: Monotonic time source in seconds
+            pwm_channel: PCA9685 channel object (with a 16-bit duty_cycle) driving the laser, required in pwm mode
         """
         try:
             # Extract configuration
-            self.gpio_chip = config['gpio_chip']
-            self.pin = config['pin']
-            
+            self.gpio_chip = config.gpio_chip
+            self.pin = config.pin
+            self.min_on_seconds = config.min_on_seconds
+            self.min_off_seconds = config.min_off_seconds
+            self.max_on_seconds = config.max_on_seconds
+            self.lockout_seconds = config.lockout_seconds
+            self.clock = clock
+            self.mode = config.mode
+            self.patterns = {pattern.name: pattern.duty_cycle for pattern in config.patterns}
+            self.pattern = config.pattern
+
             self.chip = None
             self.line = None
-            
-            # Setup GPIO
-            self._setup_gpio()
-            
-            logging.info(f"Laser controller initialized on {self.gpio_chip} pin {self.pin}")
-            
-        except KeyError as e:
-            logging.error(f"Missing configuration for laser: {e}")
-            raise
+            self.pwm_channel = pwm_channel
+            self._on_value = 1 # Value written when on: 1 for the GPIO line, the pattern duty cycle in pwm mode
+            self.interlock = None # Optional callable, the laser only fires while it returns True
+
+            # State machine
+            self._lock = threading.RLock() # turn_on/off run on the streaming thread, the safety timer on its own
+            self.state = OFF
+            self.line_value = None # Last value written to the line, None until the first write
+            self.state_since = self.clock()
+            self._safety_timer = None
+
+            # Statistics
+            self.started_at = self.state_since
+            self.on_time = 0.0 # Cumulative seconds spent ON
+            self.writes = 0 # GPIO writes that reached the line
+            self.skipped_writes = 0 # Redundant writes that were elided
+            self.safety_trips = 0
+
+            # Setup output
+            if self.mode == 'pwm':
+                if pwm_channel is None:
+                    raise ValueError("pwm mode requires a PCA9685 channel")
+                self._on_value = self.patterns[self.pattern]
+                self.turn_off(force=True)
+                logging.info(f"Laser controller initialized on PCA9685 channel {config.pwm_channel}, pattern '{self.pattern}'")
+            else:
+                if line is not None:
+                    self.line = line
+                    self.turn_off(force=True)
+                else:
+                    self._setup_gpio()
+                logging.info(f"Laser controller initialized on {self.gpio_chip} pin {self.pin}")
+
         except Exception as e:
             logging.error(f"Failed to initialize laser controller: {e}")
             raise
@@ -34,53 +100,186 @@ class LaserController:
     def _setup_gpio(self):
         """
         Set up the GPIO connection for the laser.
-        
+
         Raises:
             Exception: If GPIO setup fails
         """
+        # Imported here: the PWM mode, and the tests with a fake line, do not need libgpiod
+        import gpiod
         try:
             self.chip = gpiod.Chip(self.gpio_chip) # Open GPIO chip for laser control
             self.line = self.chip.get_line(self.pin) # Get GPIO line for laser control (line is a GPIO pin)
             self.line.request(consumer="laser_control", type=gpiod.LINE_REQ_DIR_OUT) # Request control of the line (set as output)
-            self.turn_off()  # Ensure laser starts in OFF state
+            self.turn_off(force=True)  # Ensure laser starts in OFF state
             logging.info(f"Laser GPIO setup complete on {self.gpio_chip} pin {self.pin}")
         except Exception as e:
             logging.error(f"Failed to setup laser GPIO: {e}")
             raise
 
-    def turn_on(self):
+    def _write(self, value: int):
+        """Write the output only if the value differs from the cached one."""
+        if value == self.line_value:
+            self.skipped_writes += 1
+            return
+        if self.pwm_channel is not None:
+            self.pwm_channel.duty_cycle = value # One I2C register write, the PCA9685 then strobes on its own
+        elif self.line:
+            self.line.set_value(value) # HIGH (3.3V) turns the laser on, LOW (0V) turns it off
+        else:
+            return
+        self.line_value = value
+        self.writes += 1
+
+    def set_pattern(self, name: str):
+        """
+        Select the strobe pattern used while the laser is on (pwm mode only).
+        If the laser is on, the new duty cycle is written right away.
+
+        Args:
+            name (str): Pattern name from the laser.pwm.patterns configuration
+        """
+        if self.mode != 'pwm':
+            raise ValueError("Strobe patterns require the laser in pwm mode")
+        if name not in self.patterns:
+            raise KeyError(f"Unknown strobe pattern: {name}")
+        with self._lock:
+            self.pattern = name
+            self._on_value = self.patterns[name]
+            if self.state == ON:
+                self._write(self._on_value)
+        logging.info(f"Laser strobe pattern set to '{name}'")
+
+    def _set_state(self, state: str, now: float):
+        """Transition to a new state, accounting ON time and (dis)arming the safety timer."""
+        if self.state == ON:
+            self.on_time += now - self.state_since
+        self.state = state
+        self.state_since = now
+
+        if self._safety_timer:
+            self._safety_timer.cancel()
+            self._safety_timer = None
+        if state == ON and self.max_on_seconds > 0:
+            self._safety_timer = threading.Timer(self.max_on_seconds, self._on_safety_timeout)
+            self._safety_timer.daemon = True
+            self._safety_timer.start()
+
+    def _on_safety_timeout(self):
+        """Called by the safety timer when the laser stayed on for max_on_seconds."""
+        with self._lock:
+            if self.state != ON:
+                return
+            self._write(0)
+            self._set_state(LOCKOUT, self.clock())
+            self.safety_trips += 1
+        logging.warning(f"Laser on for more than {self.max_on_seconds}s, forced off for {self.lockout_seconds}s")
+
+    def set_interlock(self, interlock):
+        """
+        Set a check that must pass for the laser to fire (e.g. PanTiltController.aim_is_safe).
+        When it fails, turn_on() turns the laser off immediately, ignoring the minimum on time.
+        """
+        self.interlock = interlock
+
+    def turn_on(self) -> bool:
         """
-        Turn the laser on.
+        Request the laser on. Cheap to call every frame.
+
+        Returns:
+            bool: True if the laser is on after the call
         """
         try:
-            if self.line:
-                self.line.set_value(1) # Set GPIO pin to HIGH (3.3V)
-                logging.debug("Laser turned ON")
+            if self.interlock is not None and not self.interlock():
+                self.turn_off(force=True)
+                return False
+            with self._lock:
+                now = self.clock()
+                if self.state == ON:
+                    self.skipped_writes += 1
+                    return True
+                if self.state == LOCKOUT:
+                    if now - self.state_since < self.lockout_seconds:
+                        return False
+                    self._set_state(OFF, now)
+                if now - self.state_since < self.min_off_seconds:
+                    return False # Off dwell not over yet
+                self._write(self._on_value)
+                self._set_state(ON, now)
+            logging.debug("Laser turned ON")
+            return True
         except Exception as e:
             logging.error(f"Failed to turn laser on: {e}")
             raise
 
-    def turn_off(self):
+    def turn_off(self, force: bool = False) -> bool:
         """
-        Turn the laser off.
+        Request the laser off. Cheap to call every frame.
+
+        Args:
+            force (bool): Skip the minimum on dwell time (shutdown, safety)
+
+        Returns:
+            bool: True if the laser is off after the call
         """
         try:
-            if self.line:
-                self.line.set_value(0) # Set GPIO pin to LOW (0V)
-                logging.debug("Laser turned OFF")
+            with self._lock:
+                now = self.clock()
+                if self.state != ON:
+                    self._write(0) # No-op unless the line was never written
+                    return True
+                if not force and now - self.state_since < self.min_on_seconds:
+                    return False # On dwell not over yet
+                self._write(0)
+                self._set_state(OFF, now)
+            logging.debug("Laser turned OFF")
+            return True
         except Exception as e:
             logging.error(f"Failed to turn laser off: {e}")
             raise
 
+    def is_on(self) -> bool:
+        return self.state == ON
+
+    def stats(self) -> dict:
+        """
+        Get laser usage statistics.
+
+        Returns:
+            dict: state, on_seconds, duty (fraction of time on since start), writes, skipped_writes, safety_trips
+        """
+        with self._lock:
+            now = self.clock()
+            on_time = self.on_time + (now - self.state_since if self.state == ON else 0.0)
+            elapsed = now - self.started_at
+            return {
+                'state': self.state,
+                'pattern': self.pattern if self.mode == 'pwm' else None,
+                'on_seconds': on_time,
+                'duty': on_time / elapsed if elapsed > 0 else 0.0,
+                'writes': self.writes,
+                'skipped_writes': self.skipped_writes,
+                'safety_trips': self.safety_trips,
+            }
+
     def cleanup(self):
         """
         Clean up GPIO resources.
         Should be called before program exit.
         """
         try:
-            if self.line: # Check if GPIO line is initialized
-                self.turn_off()  # Ensure laser is off
+            if self.pwm_channel is not None:
+                self.turn_off(force=True)  # The PCA9685 itself is released by the pan/tilt controller
+                self.pwm_channel = None
+                stats = self.stats()
+                logging.info(f"Laser PWM channel released (duty {stats['duty']:.1%}, {stats['writes']} register writes)")
+            elif self.line: # Check if GPIO line is initialized
+                self.turn_off(force=True)  # Ensure laser is off
                 self.line.release() # Release control of the GPIO line (pin)
-                logging.info("Laser GPIO resources cleaned up")
+                self.line = None
+                stats = self.stats()
+                logging.info(
+                    f"Laser GPIO resources cleaned up (duty {stats['duty']:.1%}, "
+                    f"{stats['writes']} writes, {stats['skipped_writes']} redundant writes skipped)"
+                )
         except Exception as e:
-            logging.error(f"Error during laser cleanup: {e}")
\ No newline at end of file
+            logging.error(f"Error during laser cleanup: {e}")
@@ -0,0 +1,233 @@
+"""
+Memory Planner Module
+
+This module works out how much memory the pipeline queues can hold in the worst case and
+keeps it within a configured budget. Every queue's worst case is its max-size-buffers times the
+frame size of its negotiated caps. The plan is redone whenever a queue's caps change, so queues
+that negotiate late (behind a valve, or in a branch attached at runtime) are counted too. If the
+total is over budget the planner either warns or shrinks the largest queues. At runtime it periodically reports RSS (current
+and peak) and the number of buffers in flight, so smaller-RAM boards can be sized safely.
+"""
+
+import gi
+gi.require_version('Gst', '1.0')
+gi.require_version('GstVideo', '1.0')
+from gi.repository import Gst, GstVideo, GLib
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .config import MemoryConfig
+
+MB = 1024 * 1024
+
+
+@dataclass
+class QueuePlan:
+    """Worst-case memory of a single queue element."""
+    name: str
+    caps: str
+    max_size_buffers: int
+    frame_bytes: int
+
+    @property
+    def worst_case_bytes(self) -> int:
+        return self.max_size_buffers * self.frame_bytes
+
+
+def frame_bytes_from_caps(caps: Optional[Gst.Caps]) -> int:
+    """
+    Size in bytes of one buffer with the given caps.
+
+    Raw video sizes come from GstVideo (strides and padding included). Encoded streams have no
+    fixed frame size and return 0, their queues are not counted against the budget.
+    """
+    if caps is None or caps.get_size() == 0:
+        return 0
+    if not caps.get_structure(0).get_name().startswith('video/x-raw'):
+        return 0
+    info = GstVideo.VideoInfo.new_from_caps(caps)
+    return info.size if info else 0
+
+
+def read_rss_kb(status_path: str = '/proc/self/status') -> tuple:
+    """
+    Read the current and peak resident set size of this process.
+
+    Returns:
+        tuple: (VmRSS, VmHWM) in kB, 0 when not available
+    """
+    rss, peak = 0, 0
+    try:
+        with open(status_path) as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss = int(line.split()[1])
+                elif line.startswith('VmHWM:'):
+                    peak = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, peak
+
+
+class MemoryPlanner:
+    def __init__(self, config: MemoryConfig):
+        """
+        Initialize the memory planner.
+
+        Args:
+            config (MemoryConfig): The memory section of the configuration:
+                - budget_mb (float): Budget for the worst-case bytes held by all queues
+                - mode (str): 'warn' to only log, 'auto' to shrink queues until the plan fits
+                - report_interval_seconds (int): Period of the runtime footprint report (0 disables it)
+        """
+        self.budget_bytes = int(config.budget_mb * MB)
+        self.mode = config.mode
+        self.report_interval = config.report_interval_seconds
+
+        self.pipeline = None
+        self.plan: List[QueuePlan] = []
+        self.lock = threading.Lock()
+        self.plan_pending = False
+        self.peak_buffers_in_flight = 0
+
+    def attach(self, pipeline: Gst.Pipeline):
+        """Plan on every caps change of a queue (including queues added later) and schedule the periodic report."""
+        self.pipeline = pipeline
+        for queue in self._queues():
+            self._watch(queue)
+        pipeline.connect('deep-element-added', self._on_element_added)
+        if self.report_interval:
+            GLib.timeout_add_seconds(self.report_interval, self._report_timer)
+
+    def _on_element_added(self, pipeline, bin, element):
+        if isinstance(element, Gst.Bin):
+            it = element.iterate_recurse()
+            while True:
+                result, child = it.next()
+                if result != Gst.IteratorResult.OK:
+                    break
+                self._on_element_added(pipeline, element, child)
+            return
+        factory = element.get_factory()
+        if factory is not None and factory.get_name() == 'queue':
+            self._watch(element)
+
+    def _watch(self, queue):
+        # A queue watched twice only asks for the same coalesced plan twice
+        queue.get_static_pad('sink').connect('notify::caps', self._on_caps_changed)
+
+    def _on_caps_changed(self, pad, pspec):
+        # Streaming thread: plan once on the main loop for a burst of negotiations
+        with self.lock:
+            if self.plan_pending:
+                return
+            self.plan_pending = True
+        GLib.idle_add(self._plan)
+
+    def _queues(self):
+        it = self.pipeline.iterate_recurse()
+        while True:
+            result, element = it.next()
+            if result != Gst.IteratorResult.OK:
+                break
+            factory = element.get_factory()
+            if factory is not None and factory.get_name() == 'queue':
+                yield element
+
+    def build_plan(self) -> List[QueuePlan]:
+        """Compute the worst-case bytes of every queue from its negotiated caps."""
+        plan = []
+        for queue in self._queues():
+            caps = queue.get_static_pad('sink').get_current_caps()
+            plan.append(QueuePlan(
+                name=queue.get_name(),
+                caps=caps.to_string() if caps else 'not negotiated',
+                max_size_buffers=queue.get_property('max-size-buffers'),
+                frame_bytes=frame_bytes_from_caps(caps),
+            ))
+        return sorted(plan, key=lambda item: item.worst_case_bytes, reverse=True)
+
+    def fit_to_budget(self, plan: List[QueuePlan]) -> List[QueuePlan]:
+        """
+        Shrink max-size-buffers, largest queue first, until the plan fits the budget.
+        Queues are never shrunk below one buffer.
+
+        Returns:
+            List[QueuePlan]: The queues that were resized
+        """
+        resized = []
+        total = sum(item.worst_case_bytes for item in plan)
+        while total > self.budget_bytes:
+            candidates = [item for item in plan if item.max_size_buffers > 1 and item.frame_bytes > 0]
+            if not candidates:
+                break
+            largest = max(candidates, key=lambda item: item.worst_case_bytes)
+            largest.max_size_buffers -= 1
+            total -= largest.frame_bytes
+            if largest not in resized:
+                resized.append(largest)
+        return resized
+
+    def _plan(self) -> bool:
+        with self.lock:
+            self.plan_pending = False
+        plan = self.build_plan()
+        # Queues not negotiated yet (e.g. behind a closed valve) hold no frames, they are planned once they are
+        total = sum(item.worst_case_bytes for item in plan)
+
+        self.plan = plan
+        logging.info("Queue memory plan: %.1f MB worst case, budget %.1f MB", total / MB, self.budget_bytes / MB)
+        for item in plan:
+            if item.frame_bytes:
+                logging.info(
+                    "  %s: %d x %.2f MB = %.2f MB (%s)",
+                    item.name, item.max_size_buffers, item.frame_bytes / MB, item.worst_case_bytes / MB, item.caps
+                )
+
+        if total > self.budget_bytes:
+            if self.mode == 'auto':
+                for item in self.fit_to_budget(plan):
+                    self.pipeline.get_by_name(item.name).set_property('max-size-buffers', item.max_size_buffers)
+                    logging.warning(f"Queue {item.name} shrunk to max-size-buffers={item.max_size_buffers} to fit the memory budget")
+                total = sum(item.worst_case_bytes for item in plan)
+                if total > self.budget_bytes:
+                    logging.warning("Queues still need %.1f MB with a single buffer each, over the %.1f MB budget", total / MB, self.budget_bytes / MB)
+            else:
+                logging.warning("Queue memory plan of %.1f MB exceeds the %.1f MB budget", total / MB, self.budget_bytes / MB)
+        return False  # Idle source: once per caps change
+
+    def report(self) -> dict:
+        """
+        Current memory footprint.
+
+        Returns:
+            dict: rss_mb, peak_rss_mb, buffers_in_flight, queued_mb, peak_buffers_in_flight and planned_mb
+        """
+        buffers, queued_bytes = 0, 0
+        if self.pipeline is not None:
+            for queue in self._queues():
+                buffers += queue.get_property('current-level-buffers')
+                queued_bytes += queue.get_property('current-level-bytes')
+        self.peak_buffers_in_flight = max(self.peak_buffers_in_flight, buffers)
+
+        rss_kb, peak_kb = read_rss_kb()
+        return {
+            'rss_mb': rss_kb / 1024,
+            'peak_rss_mb': peak_kb / 1024,
+            'buffers_in_flight': buffers,
+            'peak_buffers_in_flight': self.peak_buffers_in_flight,
+            'queued_mb': queued_bytes / MB,
+            'planned_mb': sum(item.worst_case_bytes for item in self.plan) / MB,
+        }
+
+    def _report_timer(self) -> bool:
+        report = self.report()
+        logging.info(
+            "Memory: RSS %.1f MB (peak %.1f MB), %d buffers in flight (peak %d, %.1f MB queued), plan %.1f MB",
+            report['rss_mb'], report['peak_rss_mb'], report['buffers_in_flight'],
+            report['peak_buffers_in_flight'], report['queued_mb'], report['planned_mb']
+        )
+        return True
@@ -0,0 +1,209 @@
+"""
+Model Switcher Module
+
+Runs a light detection model for surveillance and a heavier one while targets are in view,
+without restarting the pipeline. All HEFs are configured on the Hailo at startup (the models
+share a vdevice and the HailoRT scheduler), and MODEL_SWITCH_PIPELINE routes the frames through
+the active one only, so a switch is two selector pad changes and no model is loaded on demand.
+
+The active model follows:
+- activity: the detection callback reports whether targets are in view (cheap, every frame; a
+  change schedules an evaluation on the main loop, where the selectors are switched);
+- the frame budget: while the engaged model runs slower than frame_budget_ms per frame, the idle
+  model is used instead, and the engaged model is retried after budget_backoff_seconds;
+- a forced model (the thermal controller's 'model' degradation step), which overrides both.
+Switches are at least min_dwell_seconds apart, so activity flickering does not flap the models.
+
+Each switch is timed from the selector change to the first result of the new model reaching the
+callback, and frames are counted per model, so switch latency and per-model FPS are reported.
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Callable, Optional
+
+from .config import ModelsConfig
+
+Gst = GLib = None # Imported on first use: the switching policy itself runs without GStreamer
+
+
+def _import_gi():
+    global Gst, GLib
+    if Gst is None:
+        import gi
+        gi.require_version('Gst', '1.0')
+        from gi.repository import Gst as gst, GLib as glib
+        Gst, GLib = gst, glib
+
+
+class ModelSwitcher:
+    def __init__(self, config: ModelsConfig, clock=time.monotonic, schedule: Callable[[Callable[[], bool]], object] = None):
+        """
+        Initialize the switcher with the idle model active.
+
+        Args:
+            config (ModelsConfig): The models section of the configuration
+            clock: Monotonic time source in seconds
+            schedule: Runs a callback on the main loop (GLib.idle_add by default)
+        """
+        if schedule is None:
+            _import_gi()
+            schedule = GLib.idle_add
+        self.schedule = schedule
+        self.names = [name for name, _ in config.hef_paths]
+        self.idle_model = config.idle_model
+        self.engaged_model = config.engaged_model
+        self.frame_budget = config.frame_budget_ms / 1000.0
+        self.budget_backoff_seconds = config.budget_backoff_seconds
+        self.min_dwell_seconds = config.min_dwell_seconds
+        self.clock = clock
+
+        self.active = self.idle_model
+        self.engaged = False
+        self.forced = None # Model imposed regardless of activity and budget
+        self.over_budget_until = 0.0
+        self.switched_at = self.clock()
+        self.last_switch = float('-inf')
+        self.pending = None # (model, selector change time) until the first result of that model
+        self.evaluation_scheduled = False
+
+        self.selector = None
+        self.join = None
+        self.pads = {} # model -> (output-selector src pad, input-selector sink pad)
+        self.frames = {name: 0 for name in self.names} # Results of each model while active
+        self.active_seconds = {name: 0.0 for name in self.names}
+        self.frames_since_switch = 0
+        self.switches = 0
+        self.switch_latencies = deque(maxlen=32)
+        self.on_switch: Optional[Callable[[dict], None]] = None # Called with each switch metric, e.g. for telemetry
+
+    def attach(self, pipeline, name: str = 'model', inference_name: str = 'inference'):
+        """
+        Find the selectors and the pads of every model in a created pipeline (see MODEL_SWITCH_PIPELINE)
+        and select the idle model.
+
+        Args:
+            pipeline (Gst.Pipeline): The created pipeline
+            name (str): Prefix name of the selector elements
+            inference_name (str): Prefix of the inference pipelines, suffixed with '_<model>'
+        """
+        _import_gi()
+        self.selector = pipeline.get_by_name(f'{name}_selector')
+        self.join = pipeline.get_by_name(f'{name}_join')
+        for model in self.names:
+            first = pipeline.get_by_name(f'{inference_name}_{model}_scale_q')
+            last = pipeline.get_by_name(f'{inference_name}_{model}_hailofilter')
+            selector_pad = first.get_static_pad('sink').get_peer()
+            join_pad = last.get_static_pad('src').get_peer()
+            join_pad.add_probe(Gst.PadProbeType.BUFFER, self._on_result, model)
+            self.pads[model] = (selector_pad, join_pad)
+        self._select(self.active, self.clock())
+
+    def desired(self, now: float) -> str:
+        if self.forced is not None:
+            return self.forced
+        if not self.engaged or now < self.over_budget_until:
+            return self.idle_model
+        return self.engaged_model
+
+    def set_engaged(self, engaged: bool):
+        """Report whether targets are in view. Called by the detection callback every frame."""
+        if engaged == self.engaged:
+            return
+        self.engaged = engaged
+        if not self.evaluation_scheduled:
+            self.evaluation_scheduled = True
+            self.schedule(self._evaluate)
+
+    def force(self, model: Optional[str]):
+        """Impose a model regardless of activity and budget (None to release). Call on the main loop."""
+        self.forced = model
+        self._switch_if_needed(self.clock())
+
+    def poll(self) -> bool:
+        """
+        Check the frame budget and apply switches held back by the dwell time. Runs as a GLib timer.
+
+        Returns:
+            bool: True, to keep the timer
+        """
+        now = self.clock()
+        if self.frame_budget and self.active == self.engaged_model != self.idle_model and self.pending is None:
+            elapsed = now - self.switched_at
+            if elapsed >= 1.0 and self.frames_since_switch and elapsed / self.frames_since_switch > self.frame_budget:
+                self.over_budget_until = now + self.budget_backoff_seconds
+                logging.info(
+                    f"Model {self.active} over the frame budget ({1000 * elapsed / self.frames_since_switch:.1f} ms "
+                    f"> {1000 * self.frame_budget:.1f} ms), using {self.idle_model} for {self.budget_backoff_seconds:.0f}s"
+                )
+        self._switch_if_needed(now)
+        return True
+
+    def _evaluate(self) -> bool:
+        self.evaluation_scheduled = False
+        self._switch_if_needed(self.clock())
+        return False # One-shot idle source
+
+    def _switch_if_needed(self, now: float):
+        model = self.desired(now)
+        if model == self.active or now - self.last_switch < self.min_dwell_seconds:
+            return
+        self._select(model, now)
+
+    def _select(self, model: str, now: float):
+        """Route the frames through the given model, and its results on (main loop)."""
+        selector_pad, join_pad = self.pads[model]
+        self.active_seconds[self.active] += now - self.switched_at
+        previous = self.active
+        self.active = model
+        self.switched_at = now
+        self.frames_since_switch = 0
+        self.pending = (model, now) if previous != model else None
+        self.selector.set_property('active-pad', selector_pad)
+        self.join.set_property('active-pad', join_pad)
+        if previous != model:
+            self.last_switch = now
+            self.switches += 1
+            logging.info(f"Model switched from {previous} to {model}")
+
+    def _on_result(self, pad, info, model: str):
+        """Pad probe: a result of a model reaches the input-selector (streaming thread)."""
+        self.count_result(model)
+        return Gst.PadProbeReturn.OK
+
+    def count_result(self, model: str):
+        """Count a result of a model, and time the switch to it on its first one."""
+        if model != self.active:
+            return # Frames still in flight in the previous model, dropped by the selector
+        self.frames[model] += 1
+        self.frames_since_switch += 1
+        pending = self.pending
+        if pending is not None and pending[0] == model:
+            self.pending = None
+            latency = self.clock() - pending[1]
+            metric = {'model': model, 'latency_ms': round(latency * 1000, 2)}
+            self.switch_latencies.append(metric)
+            logging.info("metric model_switch model=%s latency_ms=%.2f", model, latency * 1000)
+            if self.on_switch is not None:
+                self.on_switch(metric)
+
+    def fps(self) -> dict:
+        """Mean FPS of each model over the time it was active."""
+        now = self.clock()
+        result = {}
+        for model in self.names:
+            seconds = self.active_seconds[model] + (now - self.switched_at if model == self.active else 0.0)
+            result[model] = round(self.frames[model] / seconds, 2) if seconds > 0 else None
+        return result
+
+    def stats(self) -> dict:
+        return {
+            'active': self.active,
+            'engaged': self.engaged,
+            'forced': self.forced,
+            'over_budget': self.clock() < self.over_budget_until,
+            'switches': self.switches,
+            'last_switch_latency_ms': self.switch_latencies[-1]['latency_ms'] if self.switch_latencies else None,
+            'fps': self.fps(),
+        }
@@ -0,0 +1,164 @@
+"""
+NumPy Tracker Module
+
+In-process multi-object tracker, selectable instead of hailotracker (tracker.backend: numpy).
+Unlike hailotracker, whose lifetimes are counted in frames and so change with the FPS, track
+lifetimes here are in seconds, and it runs without the Hailo plugins.
+
+Each frame, the track boxes are moved forward with their constant-velocity estimate, then
+detections are associated with the predicted boxes from a vectorized IoU matrix, falling back to
+centroid distance for small or fast targets that no longer overlap their prediction. A new track
+is tentative (no ID exposed) until it has been matched for confirm_seconds; a confirmed track
+survives keep_lost_seconds without detections, coasting on its velocity.
+
+The application attaches the IDs to the detections as HAILO_UNIQUE_ID objects, so the rest of the
+detection callback does not know which tracker produced them.
+"""
+
+import time
+import numpy as np
+
+from .config import TrackerConfig
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU of every box of a (M, 4) with every box of b (K, 4), boxes as (xmin, ymin, xmax, ymax)."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.maximum(x2 - x1, 0) * np.maximum(y2 - y1, 0)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+
+class NumpyTracker:
+    def __init__(self, config: TrackerConfig, clock=time.monotonic):
+        """
+        Initialize the tracker with room for config.max_tracks tracks.
+
+        Args:
+            config (TrackerConfig): The tracker section of the configuration
+            clock: Monotonic time source in seconds, used when update() is not given a time
+        """
+        self.iou_threshold = config.iou_threshold
+        self.max_center_distance = config.max_center_distance
+        self.confirm_seconds = config.confirm_seconds
+        self.keep_lost_seconds = config.keep_lost_seconds
+        self.velocity_smoothing = config.velocity_smoothing
+        self.capacity = config.max_tracks
+        self.clock = clock
+
+        self.boxes = np.zeros((self.capacity, 4), dtype=np.float32)
+        self.velocity = np.zeros((self.capacity, 4), dtype=np.float32) # Box change per second
+        self.last_update = np.zeros(self.capacity, dtype=np.float64)
+        self.first_seen = np.zeros(self.capacity, dtype=np.float64)
+        self.ids = np.zeros(self.capacity, dtype=np.int64)
+        self.active = np.zeros(self.capacity, dtype=bool)
+        self.confirmed = np.zeros(self.capacity, dtype=bool)
+
+        self.next_id = 1
+        self.created = 0
+        self.dropped = 0 # Detections not tracked because all slots were taken
+
+    def predict(self, slots: np.ndarray, now: float) -> np.ndarray:
+        """Boxes of the given slots moved forward to now with their constant-velocity estimate."""
+        return self.boxes[slots] + self.velocity[slots] * (now - self.last_update[slots])[:, None]
+
+    def _associate(self, detections: np.ndarray, slots: np.ndarray, predicted: np.ndarray):
+        """Greedy association, best score first. Returns matched (detection indices, slots)."""
+        if len(detections) == 0 or len(slots) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+        iou = iou_matrix(detections, predicted)
+        offset = (detections[:, None, :2] + detections[:, None, 2:] - predicted[None, :, :2] - predicted[None, :, 2:]) / 2
+        distance = np.hypot(offset[..., 0], offset[..., 1]) # Between box centers
+
+        # Overlap matches rank above distance-only matches, which rank by closeness (0 disables those)
+        if self.max_center_distance > 0:
+            closeness = np.where(distance <= self.max_center_distance, 1.0 - distance / self.max_center_distance, 0.0)
+        else:
+            closeness = 0.0
+        score = np.where(iou >= self.iou_threshold, 1.0 + iou, closeness)
+        candidates = np.argwhere(score > 0)
+        order = np.argsort(-score[candidates[:, 0], candidates[:, 1]], kind='stable')
+
+        matched_detections, matched_slots = [], []
+        detection_used = np.zeros(len(detections), dtype=bool)
+        track_used = np.zeros(len(slots), dtype=bool)
+        for d, t in candidates[order]:
+            if not detection_used[d] and not track_used[t]:
+                detection_used[d] = track_used[t] = True
+                matched_detections.append(d)
+                matched_slots.append(slots[t])
+        return np.array(matched_detections, dtype=np.intp), np.array(matched_slots, dtype=np.intp)
+
+    def update(self, detections: np.ndarray, now: float = None) -> np.ndarray:
+        """
+        Track one frame of detections.
+
+        Args:
+            detections (np.ndarray): (M, 4) normalized boxes (xmin, ymin, xmax, ymax)
+            now (float): Frame time in seconds, defaults to the clock
+
+        Returns:
+            np.ndarray: (M,) track ID of each detection, 0 while its track is tentative
+        """
+        now = self.clock() if now is None else now
+        detections = np.asarray(detections, dtype=np.float32).reshape(-1, 4)
+
+        slots = np.flatnonzero(self.active)
+        predicted = self.predict(slots, now)
+        matched_detections, matched_slots = self._associate(detections, slots, predicted)
+
+        # Matched tracks: smooth the velocity, take the detected box
+        if len(matched_slots):
+            elapsed = np.maximum(now - self.last_update[matched_slots], 1e-3)[:, None]
+            observed = (detections[matched_detections] - self.boxes[matched_slots]) / elapsed
+            alpha = self.velocity_smoothing
+            self.velocity[matched_slots] = alpha * observed + (1 - alpha) * self.velocity[matched_slots]
+            self.boxes[matched_slots] = detections[matched_detections]
+            self.last_update[matched_slots] = now
+            self.confirmed[matched_slots] |= now - self.first_seen[matched_slots] >= self.confirm_seconds
+
+        # Unmatched tracks: tentative ones are dropped at their first miss, confirmed ones coast
+        unmatched = np.zeros(self.capacity, dtype=bool)
+        unmatched[slots] = True
+        unmatched[matched_slots] = False
+        expired = unmatched & (~self.confirmed | (now - self.last_update > self.keep_lost_seconds))
+        self.active[expired] = False
+        self.confirmed[expired] = False
+
+        # Unmatched detections start tentative tracks in free slots
+        track_of = np.full(len(detections), -1, dtype=np.intp)
+        track_of[matched_detections] = matched_slots
+        new_detections = np.flatnonzero(track_of < 0)
+        if len(new_detections):
+            free = np.flatnonzero(~self.active)[:len(new_detections)]
+            self.dropped += len(new_detections) - len(free)
+            new_detections = new_detections[:len(free)]
+            self.boxes[free] = detections[new_detections]
+            self.velocity[free] = 0.0
+            self.last_update[free] = now
+            self.first_seen[free] = now
+            self.ids[free] = np.arange(self.next_id, self.next_id + len(free))
+            self.active[free] = True
+            self.confirmed[free] = self.confirm_seconds <= 0
+            self.next_id += len(free)
+            self.created += len(free)
+            track_of[new_detections] = free
+
+        result = np.zeros(len(detections), dtype=np.int64)
+        tracked = track_of >= 0
+        result[tracked] = np.where(self.confirmed[track_of[tracked]], self.ids[track_of[tracked]], 0)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            'tracks': int(self.active.sum()),
+            'confirmed': int(self.confirmed.sum()),
+            'created': self.created,
+            'dropped': self.dropped,
+        }
@@ -7,25 +7,51 @@ Hailo's ML acceleration and hardware control for the bird deterrent system.
 
 import gi
 gi.require_version('Gst', '1.0')
-from gi.repository import Gst, GLib
+gi.require_version('GstVideo', '1.0')
+from gi.repository import Gst, GLib, GstVideo
 
 import os
+import time
+import signal
 import hailo
+import dataclasses
 import logging
 import traceback
+from collections import deque
 from typing import Optional, Tuple
 
 from .config import load_config
-from .pan_tilt_controller import PanTiltController
-from .laser_controller import LaserController
+from .async_logging import setup_async_logging
+from .event_recorder import EventClipRecorder
+from .preview_server import PreviewServer
+from .memory_planner import MemoryPlanner
+from .visual_servo import VisualServo
+from .engagement_scheduler import EngagementScheduler
+from .track_evidence import TrackEvidence
+from .hotspot_map import HotspotMap
+from .numpy_tracker import NumpyTracker
+from .synthetic_source import AppSourceFeeder
+from .sampling_profiler import SamplingProfiler
+from .control_server import ControlServer
+from .telemetry import TelemetryShipper
+from .operating_schedule import OperatingSchedule
+from .thermal_controller import ThermalController
+from .pipeline_builder import BranchManager
+from .model_switcher import ModelSwitcher
+from .hardware_process import init_hardware, HardwareClient, RemotePanTilt, RemoteLaser
 from .g_streamer_app import (
     GStreamerApp,
     SOURCE_PIPELINE, # Gets frames (video) from Raspberry Pi camera
+    DUAL_SOURCE_PIPELINE, # Or an inference-size and a full-size stream from the camera
     INFERENCE_PIPELINE, # Runs MLmodel inference on frames using Hailo
     TRACKER_PIPELINE, # 
     USER_CALLBACK_PIPELINE, # Where we process the inference results
     DISPLAY_PIPELINE, # Displays the video with bounding boxes
+    RECORDER_PIPELINE, # Encodes frames into the pre-roll ring of the event clip recorder
+    PREVIEW_PIPELINE, # Encodes JPEG frames for the MJPEG preview server, only while viewed
+    MODEL_SWITCH_PIPELINE, # Runs one of several preloaded inference pipelines, switched at runtime
     app_callback_class,
+    get_caps_from_pad,
 )
 
 class ObjectTargetingApp(GStreamerApp):
@@ -57,27 +83,156 @@ class ObjectTargetingApp(GStreamerApp):
 
         # 3. Initialize hardware components
         self._init_hardware()
+        self.clip_recorder = None
+        if self.config.recording.enabled:
+            self.clip_recorder = EventClipRecorder(self.config.recording)
+        self.visual_servo = None
+        if self.config.visual_servo.enabled:
+            self.visual_servo = VisualServo(self.config.visual_servo, self.config.fov)
+        self.frame_size = None # (width, height, row stride in bytes) of the callback frames, read from the caps once
+        self.tracker = None
+        if self.config.tracker.backend == 'numpy':
+            self.tracker = NumpyTracker(self.config.tracker) # Replaces the hailotracker element
+        self.evidence = None
+        if self.config.evidence.enabled:
+            self.evidence = TrackEvidence(self.config.evidence)
+        self.hotspots = None
+        if self.config.hotspots.enabled:
+            servo_config = self.config.servo
+            self.hotspots = HotspotMap(
+                self.config.hotspots,
+                (servo_config.pan.min_angle, servo_config.pan.max_angle),
+                (servo_config.tilt.min_angle, servo_config.tilt.max_angle),
+                os.path.join(self.config.paths.logs_dir, 'hotspot_map.npz'),
+            )
+            GLib.timeout_add(int(self.config.hotspots.flush_interval_seconds * 1000), self.hotspots.flush)
+            GLib.timeout_add(int(self.config.hotspots.save_interval_seconds * 1000), self.hotspots.save)
+        self.models = None
+        if self.config.models.enabled:
+            self.models = ModelSwitcher(self.config.models)
+        self.scheduler = None
+        if self.config.scheduler.enabled:
+            self.scheduler = EngagementScheduler(self.config.scheduler)
+        self.profiler = None
+        if self.config.profiler.enabled:
+            # Idle until triggered: `kill -USR1 <pid>` profiles for profiler.default_seconds
+            self.profiler = SamplingProfiler(self.config.profiler, self.config.paths.logs_dir)
+            GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGUSR1, self._on_profile_signal)
 
         # 4. Setup detection callback (which is called for each frame)
         self.app_callback = self._detection_callback
 
         # 5. Create the GStreamer pipeline
         self.create_pipeline() # uses get_pipeline_string() which we created here below, to create the pipeline
+        if self.models:
+            self.models.attach(self.pipeline)
+            GLib.timeout_add(int(self.config.models.poll_interval_seconds * 1000), self.models.poll)
+        self.app_source = None
+        if self.source_type in ('synthetic', 'raw'):
+            self.app_source = AppSourceFeeder(self.config.source)
+            self.app_source.attach(self.pipeline)
+        self.preview_server = None
+        if self.config.preview.enabled:
+            self.preview_server = PreviewServer(self.config.preview)
+        self.branches = None
+        if self.config.pipeline.dynamic_branches:
+            # Recorder and preview are not in the pipeline string, attach them now (and detach or
+            # re-attach them later through the control API)
+            self.branches = BranchManager(self.pipeline)
+            for name in self._branch_descriptions():
+                self._attach_branch(name)
+        else:
+            if self.clip_recorder:
+                self.clip_recorder.attach(self.pipeline)
+            if self.preview_server:
+                self.preview_server.attach(self.pipeline)
+        if self.preview_server:
+            self.preview_server.start()
+        self.memory_planner = None
+        if self.config.memory.enabled:
+            self.memory_planner = MemoryPlanner(self.config.memory)
+            self.memory_planner.attach(self.pipeline)
         
         # 6. Initialize the ID of the person being tracked
         self.tracked_id = None 
+        self.engaged = False # True while the laser is on a target, used to detect engagement start
+        self.engaged_since = None
+        self.last_target_seen = time.monotonic() # The turret parks at the hotspot once idle long enough
+        self.parked_at_hotspot = False
+        self.first_hit_origin = None # (pan, tilt, from_hotspot) of the engagement until its first hit
+
+        # 7. Runtime state changed through the control API (read by the callback, set on the main loop)
+        self.laser_paused = False
+        self.manual_aim = None # (pan, tilt, until, laser) while a manual aim holds, tracking is suspended
+        self.manual_aim_pending = False # Servos still have to be moved to the manual aim
+        self.fps = None
+        self.avg_fps = None
+        self.control_server = None
+        if self.config.control.enabled:
+            self.control_server = ControlServer(self.config.control)
+            self._register_control_methods()
+            self.control_server.start()
+        self.telemetry = None
+        if self.config.telemetry.enabled:
+            self.telemetry = TelemetryShipper(self.config.telemetry, os.path.join(self.config.paths.logs_dir, 'telemetry_spool'))
+            self.telemetry.add_health_source('pipeline', lambda: {'fps': self.fps, 'avg_fps': self.avg_fps})
+            self.telemetry.add_health_source('laser', self.laser.stats)
+            if self.scheduler:
+                self.telemetry.add_health_source('scheduler', self.scheduler.stats)
+            if self.hardware:
+                self.telemetry.add_health_source('hardware', self.hardware.stats)
+            if self.memory_planner:
+                self.telemetry.add_health_source('memory', self.memory_planner.report)
+            if self.hotspots:
+                self.telemetry.add_health_source('hotspots', self._hotspot_stats)
+            if self.visual_servo:
+                # Looked up on each sample: the servo is dropped if the frames turn out not to be RGB
+                self.telemetry.add_health_source('visual_servo', lambda: self.visual_servo.stats() if self.visual_servo else None)
+            if self.models:
+                self.models.on_switch = lambda metric: self.telemetry.record('model_switch', **metric)
+            if self.branches:
+                self.branches.on_reconfigure = lambda metric: self.telemetry.record('branch_reconfigure', **metric)
+            self.telemetry.start()
+
+        # 8. Operating windows: outside them the pipeline is parked in PAUSED and the PCA9685 sleeps
+        self.suspended = False
+        self.resume_started = None # Set when a resume is requested, cleared by the first frame after it
+        self.resume_latencies = deque(maxlen=32) # Seconds from resume request to first processed frame
+        self.schedule = None
+        if self.config.operating_windows.enabled:
+            self.schedule = OperatingSchedule(self.config.operating_windows)
+            GLib.idle_add(self._check_operating_window, False) # As soon as the main loop runs
+            GLib.timeout_add_seconds(int(self.config.operating_windows.check_interval_seconds), self._check_operating_window, True)
+
+        # 9. Thermal degradation
+        self.thermal = None
+        if self.config.thermal.enabled:
+            self.thermal = ThermalController(self.config.thermal)
+            self._register_thermal_steps()
+            if self.telemetry:
+                self.thermal.on_transition = lambda metric: self.telemetry.record('thermal_transition', **metric)
+            GLib.timeout_add(int(self.config.thermal.poll_interval_seconds * 1000), self.thermal.poll)
     
     def _setup_logging(self):
         """Configure logging for the application.
             1. Creates logs directory if it doesn't exist
             2. Sets up logging into 'hailort.log'
+            3. If 'logging.async' is enabled, records go through a bounded queue to a
+               background writer so the streaming thread never blocks on file I/O
         """
-        logs_dir = self.config['paths'].get('logs_dir', 'logs')
+        logs_dir = self.config.paths.logs_dir
         os.makedirs(logs_dir, exist_ok=True)
-        
+        log_path = os.path.join(logs_dir, 'hailort.log')
+
+        logging_config = self.config.logging
+        self.log_pipeline = None
+        if logging_config.use_async:
+            self.log_pipeline = setup_async_logging(log_path, logging_config)
+            return
+
         logging.basicConfig(
-            filename=os.path.join(logs_dir, 'hailort.log'),
-            level=logging.INFO,
+            filename=log_path,
+            level=logging.getLevelName(logging_config.level),
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
     
@@ -85,11 +240,11 @@ class ObjectTargetingApp(GStreamerApp):
         """Create arguments for GStreamer initialization."""
         from argparse import Namespace
         return Namespace(
-            input="rpi", # we are using raspbery pi camera
+            input=self.config.source.type, # "rpi" for the raspberry pi camera, or an appsrc source
             use_frame=False,
             show_fps=True,
             arch="hailo8l", # we are using hailo8l chip (not hailo8)
-            hef_path=self.config['paths']['model']['hef_path'], # our hef model suited for hailo8l chip
+            hef_path=self.config.paths.hef_path, # our hef model suited for hailo8l chip
             disable_sync=True,
             dump_dot=False
         )
@@ -98,13 +253,18 @@ class ObjectTargetingApp(GStreamerApp):
         try:
             logging.info("Initializing hardware components...")
 
-            # Initialize pan/tilt servos
-            logging.info("Initializing pan/tilt servos...")
-            self.pan_tilt = PanTiltController(config=self.config)
-
-            # Initialize laser
-            logging.info("Initializing laser...")
-            self.laser = LaserController(config=self.config['laser'])
+            self.hardware = None
+            if self.config.control_plane.enabled:
+                # Servos and laser run in their own process, driven through shared memory
+                logging.info("Starting the hardware process...")
+                self.hardware = HardwareClient(self.config)
+                self.pan_tilt = RemotePanTilt(self.hardware, self.config)
+                self.laser = RemoteLaser(self.hardware)
+                GLib.timeout_add(int(self.config.control_plane.watchdog_seconds * 1000), self._check_hardware)
+            else:
+                # Initialize pan/tilt servos and laser
+                logging.info("Initializing pan/tilt servos and laser...")
+                self.pan_tilt, self.laser = init_hardware(self.config)
 
             logging.info("All hardware components initialized successfully")
 
@@ -113,6 +273,20 @@ class ObjectTargetingApp(GStreamerApp):
             self.cleanup()
             raise
     
+    def _on_profile_signal(self) -> bool:
+        """SIGUSR1 (dispatched by the GLib main loop): take a profile."""
+        if not self.profiler.start():
+            logging.warning("A profile is already being taken")
+        return True # Keep the signal source
+
+    def _check_hardware(self) -> bool:
+        """GLib timer: report a hardware process that stopped sending heartbeats."""
+        if self.hardware is None:
+            return False
+        if not self.hardware.is_healthy():
+            logging.error(f"Hardware process unhealthy: {self.hardware.stats()}")
+        return True
+
     def _detection_callback(self, pad, info, user_data) -> Gst.PadProbeReturn:
         """Process detection results and control hardware.
         
@@ -136,32 +310,94 @@ class ObjectTargetingApp(GStreamerApp):
                 logging.warning("No buffer received in detection callback")
                 return Gst.PadProbeReturn.OK
             
+            if self.resume_started is not None:
+                self._on_resumed()
+            if self.suspended:
+                self.laser.turn_off(force=True)
+                return Gst.PadProbeReturn.OK
+
+            # A manual aim from the control API suspends tracking until it expires
+            if self.manual_aim is not None and self._hold_manual_aim():
+                return Gst.PadProbeReturn.OK
+
             # Get detections
             rois = hailo.get_roi_from_buffer(buffer)
             all_detections = rois.get_objects_typed(hailo.HAILO_DETECTION)
 
             # Filter for high-confidence person detections and remove non-person detections from ROIs
+            score_threshold = self.config.detection.nms_score_threshold # Read once per frame, not per detection
+            if self.tracker:
+                self._track(all_detections, score_threshold)
             person_detections = []
             for det in all_detections:
-                if det.get_label() == "person" and det.get_confidence() >= self.config['detection']['nms_score_threshold']:
+                if det.get_label() == "person" and det.get_confidence() >= score_threshold:
                     tracking_ids = det.get_objects_typed(hailo.HAILO_UNIQUE_ID)
                     if tracking_ids:
                         person_detections.append(det)
                 else:
                     rois.remove_object(det)  # Remove all objects initially
+            if self.models:
+                self.models.set_engaged(bool(person_detections)) # The heavier model while targets are in view
+
+            # Only engage tracks with sustained evidence; hold still while an engaged track misses a few frames
+            if self.evidence:
+                engaged_ids = set(self.evidence.update({
+                    det.get_objects_typed(hailo.HAILO_UNIQUE_ID)[0].get_id(): det.get_confidence() for det in person_detections
+                }))
+                person_detections = [det for det in person_detections if det.get_objects_typed(hailo.HAILO_UNIQUE_ID)[0].get_id() in engaged_ids]
+                if not person_detections and self.evidence.holding():
+                    return Gst.PadProbeReturn.OK
 
             # If no people detected, turn off laser
             if not person_detections:
                 self.laser.turn_off()
+                if self.engaged and self.telemetry:
+                    self.telemetry.record('engagement_end', duration=time.monotonic() - self.engaged_since)
+                self.engaged = False
+                self.tracked_id = None
+                if self.visual_servo:
+                    self.visual_servo.reset()
+                if self.scheduler:
+                    self.scheduler.reset()
+                if self.hotspots:
+                    self.first_hit_origin = None
+                    self._park_if_idle()
                 return Gst.PadProbeReturn.OK
 
-            # Get person with lowest tracking ID
-            selected_person = min(person_detections, key=lambda x: x.get_objects_typed(hailo.HAILO_UNIQUE_ID)[0].get_id())
+            # Save the pre-roll and the seconds following the last engaged frame as a clip
+            if self.clip_recorder:
+                self.clip_recorder.trigger()
+            if not self.engaged:
+                self.engaged_since = time.monotonic()
+                if self.telemetry:
+                    self.telemetry.record('engagement_start', targets=len(person_detections))
+                if self.hotspots:
+                    self.first_hit_origin = (*self.pan_tilt.get_position(), self.parked_at_hotspot)
+                    self.parked_at_hotspot = False
+            self.engaged = True
+
+            if self.scheduler:
+                # Rotate the laser across the tracked persons, one dwell each
+                selected_person = self._scheduled_target(person_detections)
+            else:
+                # Get person with lowest tracking ID
+                selected_person = min(person_detections, key=lambda x: x.get_objects_typed(hailo.HAILO_UNIQUE_ID)[0].get_id())
+            self.tracked_id = selected_person.get_objects_typed(hailo.HAILO_UNIQUE_ID)[0].get_id()
                 
-            # Calculate target position, turn on laser, and update pan/tilt
+            # Calculate target position, update pan/tilt, then turn on the laser
+            # (pan/tilt first, so the exclusion interlock sees where the servos are going)
             center_x, center_y = self.target_position(selected_person)
-            self.laser.turn_on()
-            self.pan_tilt.update_if_needed(center_x, center_y)
+            correction = (0.0, 0.0)
+            if self.visual_servo:
+                correction = self._visual_servo_correction(pad, buffer, selected_person, center_x, center_y)
+            self.pan_tilt.update_if_needed(center_x, center_y, correction)
+            if self.laser_paused:
+                self.laser.turn_off(force=True)
+            elif self.laser.turn_on() and self.first_hit_origin is not None:
+                self._record_first_hit()
+            if self.hotspots:
+                self.hotspots.record(*self.pan_tilt.get_position())
+                self.last_target_seen = time.monotonic()
 
             return Gst.PadProbeReturn.OK
 
@@ -170,22 +406,388 @@ class ObjectTargetingApp(GStreamerApp):
             traceback.print_exc()
             return Gst.PadProbeReturn.OK
     
+    def _register_thermal_steps(self):
+        """Degradation steps, in the order they are applied under thermal pressure."""
+        thermal_config = self.config.thermal
+
+        # 1. Lower inference rate: the videorate in front of inference drops frames
+        rate = self.pipeline.get_by_name('inference_rate')
+        full_rate = rate.get_property('max-rate')
+        self.thermal.add_step(
+            'inference_rate',
+            lambda: rate.set_property('max-rate', thermal_config.reduced_inference_fps),
+            lambda: rate.set_property('max-rate', full_rate),
+        )
+
+        # 2. Fewer videoconvert threads. A converter only reads n-threads when its caps are set, so
+        # a reconfigure event is sent on its src pad: on the next buffer it sets the (unchanged) caps
+        # again and rebuilds its converter with the new thread count.
+        names = ['source_convert', 'inference_videoconvert']
+        if self.models:
+            names += [f'inference_{model}_videoconvert' for model in self.models.names]
+        converters = [self.pipeline.get_by_name(name) for name in names]
+        converters = [(element, element.get_property('n-threads')) for element in converters if element is not None]
+
+        def set_convert_threads(threads):
+            for element, full_threads in converters:
+                element.set_property('n-threads', threads or full_threads)
+                element.get_static_pad('src').send_event(Gst.Event.new_reconfigure())
+        self.thermal.add_step(
+            'convert_threads',
+            lambda: set_convert_threads(thermal_config.convert_threads),
+            lambda: set_convert_threads(None),
+        )
+
+        # 3. No preview encoding
+        if self.preview_server:
+            self.thermal.add_step(
+                'preview',
+                lambda: self.preview_server.set_allowed(False),
+                lambda: self.preview_server.set_allowed(True),
+            )
+
+        # 4. The light model only, also while engaging
+        if self.models:
+            self.thermal.add_step(
+                'model',
+                lambda: self.models.force(self.models.idle_model),
+                lambda: self.models.force(None),
+            )
+
+    def _check_operating_window(self, repeat: bool) -> bool:
+        """GLib timer: suspend or resume according to the operating windows."""
+        active = self.schedule.is_active()
+        if active and self.suspended:
+            self._resume()
+        elif not active and not self.suspended:
+            self._suspend()
+        return repeat
+
+    def _suspend(self):
+        """
+        Park in a low-power state that resumes fast: the pipeline goes to PAUSED, which keeps the
+        camera open, the caps negotiated and the HEF loaded on the Hailo, but stops streaming; the
+        laser is off and the PCA9685 sleeps.
+        """
+        logging.info("Outside the operating windows, suspending")
+        self.suspended = True # The callback keeps the laser off from now on
+        self.laser.turn_off(force=True)
+        self.pipeline.set_state(Gst.State.PAUSED)
+        self.pipeline.get_state(5 * Gst.SECOND) # Streaming stopped before the servos are touched
+        self.pan_tilt.sleep()
+        self.engaged = False
+        self.tracked_id = None
+        self.parked_at_hotspot = False # Asleep, the servos may drift from the hotspot
+        self.first_hit_origin = None
+        if self.telemetry:
+            self.telemetry.record('suspend')
+
+    def _resume(self):
+        logging.info("Operating window started, resuming")
+        self.resume_started = time.monotonic()
+        self.pan_tilt.wake()
+        self.pipeline.set_state(Gst.State.PLAYING)
+        self.suspended = False
+
+    def _on_resumed(self):
+        """First frame processed after a resume: record the resume latency."""
+        latency = time.monotonic() - self.resume_started
+        self.resume_started = None
+        self.resume_latencies.append(latency)
+        logging.info(f"Resumed in {latency * 1000:.0f} ms (request to first processed frame)")
+        if self.telemetry:
+            self.telemetry.record('resume', latency=latency)
+
+    def _hold_manual_aim(self) -> bool:
+        """Apply the manual aim on the streaming thread (which owns the hardware). False once it expired."""
+        pan, tilt, until, laser_on = self.manual_aim
+        if time.monotonic() >= until:
+            self.manual_aim = None
+            logging.info("Manual aim released, tracking resumed")
+            return False
+        if self.manual_aim_pending:
+            self.manual_aim_pending = False
+            self.pan_tilt.move(pan, tilt)
+            self.parked_at_hotspot = False
+        if laser_on and not self.laser_paused:
+            self.laser.turn_on()
+        else:
+            self.laser.turn_off(force=True)
+        return True
+
+    def _park_if_idle(self):
+        """Move the turret to the hotspot once no target was seen for hotspots.idle_seconds."""
+        if self.parked_at_hotspot or not self.config.hotspots.park:
+            return
+        position = self.hotspots.park_position
+        if position is None or time.monotonic() - self.last_target_seen < self.config.hotspots.idle_seconds:
+            return
+        self.pan_tilt.move(*position)
+        self.parked_at_hotspot = True
+        logging.info("Idle, parked at the hotspot pan=%.1f°, tilt=%.1f°", *position)
+
+    def _record_first_hit(self):
+        """
+        Time to first hit of the engagement, called on frames with the laser on until it is recorded.
+
+        With visual servoing it is measured: from the start of the engagement to the frame where the
+        laser spot is confirmed on the target. Without, it is an estimate: to the first frame with the
+        laser on, plus the servo travel from where the turret waited (which the frame does not show)
+        at exclusion.servo_seconds_per_degree.
+        """
+        if self.visual_servo and not self.visual_servo.converged:
+            return # Spot not on the target yet
+        pan, tilt, from_hotspot = self.first_hit_origin
+        self.first_hit_origin = None
+        seconds = time.monotonic() - self.engaged_since
+        estimated = self.visual_servo is None
+        if estimated:
+            current_pan, current_tilt = self.pan_tilt.get_position()
+            travel = max(abs(current_pan - pan), abs(current_tilt - tilt))
+            seconds += travel * self.config.exclusion.servo_seconds_per_degree
+        self.hotspots.record_first_hit(seconds, from_hotspot)
+        if self.telemetry:
+            self.telemetry.record('first_hit', seconds=seconds, from_hotspot=from_hotspot, estimated=estimated)
+
+    def _hotspot_stats(self) -> dict:
+        # How the time to first hit is obtained (see _record_first_hit)
+        return {**self.hotspots.stats(), 'first_hit_timing': 'estimated' if self.visual_servo is None else 'measured'}
+
+    def _track(self, detections, score_threshold: float):
+        """Run the in-process tracker on the person detections and attach the IDs of confirmed tracks."""
+        persons = [det for det in detections if det.get_label() == "person" and det.get_confidence() >= score_threshold]
+        boxes = []
+        for det in persons:
+            bbox = det.get_bbox()
+            boxes.append((bbox.xmin(), bbox.ymin(), bbox.xmax(), bbox.ymax()))
+        for det, track_id in zip(persons, self.tracker.update(boxes)):
+            if track_id:
+                det.add_object(hailo.HailoUniqueID(int(track_id)))
+
+    def _scheduled_target(self, person_detections):
+        """Let the engagement scheduler pick the target, by track ID and the angles needed to reach it."""
+        targets = {det.get_objects_typed(hailo.HAILO_UNIQUE_ID)[0].get_id(): det for det in person_detections}
+        candidates = {
+            track_id: self.pan_tilt.calculate_angles(*self.target_position(det))
+            for track_id, det in targets.items()
+        }
+        return targets[self.scheduler.select(candidates, self.pan_tilt.get_position())]
+
+    def _visual_servo_correction(self, pad, buffer, selected_person, center_x: float, center_y: float) -> Tuple[float, float]:
+        """Closed-loop angle correction from the laser spot seen in the frame."""
+        if self.frame_size is None:
+            video_format, width, height = get_caps_from_pad(pad)
+            if video_format != 'RGB':
+                logging.warning(f"Visual servoing needs RGB frames, got {video_format}, disabling it")
+                self.visual_servo = None
+                return (0.0, 0.0)
+            # RGB rows are padded to 4 bytes, the stride is not always width * 3
+            info = GstVideo.VideoInfo.new_from_caps(pad.get_current_caps())
+            self.frame_size = (width, height, info.stride[0])
+
+        track_id = selected_person.get_objects_typed(hailo.HAILO_UNIQUE_ID)[0].get_id()
+        width, height, stride = self.frame_size
+        return self.visual_servo.update(buffer, width, height, (center_x, center_y), track_id, stride=stride)
+
+    def on_fps_measurement(self, sink, fps, droprate, avgfps):
+        self.fps = fps
+        self.avg_fps = avgfps
+        return True
+
+    def _register_control_methods(self):
+        """Methods of the local control API (handlers run on the GLib main loop)."""
+        server = self.control_server
+        server.register('status', self._rpc_status)
+        server.register('laser.pause', lambda: self._rpc_pause_laser(True))
+        server.register('laser.resume', lambda: self._rpc_pause_laser(False))
+        server.register('aim', self._rpc_aim)
+        server.register('aim.release', self._rpc_release_aim)
+        server.register('set', self._rpc_set)
+        server.register('profile', self._rpc_profile)
+        server.register('branch.attach', self._rpc_attach_branch)
+        server.register('branch.detach', self._rpc_detach_branch)
+
+    def _rpc_status(self) -> dict:
+        pan, tilt = self.pan_tilt.get_position()
+        return {
+            'fps': self.fps,
+            'avg_fps': self.avg_fps,
+            'tracked_id': self.tracked_id,
+            'engaged': self.engaged,
+            'pan': pan,
+            'tilt': tilt,
+            'laser': self.laser.stats(),
+            'laser_paused': self.laser_paused,
+            'manual_aim': self.manual_aim is not None,
+            'score_threshold': self.config.detection.nms_score_threshold,
+            'scheduler': self.scheduler.stats() if self.scheduler else None,
+            'evidence': self.evidence.stats() if self.evidence else None,
+            'tracker': self.tracker.stats() if self.tracker else None,
+            'visual_servo': self.visual_servo.stats() if self.visual_servo else None,
+            'hotspots': self._hotspot_stats() if self.hotspots else None,
+            'branches': self.branches.stats() if self.branches else None,
+            'models': self.models.stats() if self.models else None,
+            'source': self.app_source.stats() if self.app_source else None,
+            'hardware': self.hardware.stats() if self.hardware else None,
+            'profiling': self.profiler.is_running() if self.profiler else False,
+            'thermal': self.thermal.stats() if self.thermal else None,
+            'suspended': self.suspended,
+            'resume_latency_ms': 1000 * self.resume_latencies[-1] if self.resume_latencies else None,
+        }
+
+    def _rpc_pause_laser(self, paused: bool) -> dict:
+        # The callback turns the laser off on its next frame; with no frames it is already off or
+        # about to be (the laser safety timeout, or the hardware process watchdog)
+        self.laser_paused = paused
+        logging.info(f"Laser {'paused' if paused else 'resumed'} through the control API")
+        return {'laser_paused': paused}
+
+    def _rpc_aim(self, pan: float, tilt: float, hold_seconds: float = 10.0, laser: bool = False) -> dict:
+        for name, value in (('pan', pan), ('tilt', tilt), ('hold_seconds', hold_seconds)):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"{name} must be a number")
+        self.manual_aim = (float(pan), float(tilt), time.monotonic() + hold_seconds, bool(laser))
+        self.manual_aim_pending = True
+        logging.info(f"Manual aim to pan={pan}°, tilt={tilt}° for {hold_seconds}s")
+        return {'pan': pan, 'tilt': tilt, 'hold_seconds': hold_seconds}
+
+    def _rpc_release_aim(self) -> dict:
+        self.manual_aim = None
+        return {'manual_aim': False}
+
+    def _rpc_set(self, name: str, value) -> dict:
+        """Change a runtime parameter."""
+        if name == 'nms_score_threshold':
+            # The config is immutable: swap in a new one (an atomic attribute rebind for the callback).
+            # The NMS threshold of the inference element is fixed at launch, so lowering below it has no effect.
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 1:
+                raise ValueError("nms_score_threshold must be a number in [0, 1]")
+            detection = dataclasses.replace(self.config.detection, nms_score_threshold=float(value))
+            self.config = dataclasses.replace(self.config, detection=detection)
+        elif name == 'laser_pattern':
+            if not hasattr(self.laser, 'set_pattern'):
+                raise ValueError("Strobe patterns are not available with the hardware process")
+            self.laser.set_pattern(value)
+        elif name in ('dwell_seconds', 'cooldown_seconds'):
+            if self.scheduler is None:
+                raise ValueError("The engagement scheduler is not enabled")
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+                raise ValueError(f"{name} must be a non-negative number")
+            setattr(self.scheduler, name, float(value))
+        elif name == 'model':
+            # Impose a model (None releases it to the activity and budget policy)
+            if self.models is None:
+                raise ValueError("Model switching is not enabled")
+            if value is not None and value not in self.models.names:
+                raise ValueError(f"model must be one of {', '.join(self.models.names)} or null")
+            self.models.force(value)
+        elif name == 'preview_allowed':
+            if self.preview_server is None:
+                raise ValueError("The preview server is not enabled")
+            self.preview_server.set_allowed(bool(value))
+        else:
+            raise ValueError(f"Unknown parameter: {name}")
+        logging.info(f"Parameter {name} set to {value!r} through the control API")
+        return {name: value}
+
+    def _rpc_profile(self, seconds: float = None) -> dict:
+        if self.profiler is None:
+            raise ValueError("The profiler is not enabled")
+        return {'started': self.profiler.start(seconds), 'last_output': self.profiler.last_output}
+
+    def _rpc_attach_branch(self, name: str) -> dict:
+        if self.branches is None:
+            raise ValueError("Dynamic branches are not enabled (pipeline.dynamic_branches)")
+        if name not in self._branch_descriptions():
+            raise ValueError(f"Unknown or disabled branch: {name}")
+        return {'branch': name, 'attached': self._attach_branch(name)}
+
+    def _rpc_detach_branch(self, name: str) -> dict:
+        if self.branches is None:
+            raise ValueError("Dynamic branches are not enabled (pipeline.dynamic_branches)")
+        return {'branch': name, 'detached': self.branches.detach(name)}
+
+    def _attach_branch(self, name: str) -> bool:
+        """Attach an optional branch and connect its consumer (the clip recorder or the preview server)."""
+        consumer = {'recorder': self.clip_recorder, 'preview': self.preview_server}[name]
+        return self.branches.attach(name, self._branch_tee(), self._branch_descriptions()[name], on_attached=consumer.attach)
+
+    def shutdown(self, signum=None, frame=None):
+        if self.control_server:
+            self.control_server.stop()
+        super().shutdown(signum, frame)
+
+    def _branch_tee(self) -> str:
+        """Tee the optional branches hang off: the full-resolution stream of a dual-stream source."""
+        return "source_full_tee" if self.config.source.dual_stream else "source_tee"
+
+    def _branch_descriptions(self) -> dict:
+        """Descriptions of the enabled optional branches by name (they must never back-pressure inference)."""
+        descriptions = {}
+        recording_config = self.config.recording
+        if recording_config.enabled:
+            descriptions['recorder'] = RECORDER_PIPELINE(width=recording_config.width, height=recording_config.height, bitrate_kbps=recording_config.bitrate_kbps)
+        preview_config = self.config.preview
+        if preview_config.enabled:
+            descriptions['preview'] = PREVIEW_PIPELINE(width=preview_config.width, height=preview_config.height, max_fps=preview_config.max_fps, jpeg_quality=preview_config.jpeg_quality)
+        return descriptions
+
     def get_pipeline_string(self) -> str:
         """Create the GStreamer pipeline string."""
         # Configure inference parameters
         inference_params = (
-            f"nms-score-threshold={self.config['detection']['nms_score_threshold']} "
-            f"nms-iou-threshold={self.config['detection']['nms_iou_threshold']} "
+            f"nms-score-threshold={self.config.detection.nms_score_threshold} "
+            f"nms-iou-threshold={self.config.detection.nms_iou_threshold} "
             "output-format-type=HAILO_FORMAT_TYPE_FLOAT32"
         )
         
+        # Optional branches hanging off the source tee, unless they are attached at runtime
+        source_config = self.config.source
+        descriptions = self._branch_descriptions()
+        branches = ""
+        if not self.config.pipeline.dynamic_branches:
+            branches = "".join(f" {self._branch_tee()}. ! {description}" for description in descriptions.values())
+
+        # Rate limiter in front of inference, lowered by the thermal controller (unlimited by default)
+        inference_rate = ""
+        if self.config.thermal.enabled:
+            inference_rate = "videorate name=inference_rate drop-only=true skip-to-first=true ! "
+
+        # hailotracker, unless the in-process tracker runs in the callback
+        tracker = f"{TRACKER_PIPELINE()} ! " if self.config.tracker.backend == 'hailo' else ""
+
+        if source_config.dual_stream:
+            source = DUAL_SOURCE_PIPELINE(
+                self.video_source,
+                video_width=source_config.inference_width,
+                video_height=source_config.inference_height,
+                full_format=source_config.full_format,
+                full_width=source_config.full_width,
+                full_height=source_config.full_height,
+                full_res=bool(descriptions), # No full-resolution stream without a branch to use it
+            )
+        else:
+            source = SOURCE_PIPELINE(self.video_source)
+
+        if self.config.models.enabled:
+            # Every model is configured up front on one shared vdevice, time-shared by the HailoRT scheduler
+            inference = MODEL_SWITCH_PIPELINE({
+                model: INFERENCE_PIPELINE(hef_path, self.config.paths.post_process_path, batch_size=1, additional_params=f"{inference_params} vdevice-group-id=1", name=f"inference_{model}")
+                for model, hef_path in self.config.models.hef_paths
+            })
+        else:
+            inference = INFERENCE_PIPELINE(self.config.paths.hef_path, self.config.paths.post_process_path, batch_size=1, additional_params=inference_params)
+
         # Build pipeline
         pipeline = (
-            f"{SOURCE_PIPELINE('rpi')} "
-            f"{INFERENCE_PIPELINE(self.config['paths']['model']['hef_path'], self.config['paths']['model']['post_process_path'], batch_size=1, additional_params=inference_params)} ! "
-            f"{TRACKER_PIPELINE()} ! "
+            f"{source} "
+            f"tee name=source_tee ! "
+            f"{inference_rate}"
+            f"{inference} ! "
+            f"{tracker}"
             f"{USER_CALLBACK_PIPELINE()} ! "
             f"{DISPLAY_PIPELINE(video_sink='xvimagesink', sync='false', show_fps='true')}"
+            f"{branches}"
         )
         return pipeline
     
@@ -193,12 +795,39 @@ class ObjectTargetingApp(GStreamerApp):
         """Clean up hardware resources."""
         logging.info("Cleaning up hardware resources...")
         try:
-            self.laser.cleanup()
+            if getattr(self, 'hardware', None):
+                logging.info(f"Hardware process: {self.hardware.stats()}")
+            self.laser.cleanup() # With the hardware process, the first cleanup stops it (laser off, servos centered)
             self.pan_tilt.cleanup()
             logging.info("Hardware cleanup completed successfully")
         except Exception as e:
             logging.error(f"Error during cleanup: {e}")
 
+        if getattr(self, 'control_server', None):
+            self.control_server.stop()
+        if getattr(self, 'telemetry', None):
+            self.telemetry.stop()
+        if getattr(self, 'profiler', None):
+            self.profiler.stop()
+        if getattr(self, 'scheduler', None):
+            logging.info(f"Engagement scheduler: {self.scheduler.stats()}")
+        if getattr(self, 'models', None):
+            logging.info(f"Model switcher: {self.models.stats()}")
+        if getattr(self, 'visual_servo', None):
+            logging.info(f"Visual servo: {self.visual_servo.stats()}")
+        if getattr(self, 'hotspots', None):
+            self.hotspots.flush()
+            self.hotspots.save()
+            logging.info(f"Hotspot map: {self._hotspot_stats()}")
+        if getattr(self, 'clip_recorder', None):
+            self.clip_recorder.stop()
+        if getattr(self, 'preview_server', None):
+            self.preview_server.stop()
+
+        # Flush the async log queue last so the cleanup messages above are written
+        if self.log_pipeline is not None:
+            self.log_pipeline.stop()
+
     def target_position(self, selected_person):
         """Calculate target position for the selected person."""
         bbox = selected_person.get_bbox()
@@ -0,0 +1,119 @@
+"""
+Operating Schedule Module
+
+Decides when the deterrent should run. Operating windows are configured either as fixed local
+times ("06:30") or relative to sunrise/sunset ("sunrise-30", "sunset+45", in minutes). Sunrise
+and sunset come from the NOAA general solar position equations for the configured latitude and
+longitude, accurate to a couple of minutes, which is plenty for birds.
+
+The application checks the schedule from a GLib timer and suspends itself outside the windows
+(see ObjectTargetingApp._suspend / _resume).
+"""
+
+import math
+import datetime
+from typing import Optional, Tuple
+
+from .config import OperatingWindowsConfig, TimeOfDay
+
+
+def sun_times(date: datetime.date, latitude: float, longitude: float) -> Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]:
+    """
+    Sunrise and sunset (UTC) on a date, from the NOAA general solar position equations.
+
+    Args:
+        date (datetime.date): Day
+        latitude (float): Degrees, north positive
+        longitude (float): Degrees, east positive
+
+    Returns:
+        tuple: (sunrise, sunset) as aware UTC datetimes; (None, None) during polar night,
+               and (midnight, next midnight) during polar day
+    """
+    day_of_year = date.timetuple().tm_yday
+    gamma = 2 * math.pi / 365 * (day_of_year - 1) # Fractional year at noon
+
+    equation_of_time = 229.18 * (
+        0.000075 + 0.001868 * math.cos(gamma) - 0.032077 * math.sin(gamma)
+        - 0.014615 * math.cos(2 * gamma) - 0.040849 * math.sin(2 * gamma)
+    )
+    declination = (
+        0.006918 - 0.399912 * math.cos(gamma) + 0.070257 * math.sin(gamma)
+        - 0.006758 * math.cos(2 * gamma) + 0.000907 * math.sin(2 * gamma)
+        - 0.002697 * math.cos(3 * gamma) + 0.00148 * math.sin(3 * gamma)
+    )
+
+    # Hour angle of the sun at 90.833° zenith (refraction and the solar disc radius included)
+    lat = math.radians(latitude)
+    cos_hour_angle = math.cos(math.radians(90.833)) / (math.cos(lat) * math.cos(declination)) - math.tan(lat) * math.tan(declination)
+    midnight = datetime.datetime(date.year, date.month, date.day, tzinfo=datetime.timezone.utc)
+    if cos_hour_angle > 1:
+        return None, None # Polar night, the sun never rises
+    if cos_hour_angle < -1:
+        return midnight, midnight + datetime.timedelta(days=1) # Polar day, the sun never sets
+    hour_angle = math.degrees(math.acos(cos_hour_angle))
+
+    sunrise_minutes = 720 - 4 * (longitude + hour_angle) - equation_of_time
+    sunset_minutes = 720 - 4 * (longitude - hour_angle) - equation_of_time
+    return midnight + datetime.timedelta(minutes=sunrise_minutes), midnight + datetime.timedelta(minutes=sunset_minutes)
+
+
+class OperatingSchedule:
+    def __init__(self, config: OperatingWindowsConfig):
+        """
+        Initialize the schedule.
+
+        Args:
+            config (OperatingWindowsConfig): The operating_windows section of the configuration
+        """
+        self.latitude = config.latitude
+        self.longitude = config.longitude
+        self.windows = config.windows
+        self._sun_cache = {} # date -> (sunrise, sunset), only today and yesterday are needed
+
+    def _sun(self, date: datetime.date):
+        times = self._sun_cache.get(date)
+        if times is None:
+            if len(self._sun_cache) > 4:
+                self._sun_cache.clear()
+            times = self._sun_cache[date] = sun_times(date, self.latitude, self.longitude)
+        return times
+
+    def resolve(self, spec: TimeOfDay, date: datetime.date, tz) -> Optional[datetime.datetime]:
+        """Local datetime of a window boundary on a date (None if the sun does not rise that day)."""
+        if spec.anchor == 'clock':
+            base = datetime.datetime(date.year, date.month, date.day, tzinfo=tz)
+        else:
+            sunrise, sunset = self._sun(date)
+            base = sunrise if spec.anchor == 'sunrise' else sunset
+            if base is None:
+                return None
+            base = base.astimezone(tz)
+        return base + datetime.timedelta(minutes=spec.offset_minutes)
+
+    def is_active(self, now: Optional[datetime.datetime] = None) -> bool:
+        """
+        Check whether now falls inside an operating window.
+
+        Args:
+            now (datetime): Aware local time, defaults to the current time
+
+        Returns:
+            bool: True inside a window (always True with no windows configured)
+        """
+        if not self.windows:
+            return True
+        now = now or datetime.datetime.now().astimezone()
+        tz = now.tzinfo
+        for window in self.windows:
+            # A window crossing midnight started yesterday if we are in its morning part
+            for date in (now.date(), now.date() - datetime.timedelta(days=1)):
+                start = self.resolve(window.start, date, tz)
+                end = self.resolve(window.end, date, tz)
+                if start is None or end is None:
+                    continue
+                if end <= start:
+                    end += datetime.timedelta(days=1)
+                if start <= now < end:
+                    return True
+        return False
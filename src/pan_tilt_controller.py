@@ -1,3 +1,4 @@
+import math
 import time
 from typing import Tuple
 from adafruit_pca9685 import PCA9685
@@ -6,35 +7,73 @@ import board
 import busio
 import logging
 
+from .config import AppConfig, AxisConfig
+from .exclusion_mask import ExclusionMask
+
 '''
 Important to note:
 PCA9685 is a PWM controller that can control up to 16 servos. This board connects between the Raspberry Pi and the servos,
 and allows the Raspberry Pi to control the servos using PWM signals.
 '''
 
+# PCA9685 MODE1 register bits
+MODE1_RESTART = 0x80
+MODE1_SLEEP = 0x10
+
+def angles_for_position(center_x: float, center_y: float, pan_config: AxisConfig, tilt_config: AxisConfig) -> Tuple[float, float]:
+    """
+    Calculate servo angles based on detection center coordinates with aggressive scaling for
+    more responsive movement. Different scaling for pan and tilt.
+
+    Pure math on the axis configuration, so it is also usable without the servo hardware
+    (e.g. in the producer process when the hardware runs in its own process).
+
+    Args:
+        center_x (float): Normalized x coordinate (0-1)
+        center_y (float): Normalized y coordinate (0-1)
+        pan_config, tilt_config (AxisConfig): Axis settings (power_factor, angle_scale)
+
+    Returns:
+        Tuple[float, float]: Calculated (pan_angle, tilt_angle)
+    """
+    # Normalize coordinates to [-1, 1]
+    x_deviation = (center_x - 0.5) * 2
+    y_deviation = (center_y - 0.5) * 2
+
+    # Apply non-linear transformations (sign-preserving power) to improve tracking precision and responsiveness
+    x_deviation = math.copysign(math.pow(abs(x_deviation), pan_config.power_factor), x_deviation)
+    y_deviation = math.copysign(math.pow(abs(y_deviation), tilt_config.power_factor), y_deviation)
+
+    # Calculate final angles with scaling (multiplied by fov is to map the deviation to the actual angle, fov is the field of view of the camera)
+    # angle_scale = fov * scaling_factor is precomputed by load_config, the scaling factor is for fine tuning the movement
+    pan_angle = -x_deviation * pan_config.angle_scale # Negative sign for pan is because the servo is oriented in the opposite direction as the camera
+    tilt_angle = y_deviation * tilt_config.angle_scale # Positive sign for tilt is because the servo is oriented in the same direction as the camera
+
+    return pan_angle, tilt_angle
+
 class PanTiltController:
     def __init__(
         self,
-        config: dict  # Pass the 'servo' section of our config
+        config: AppConfig  # The whole application config (servo and fov sections are used)
     ):
         """
         Initialize the pan/tilt servo controller.
         
         Args:
-            config (dict): Configuration dictionary containing servo settings:
-                - pan: channel, center, min_angle, max_angle
-                - tilt: channel, center, min_angle, max_angle
-                - i2c_address: I2C address of PCA9685
+            config (AppConfig): Application configuration, of which are used:
+                - servo.pan / servo.tilt: channel, center, min_angle, max_angle, threshold, scaling, power
+                - servo.i2c_address: I2C address of PCA9685
+                - fov: Field of view of the camera
         """
         try:
             # Extract configuration
-            servo_config = config['servo']  # Get servo-specific config
-            self.pan_config = servo_config['pan']
-            self.tilt_config = servo_config['tilt']
-            self.i2c_address = servo_config['i2c_address']
+            servo_config = config.servo  # Get servo-specific config
+            self.pan_config = servo_config.pan
+            self.tilt_config = servo_config.tilt
+            self.i2c_address = servo_config.i2c_address
             
             # Get FOV from main config
-            self.fov = config['fov'] # Field of view (FOV) of the camera in degrees (horizontal, vertical) 
+            self.fov = config.fov # Field of view (FOV) of the camera in degrees (horizontal, vertical) 
             
             # Initialize I2C communication with PCA9685
             i2c = busio.I2C(board.SCL, board.SDA) # Initialize I2C bus (I2C is a serial communication protocol used for the Raspberry Pi to communicate with PCA9685)
@@ -42,24 +81,33 @@ class PanTiltController:
             self.pca.frequency = 50  # Servos typically operate at 50Hz
             
             # Initialize servos
-            self.pan_servo = servo.Servo(self.pca.channels[self.pan_config['channel']]) # channel is the PWM channel on the PCA9685, among 16 channels
-            self.tilt_servo = servo.Servo(self.pca.channels[self.tilt_config['channel']]) # channel is the PWM channel on the PCA9685, among 16 channels
+            self.pan_servo = servo.Servo(self.pca.channels[self.pan_config.channel]) # channel is the PWM channel on the PCA9685, among 16 channels
+            self.tilt_servo = servo.Servo(self.pca.channels[self.tilt_config.channel]) # channel is the PWM channel on the PCA9685, among 16 channels
             
             # Store configurations
-            self.pan_limits = (self.pan_config['min_angle'], self.pan_config['max_angle'])
-            self.tilt_limits = (self.tilt_config['min_angle'], self.tilt_config['max_angle'])
+            self.pan_limits = (self.pan_config.min_angle, self.pan_config.max_angle)
+            self.tilt_limits = (self.tilt_config.min_angle, self.tilt_config.max_angle)
             
             # Store centers
-            self.pan_center = self.pan_config['center']
-            self.tilt_center = self.tilt_config['center']
+            self.pan_center = self.pan_config.center
+            self.tilt_center = self.tilt_config.center
             
             # Current relative positions
             self.current_pan = 0
             self.current_tilt = 0
+            self.sleeping = False
+
+            # No-fire exclusion zones, checked on every move
+            self.exclusion_mask = None
+            self.servo_seconds_per_degree = config.exclusion.servo_seconds_per_degree
+            self.aim_safe = True # False while aimed into an exclusion zone
+            self.blanked_until = 0.0 # Laser blanked until the servos finish crossing an exclusion zone
+            if config.exclusion.enabled:
+                self.exclusion_mask = ExclusionMask(config.exclusion, self.pan_limits, self.tilt_limits)
             
             logging.info(f"Pan/Tilt controller initialized with:")
-            logging.info(f"  Pan: channel={self.pan_config['channel']}, center={self.pan_center}")
-            logging.info(f"  Tilt: channel={self.tilt_config['channel']}, center={self.tilt_center}")
+            logging.info(f"  Pan: channel={self.pan_config.channel}, center={self.pan_center}")
+            logging.info(f"  Tilt: channel={self.tilt_config.channel}, center={self.tilt_center}")
             
             # Move to center position
             self.center()
@@ -113,6 +161,13 @@ class PanTiltController:
             new_pan_angle = min(max(new_pan_angle, 0), 180) 
             new_tilt_angle = min(max(new_tilt_angle, 0), 180)
             
+            # Check the exclusion zones at the destination and along the way, before moving
+            if self.exclusion_mask is not None:
+                self.aim_safe = not self.exclusion_mask.is_blocked(pan_angle, tilt_angle)
+                if self.exclusion_mask.path_blocked(self.current_pan, self.current_tilt, pan_angle, tilt_angle):
+                    travel = max(abs(pan_angle - self.current_pan), abs(tilt_angle - self.current_tilt))
+                    self.blanked_until = time.monotonic() + travel * self.servo_seconds_per_degree
+            
             # Move servos
             self.pan_servo.angle = new_pan_angle # Set the angle of the servo, angle is a property of the servo class imported from adafruit_motor
             self.tilt_servo.angle = new_tilt_angle 
@@ -121,12 +176,40 @@ class PanTiltController:
             self.current_pan = pan_angle
             self.current_tilt = tilt_angle
             
-            logging.debug(f"Moved to servo_pan={new_pan_angle}°, servo_tilt={new_tilt_angle}°")
+            logging.debug("Moved to servo_pan=%s°, servo_tilt=%s°", new_pan_angle, new_tilt_angle) # Lazy %-formatting, only done if the record is emitted
             
         except ValueError as e:
             logging.error(f"Error moving servos: {e}")
             raise
     
+    def sleep(self):
+        """
+        Park the turret at center and put the PCA9685 to sleep: oscillator and outputs off, so the
+        servos stop holding (and drawing current) until wake().
+        """
+        self.center()
+        time.sleep(0.3) # Let the servos reach center before their signal stops
+        self.pca.mode1_reg = self.pca.mode1_reg | MODE1_SLEEP
+        self.sleeping = True
+        logging.info("PCA9685 asleep")
+
+    def wake(self):
+        """Wake the PCA9685 and restart its PWM outputs where they were (restart sequence from the datasheet)."""
+        mode1 = self.pca.mode1_reg & ~MODE1_SLEEP & 0xFF
+        self.pca.mode1_reg = mode1
+        time.sleep(0.0005) # Oscillator start-up
+        if mode1 & MODE1_RESTART:
+            self.pca.mode1_reg = mode1 | MODE1_RESTART
+        self.sleeping = False
+        logging.info("PCA9685 awake")
+
+    def aim_is_safe(self) -> bool:
+        """
+        O(1) check whether the laser may fire at the current aim: not aimed into an exclusion
+        zone, and not still travelling across one.
+        """
+        return self.aim_safe and time.monotonic() >= self.blanked_until
+
     def center(self):
         """Center both servos (move to 0,0 relative position)."""
         logging.info("Centering servos...")
@@ -141,55 +224,18 @@ class PanTiltController:
         """
         return (self.current_pan, self.current_tilt)
     
-    def _apply_nonlinear_transform(self, value: float, power: float) -> float:
+    def calculate_angles(self, center_x: float, center_y: float) -> Tuple[float, float]:
         """
-        Apply non-linear power transformation to coordinate values while preserving sign.
-        
-        This transformation improves tracking precision by:
-        - Reducing movement for small deviations (more precise control near center)
-        - Amplifying movement for large deviations (faster response near edges)
-        
+        Calculate servo angles based on detection center coordinates (see angles_for_position).
+
         Args:
-            value: Input value in range [-1, 1]
-            power: Power factor for non-linear scaling (>1 reduces small movements)
-            
+            center_x (float): Normalized x coordinate (0-1)
+            center_y (float): Normalized y coordinate (0-1)
+
         Returns:
-            float: Transformed value, maintaining original sign
+            Tuple[float, float]: Calculated (pan_angle, tilt_angle)
         """
-        import math
-        return math.copysign(math.pow(abs(value), power), value)
-    
-    def calculate_angles(self, center_x: float, center_y: float) -> Tuple[float, float]:
-            """
-            Calculate servo angles based on detection center coordinates using tangent-based calculation
-            with aggressive scaling for more responsive movement. Different scaling for pan and tilt.
-            
-            Args:
-                center_x (float): Normalized x coordinate (0-1)
-                center_y (float): Normalized y coordinate (0-1)
-                
-            Returns:
-                Tuple[float, float]: Calculated (pan_angle, tilt_angle)
-            """
-            import math
-            
-            # Normalize coordinates to [-1, 1]
-            x_deviation = (center_x - 0.5) * 2  
-            y_deviation = (center_y - 0.5) * 2
-            
-            # Apply non-linear transformations to improve tracking precision and responsiveness
-            x_deviation = self._apply_nonlinear_transform(x_deviation, self.pan_config.get('power_factor', 1.5))
-            y_deviation = self._apply_nonlinear_transform(y_deviation, self.tilt_config.get('power_factor', 1.3))
-
-            # Get scaling factors from config
-            pan_scaling = self.pan_config.get('scaling_factor', 0.9) # Scaling factor for pan is for fine tuning the pan movement
-            tilt_scaling = self.tilt_config.get('scaling_factor', 0.9) # Scaling factor for tilt is for fine tuning the tilt movement
-            
-            # Calculate final angles with scaling (multiplied by fov is to map the deviation to the actual angle, fov is the field of view of the camera)
-            pan_angle = -x_deviation * self.fov['horizontal'] * pan_scaling # Negative sign for pan is because the servo is oriented in the opposite direction as the camera
-            tilt_angle = y_deviation * self.fov['vertical'] * tilt_scaling # Positive sign for tilt is because the servo is oriented in the same direction as the camera
-            
-            return pan_angle, tilt_angle
+        return angles_for_position(center_x, center_y, self.pan_config, self.tilt_config)
 
     
     def should_update(self, pan_angle: float, tilt_angle: float) -> bool:
@@ -206,21 +252,24 @@ class PanTiltController:
         delta_pan = abs(pan_angle - self.current_pan)
         delta_tilt = abs(tilt_angle - self.current_tilt)
         
-        return (delta_pan >= self.pan_config['threshold'] or 
-                delta_tilt >= self.tilt_config['threshold'])
+        return (delta_pan >= self.pan_config.threshold or 
+                delta_tilt >= self.tilt_config.threshold)
 
-    def update_if_needed(self, center_x: float, center_y: float) -> bool:
+    def update_if_needed(self, center_x: float, center_y: float, correction: Tuple[float, float] = (0.0, 0.0)) -> bool:
         """
         Calculate angles and update servo position if needed.
         
         Args:
             center_x (float): Normalized x coordinate (0-1)
             center_y (float): Normalized y coordinate (0-1)
+            correction (Tuple[float, float]): Closed-loop (pan, tilt) correction in degrees added to the open-loop angles
             
         Returns:
             bool: True if servos were updated
         """
         pan_angle, tilt_angle = self.calculate_angles(center_x, center_y)
+        pan_angle += correction[0]
+        tilt_angle += correction[1]
         if self.should_update(pan_angle, tilt_angle):
             self.move(pan_angle, tilt_angle)
             return True
@@ -0,0 +1,153 @@
+"""
+Pipeline Builder Module
+
+The main path (source, inference, callback, display) is created once with Gst.parse_launch.
+Optional branches (the clip recorder, the preview, a diagnostic sink) can instead be attached to
+and detached from a tee of the running pipeline (pipeline.dynamic_branches), so turning one on or
+off does not restart the camera and reload the HEF. The *_PIPELINE helpers of g_streamer_app stay
+the only description of each branch: their strings are built into bins with
+Gst.parse_bin_from_description.
+
+Attaching adds the branch bin, links it to a new tee request pad and brings it to the state of
+the pipeline; the other tee pads keep streaming meanwhile. Detaching installs a blocking IDLE probe
+on the tee pad, so the branch is unlinked between two buffers and never in the middle of a push,
+then the bin is shut down and removed on the main loop. Both are timed: an attach until the first
+buffer reaches the branch, a detach until the bin is removed.
+"""
+
+import gi
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst, GLib
+
+import time
+import logging
+from collections import deque
+from typing import Callable, Optional
+
+
+class _Branch:
+    """A branch bin and the tee request pad feeding it."""
+
+    def __init__(self, name: str, tee: Gst.Element, branch_bin: Gst.Bin):
+        self.name = name
+        self.tee = tee
+        self.bin = branch_bin
+        self.sink_pad = branch_bin.get_static_pad('sink')
+        self.tee_pad = None
+        self.requested_at = 0.0
+
+
+class BranchManager:
+    def __init__(self, pipeline: Gst.Pipeline, clock=time.monotonic):
+        """
+        Initialize the branch manager of a created pipeline (in any state).
+
+        Args:
+            pipeline (Gst.Pipeline): Pipeline holding the tees the branches hang off
+            clock: Monotonic time source in seconds
+        """
+        self.pipeline = pipeline
+        self.clock = clock
+        self.branches = {} # name -> _Branch, attached or being attached
+        self.detaching = set() # Names of branches detached but whose bin is not removed yet
+        self.reconfigurations = deque(maxlen=32) # Latency metrics, newest last
+        self.on_reconfigure: Optional[Callable[[dict], None]] = None # Called with each metric, e.g. for telemetry
+
+    def attach(self, name: str, tee_name: str, description: str, on_attached: Callable[[Gst.Pipeline], None] = None) -> bool:
+        """
+        Build a branch from a pipeline description and link it to a tee. Call on the main loop.
+
+        Args:
+            name (str): Name of the branch, its bin is named '<name>_branch'
+            tee_name (str): Name of the tee to hang the branch off
+            description (str): Branch description starting at its first element (e.g. RECORDER_PIPELINE())
+            on_attached: Called with the pipeline once the branch elements are in it, before any
+                buffer reaches them (to connect appsink signals)
+
+        Returns:
+            bool: False if a branch of that name is already attached, or still being detached
+                  (its bin, of the same name, is only removed once the tee pad went idle)
+        """
+        if name in self.branches or name in self.detaching:
+            return False
+        tee = self.pipeline.get_by_name(tee_name)
+        if tee is None:
+            raise ValueError(f"Tee '{tee_name}' not found in the pipeline")
+
+        started = self.clock()
+        branch_bin = Gst.parse_bin_from_description(description, True) # Ghost pad on the unlinked sink pad
+        branch_bin.set_name(f"{name}_branch")
+        branch = _Branch(name, tee, branch_bin)
+        branch.requested_at = started
+        self.pipeline.add(branch_bin)
+        if on_attached is not None:
+            on_attached(self.pipeline)
+
+        branch.sink_pad.add_probe(Gst.PadProbeType.BUFFER, self._on_first_buffer, branch)
+        branch.tee_pad = tee.request_pad_simple('src_%u')
+        if branch.tee_pad.link(branch.sink_pad) != Gst.PadLinkReturn.OK:
+            tee.release_request_pad(branch.tee_pad)
+            self.pipeline.remove(branch_bin)
+            raise RuntimeError(f"Failed to link branch '{name}' to '{tee_name}'")
+        branch_bin.sync_state_with_parent()
+        self.branches[name] = branch
+        logging.info(f"Branch '{name}' attached to '{tee_name}'")
+        return True
+
+    def detach(self, name: str, on_detached: Callable[[], None] = None) -> bool:
+        """
+        Unlink a branch between two buffers and remove it. Call on the main loop.
+
+        Args:
+            name (str): Name the branch was attached with
+            on_detached: Called on the main loop once the branch is removed
+
+        Returns:
+            bool: False if no branch of that name is attached
+        """
+        branch = self.branches.pop(name, None)
+        if branch is None:
+            return False
+        branch.requested_at = self.clock()
+        self.detaching.add(name)
+        # Fires as soon as no buffer is being pushed on the pad (right away if it is idle)
+        branch.tee_pad.add_probe(Gst.PadProbeType.IDLE, self._on_idle, (branch, on_detached))
+        return True
+
+    def is_attached(self, name: str) -> bool:
+        return name in self.branches
+
+    def _on_first_buffer(self, pad, info, branch: _Branch) -> Gst.PadProbeReturn:
+        self._record('attach', branch.name, self.clock() - branch.requested_at)
+        return Gst.PadProbeReturn.REMOVE
+
+    def _on_idle(self, pad, info, data) -> Gst.PadProbeReturn:
+        """Tee pad blocked between buffers: unlink it and finish the removal on the main loop."""
+        branch, on_detached = data
+        pad.unlink(branch.sink_pad)
+        branch.tee.release_request_pad(pad)
+        GLib.idle_add(self._remove, branch, on_detached)
+        return Gst.PadProbeReturn.REMOVE
+
+    def _remove(self, branch: _Branch, on_detached) -> bool:
+        branch.bin.set_state(Gst.State.NULL)
+        self.pipeline.remove(branch.bin)
+        self.detaching.discard(branch.name)
+        self._record('detach', branch.name, self.clock() - branch.requested_at)
+        if on_detached is not None:
+            on_detached()
+        return False # One-shot idle source
+
+    def _record(self, action: str, name: str, seconds: float):
+        metric = {'action': action, 'branch': name, 'latency_ms': round(seconds * 1000, 2)}
+        self.reconfigurations.append(metric)
+        logging.info("metric branch_%s branch=%s latency_ms=%.2f", action, name, seconds * 1000)
+        if self.on_reconfigure is not None:
+            self.on_reconfigure(metric)
+
+    def stats(self) -> dict:
+        return {
+            'attached': sorted(self.branches),
+            'detaching': sorted(self.detaching),
+            'reconfigurations': list(self.reconfigurations)[-8:],
+        }
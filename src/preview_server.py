@@ -0,0 +1,184 @@
+"""
+MJPEG Preview Server Module
+
+This module serves the camera as an MJPEG stream over HTTP for maintenance. The preview
+branch of the pipeline is gated by a valve which is only opened while at least one client
+is connected, so with no viewers nothing is scaled or encoded. Each client only ever holds
+the latest frame: a slow client skips frames instead of slowing down the pipeline.
+"""
+
+import gi
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import PreviewConfig
+
+BOUNDARY = 'frame'
+
+INDEX_PAGE = (
+    '<html><head><title>AI Bird Deterrent Preview</title></head>'
+    '<body style="margin:0;background:#000"><img src="/stream.mjpg" style="width:100%"></body></html>'
+).encode()
+
+
+class _PreviewClient:
+    """Latest-frame slot of a single connected client."""
+
+    def __init__(self):
+        self.frame = None
+        self.frame_ready = threading.Event()
+        self.sent = 0
+        self.skipped = 0
+
+    def offer(self, jpeg: bytes):
+        # Overwrite any frame the client has not picked up yet (per-client frame drop)
+        if self.frame_ready.is_set():
+            self.skipped += 1
+        self.frame = jpeg
+        self.frame_ready.set()
+
+
+class PreviewServer:
+    def __init__(self, config: PreviewConfig, name: str = 'preview'):
+        """
+        Initialize the preview server.
+
+        Args:
+            config (PreviewConfig): The preview section of the configuration:
+                - host (str): Address to listen on
+                - port (int): TCP port to listen on
+            name (str): Prefix name of the preview branch elements (see PREVIEW_PIPELINE)
+        """
+        self.host = config.host
+        self.port = config.port
+        self.name = name
+
+        self.valve = None
+        self.allowed = True  # Can be cleared to keep the valve closed regardless of viewers
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def attach(self, pipeline: Gst.Pipeline):
+        """Connect to the valve and appsink of the preview branch of a created pipeline."""
+        self.valve = pipeline.get_by_name(f'{self.name}_valve')
+        appsink = pipeline.get_by_name(f'{self.name}_appsink')
+        if self.valve is None or appsink is None:
+            logging.warning("Preview branch not found in pipeline, preview disabled")
+            return
+        appsink.connect('new-sample', self._on_new_sample)
+        with self._lock:
+            self._update_valve() # A branch attached at runtime may already have viewers
+
+    def start(self):
+        """Start serving HTTP requests on a background thread."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/':
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html')
+                    self.send_header('Content-Length', str(len(INDEX_PAGE)))
+                    self.end_headers()
+                    self.wfile.write(INDEX_PAGE)
+                elif self.path == '/stream.mjpg':
+                    server._stream_to(self)
+                else:
+                    self.send_error(404)
+
+            def log_message(self, format, *args):
+                logging.debug("Preview: " + format, *args)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='preview_server', daemon=True)
+        self._thread.start()
+        logging.info(f"MJPEG preview available at http://{self.host}:{self.port}/")
+
+    def set_allowed(self, allowed: bool):
+        """Allow or forbid preview encoding (e.g. under thermal pressure) without disconnecting clients."""
+        with self._lock:
+            self.allowed = allowed
+            self._update_valve()
+
+    def client_count(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def _update_valve(self):
+        """Open the valve only while there are viewers. Must be called with the lock held."""
+        if self.valve is not None:
+            self.valve.set_property('drop', not (self.allowed and self._clients))
+
+    def _on_new_sample(self, appsink) -> Gst.FlowReturn:
+        """Called by the appsink for every encoded JPEG, hands it to every client slot."""
+        sample = appsink.emit('pull-sample')
+        if sample is None:
+            return Gst.FlowReturn.OK
+
+        buffer = sample.get_buffer()
+        success, map_info = buffer.map(Gst.MapFlags.READ)
+        if not success:
+            return Gst.FlowReturn.OK
+        try:
+            jpeg = bytes(map_info.data)
+        finally:
+            buffer.unmap(map_info)
+
+        with self._lock:
+            for client in self._clients:
+                client.offer(jpeg)
+        return Gst.FlowReturn.OK
+
+    def _stream_to(self, handler: BaseHTTPRequestHandler):
+        """Serve a multipart MJPEG stream to one client until it disconnects."""
+        client = _PreviewClient()
+        with self._lock:
+            self._clients.add(client)
+            self._update_valve()
+        logging.info(f"Preview client connected from {handler.client_address[0]} ({len(self._clients)} total)")
+
+        try:
+            handler.send_response(200)
+            handler.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+            handler.send_header('Cache-Control', 'no-cache')
+            handler.end_headers()
+
+            while self._server is not None:
+                if not client.frame_ready.wait(timeout=1.0):
+                    continue
+                client.frame_ready.clear()
+                jpeg = client.frame
+                handler.wfile.write(
+                    f'--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n'.encode()
+                )
+                handler.wfile.write(jpeg)
+                handler.wfile.write(b'\r\n')
+                client.sent += 1
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self._lock:
+                self._clients.discard(client)
+                self._update_valve()
+            logging.info(
+                f"Preview client {handler.client_address[0]} disconnected "
+                f"(sent {client.sent} frames, skipped {client.skipped})"
+            )
+
+    def stop(self):
+        """Stop the HTTP server and close the valve."""
+        if self._server is None:
+            return
+        server, self._server = self._server, None
+        server.shutdown()
+        server.server_close()
+        with self._lock:
+            self._clients.clear()
+            self._update_valve()
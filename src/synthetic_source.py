@@ -0,0 +1,192 @@
+"""
+Synthetic Source Module
+
+Feeds the pipeline through an appsrc instead of the camera (source.type: synthetic or raw), for
+deterministic load tests with known ground truth:
+- synthetic: procedurally rendered frames with moving bird-like blobs. A blob's position is a
+  closed-form function of the frame index (it bounces off the edges), so frame N is the same on
+  every run with the same seed, and ground_truth(N) gives the blob boxes.
+- raw: RGB frames read from a memory-mapped file of concatenated frames (see --write below),
+  with no decoding, so the cost of the scale/convert/inference stages is measured on its own.
+
+Frames are pushed as fast as the pipeline asks for them, timestamped at source.fps; the
+pipeline runs with sync=false, so the FPS measured is the throughput of the pipeline.
+
+    $ python -m src.synthetic_source --write logs/scene.rgb --frames 300 --seed 7
+"""
+
+import json
+import logging
+import argparse
+import numpy as np
+from typing import List, Tuple
+
+from .config import SourceConfig
+
+Gst = None # Imported by AppSourceFeeder only: scenes and raw frames are generated without GStreamer
+
+SKY = (150, 190, 230) # Background color at the top of the frame, darkening towards the bottom
+BIRD = (40, 35, 30)
+
+
+def _bounce(start: np.ndarray, velocity: np.ndarray, low: np.ndarray, high: np.ndarray, index: int) -> np.ndarray:
+    """Position after index frames of a point bouncing between low and high (triangle wave)."""
+    span = high - low
+    travelled = np.mod(start - low + velocity * index, 2 * span)
+    return low + np.where(travelled <= span, travelled, 2 * span - travelled)
+
+
+class SyntheticScene:
+    def __init__(self, width: int, height: int, blobs: int, blob_size: int, seed: int):
+        """
+        Initialize a scene of moving blobs, fully determined by the seed.
+
+        Args:
+            width (int): Frame width in pixels
+            height (int): Frame height in pixels
+            blobs (int): Number of bird-like blobs
+            blob_size (int): Mean blob width in pixels
+            seed (int): Seed of the blob sizes, start positions and velocities
+        """
+        self.width = width
+        self.height = height
+        rng = np.random.default_rng(seed)
+
+        half_widths = np.maximum(2, rng.uniform(0.35, 0.65, blobs) * blob_size).astype(int)
+        self.half_sizes = np.stack([half_widths, np.maximum(1, half_widths // 2)], axis=1) # (x, y) half extents
+        self.low = self.half_sizes.astype(float)
+        self.high = np.array([width, height], dtype=float) - self.half_sizes - 1
+        self.start = rng.uniform(self.low, self.high)
+        self.velocity = rng.uniform(-1, 1, (blobs, 2)) * np.array([width, height]) / 150 # Pixels per frame
+
+        # Elliptic body masks, one per blob size
+        self.masks = []
+        for half_x, half_y in self.half_sizes:
+            yy, xx = np.mgrid[-half_y:half_y + 1, -half_x:half_x + 1]
+            self.masks.append((xx / half_x) ** 2 + (yy / half_y) ** 2 <= 1.0)
+
+        shade = np.linspace(1.0, 0.8, height, dtype=np.float32)[:, None, None]
+        self.background = (np.array(SKY, dtype=np.float32) * shade * np.ones((1, width, 1), dtype=np.float32)).astype(np.uint8)
+
+    def centers(self, index: int) -> np.ndarray:
+        return np.rint(_bounce(self.start, self.velocity, self.low, self.high, index)).astype(int)
+
+    def render(self, index: int) -> np.ndarray:
+        """RGB frame (height, width, 3) of the given index."""
+        frame = self.background.copy()
+        for (x, y), (half_x, half_y), mask in zip(self.centers(index), self.half_sizes, self.masks):
+            frame[y - half_y:y + half_y + 1, x - half_x:x + half_x + 1][mask] = BIRD
+        return frame
+
+    def ground_truth(self, index: int) -> List[Tuple[float, float, float, float]]:
+        """Normalized (xmin, ymin, xmax, ymax) boxes of the blobs in the given frame."""
+        boxes = []
+        for (x, y), (half_x, half_y) in zip(self.centers(index), self.half_sizes):
+            boxes.append((
+                float(x - half_x) / self.width, float(y - half_y) / self.height,
+                float(x + half_x + 1) / self.width, float(y + half_y + 1) / self.height,
+            ))
+        return boxes
+
+
+class RawFrames:
+    def __init__(self, path: str, width: int, height: int, seed: int):
+        """
+        Memory-map a file of concatenated RGB frames.
+
+        Args:
+            path (str): Raw frame file, width * height * 3 bytes per frame
+            width (int): Frame width in pixels
+            height (int): Frame height in pixels
+            seed (int): Start frame (modulo the frame count), so runs with the same seed match
+        """
+        frame_bytes = width * height * 3
+        self.frames = np.memmap(path, dtype=np.uint8, mode='r')
+        count = len(self.frames) // frame_bytes
+        if count == 0:
+            raise ValueError(f"{path} holds no complete {width}x{height} RGB frame")
+        self.frames = self.frames[:count * frame_bytes].reshape(count, height, width, 3)
+        self.offset = seed % count
+
+    def render(self, index: int) -> np.ndarray:
+        return self.frames[(self.offset + index) % len(self.frames)]
+
+
+def _import_gst():
+    global Gst
+    if Gst is None:
+        import gi
+        gi.require_version('Gst', '1.0')
+        from gi.repository import Gst as gst
+        Gst = gst
+
+
+class AppSourceFeeder:
+    def __init__(self, config: SourceConfig):
+        """
+        Initialize the frame generator of the configured appsrc source.
+
+        Args:
+            config (SourceConfig): The source section of the configuration
+        """
+        _import_gst()
+        self.width = config.width
+        self.height = config.height
+        self.fps = config.fps
+        self.max_frames = config.max_frames
+        if config.type == 'raw':
+            self.frames = RawFrames(config.raw_path, config.width, config.height, config.seed)
+        else:
+            self.frames = SyntheticScene(config.width, config.height, config.blobs, config.blob_size, config.seed)
+        self.index = 0
+        self.appsrc = None
+
+    def attach(self, pipeline, appsrc_name: str = 'source'):
+        """Set the caps of the appsrc and feed it on need-data."""
+        self.appsrc = pipeline.get_by_name(appsrc_name)
+        self.appsrc.set_property('caps', Gst.Caps.from_string(
+            f"video/x-raw,format=RGB,width={self.width},height={self.height},framerate={self.fps}/1"
+        ))
+        self.appsrc.set_property('format', Gst.Format.TIME)
+        self.appsrc.connect('need-data', self._on_need_data)
+        logging.info(f"Appsrc source: {type(self.frames).__name__} {self.width}x{self.height} at {self.fps} fps")
+
+    def _on_need_data(self, appsrc, length):
+        if self.max_frames and self.index >= self.max_frames:
+            appsrc.emit('end-of-stream')
+            return
+        buffer = Gst.Buffer.new_wrapped(self.frames.render(self.index).tobytes())
+        buffer.pts = self.index * Gst.SECOND // self.fps
+        buffer.duration = Gst.SECOND // self.fps
+        self.index += 1
+        appsrc.emit('push-buffer', buffer)
+
+    def ground_truth(self, index: int):
+        """Blob boxes of a pushed frame (synthetic source only)."""
+        return self.frames.ground_truth(index) if isinstance(self.frames, SyntheticScene) else None
+
+    def stats(self) -> dict:
+        return {'frames_pushed': self.index}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic scene as a raw RGB frame file (for source.type: raw)')
+    parser.add_argument('--write', required=True, help='Raw frame file to write')
+    parser.add_argument('--frames', type=int, default=300, help='Number of frames')
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--blobs', type=int, default=5)
+    parser.add_argument('--blob-size', type=int, default=24)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    scene = SyntheticScene(args.width, args.height, args.blobs, args.blob_size, args.seed)
+    with open(args.write, 'wb') as frames, open(args.write + '.truth.jsonl', 'w') as truth:
+        for index in range(args.frames):
+            frames.write(scene.render(index).tobytes())
+            truth.write(json.dumps({'frame': index, 'boxes': scene.ground_truth(index)}) + '\n')
+    print(f"Wrote {args.frames} frames to {args.write}, ground truth to {args.write}.truth.jsonl")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Telemetry Module
+
+Ships engagement and health events of this unit to the fleet telemetry aggregator
+(src/telemetry_aggregator.py). On the hot path, record() only appends a tuple to a bounded
+deque; a background thread batches the events into compact frames (zlib-compressed JSON behind
+a small binary header) and sends them over UDP, waiting for the aggregator's ack. A batch too
+large for one datagram is split over several frames. Frames that are not acknowledged go to a
+disk spool under logs_dir and are resent once the aggregator answers again; frames that can
+never be sent are dropped.
+
+Frame layout:
+    header  !4sB I I  magic b'BDTM', version, boot id, frame sequence number
+    payload zlib(JSON {"unit": ..., "events": [[time, kind, {fields}], ...]})
+The aggregator acks with the header of the frame it received.
+"""
+
+import os
+import json
+import errno
+import time
+import zlib
+import random
+import socket
+import struct
+import logging
+import threading
+from collections import deque
+from typing import Callable, Dict
+
+from .config import TelemetryConfig
+
+MAGIC = b'BDTM'
+VERSION = 1
+HEADER = struct.Struct('!4sBII')
+SPOOL_RETRY_FRAMES = 32 # Spooled frames resent per flush, so a long outage drains gradually
+MAX_FRAME_BYTES = 65507 # Largest UDP payload over IPv4
+MAX_MESSAGE_BYTES = 4 * 1024 * 1024 # Decompressed payload accepted from a datagram
+
+
+def encode_frame(unit_id: str, boot_id: int, seq: int, events: list) -> bytes:
+    payload = zlib.compress(json.dumps({'unit': unit_id, 'events': events}, separators=(',', ':'), default=str).encode())
+    return HEADER.pack(MAGIC, VERSION, boot_id, seq) + payload
+
+
+def decode_frame(data: bytes):
+    """Decode a frame, returns (boot_id, seq, message). Raises ValueError on a malformed frame."""
+    if len(data) < HEADER.size:
+        raise ValueError("Frame too short")
+    magic, version, boot_id, seq = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a telemetry frame")
+    # Datagrams are untrusted: bound the output, a tiny frame may inflate to gigabytes
+    decompressor = zlib.decompressobj()
+    try:
+        payload = decompressor.decompress(data[HEADER.size:], MAX_MESSAGE_BYTES)
+    except zlib.error as e:
+        raise ValueError(f"Corrupt frame payload: {e}")
+    if decompressor.unconsumed_tail:
+        raise ValueError(f"Frame payload above {MAX_MESSAGE_BYTES} bytes")
+    if not decompressor.eof:
+        raise ValueError("Truncated frame payload")
+    try:
+        message = json.loads(payload)
+    except ValueError as e:
+        raise ValueError(f"Corrupt frame payload: {e}")
+    return boot_id, seq, message
+
+
+class TelemetryShipper:
+    def __init__(self, config: TelemetryConfig, spool_dir: str):
+        """
+        Initialize the telemetry shipper (call start() to begin shipping).
+
+        Args:
+            config (TelemetryConfig): The telemetry section of the configuration
+            spool_dir (str): Directory for frames the aggregator did not acknowledge
+        """
+        self.unit_id = config.unit_id or socket.gethostname()
+        self.address = (config.aggregator_host, config.aggregator_port)
+        self.flush_interval = config.flush_interval_seconds
+        self.max_batch_events = config.max_batch_events
+        self.ack_timeout = config.ack_timeout_seconds
+        self.health_interval = config.health_interval_seconds
+        self.spool_dir = spool_dir
+        self.spool_max_bytes = int(config.spool_max_mb * 1024 * 1024)
+        self.spool_files = deque() # (name, size) of the spooled frames, oldest first
+        self.spool_bytes = 0
+
+        self.events = deque(maxlen=config.queue_size)
+        self.health_sources: Dict[str, Callable[[], dict]] = {}
+        self.boot_id = random.getrandbits(32) # Tells the aggregator apart frames of different runs
+        self.seq = 0
+
+        self.sock = None
+        self._thread = None
+        self._stop = threading.Event()
+
+        # Statistics
+        self.dropped = 0
+        self.frames_sent = 0
+        self.frames_acked = 0
+        self.frames_spooled = 0
+        self.spool_dropped = 0
+        self.frames_rejected = 0 # Frames (or single events) that can never be sent
+
+    def record(self, kind: str, **fields):
+        """Queue an event. Safe and cheap to call from the streaming thread."""
+        events = self.events
+        if len(events) == events.maxlen:
+            self.dropped += 1 # The oldest event is pushed out
+        events.append((time.time(), kind, fields))
+
+    def add_health_source(self, name: str, source: Callable[[], dict]):
+        """Add a callable sampled every health interval (on the shipping thread) as a 'health' event."""
+        self.health_sources[name] = source
+
+    def start(self):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._load_spool()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(self.ack_timeout)
+        self._thread = threading.Thread(target=self._run, name='telemetry', daemon=True)
+        self._thread.start()
+        logging.info(f"Telemetry shipping to {self.address[0]}:{self.address[1]} as unit '{self.unit_id}'")
+
+    def _run(self):
+        next_health = time.monotonic()
+        while not self._stop.wait(self.flush_interval):
+            if time.monotonic() >= next_health:
+                next_health += self.health_interval
+                self._sample_health()
+            self._flush()
+        self._sample_health()
+        self._flush()
+
+    def _sample_health(self):
+        health = {}
+        for name, source in self.health_sources.items():
+            try:
+                health[name] = source()
+            except Exception as e:
+                health[name] = {'error': str(e)}
+        if health:
+            self.record('health', **health)
+
+    def _frames(self, batch: list) -> list:
+        """Encode a batch, split in halves until every frame fits in a datagram."""
+        frame = encode_frame(self.unit_id, self.boot_id, self.seq + 1, batch)
+        if len(frame) <= MAX_FRAME_BYTES:
+            self.seq += 1
+            return [frame]
+        if len(batch) == 1:
+            self.frames_rejected += 1
+            logging.warning(f"Telemetry '{batch[0][1]}' event dropped: {len(frame)} bytes encoded, above the datagram limit")
+            return []
+        middle = len(batch) // 2
+        return self._frames(batch[:middle]) + self._frames(batch[middle:])
+
+    def _flush(self):
+        """Ship the queued events, then retry spooled frames while the aggregator answers."""
+        reachable = True
+        while self.events:
+            batch = []
+            while self.events and len(batch) < self.max_batch_events:
+                batch.append(self.events.popleft())
+            for frame in self._frames(batch):
+                if reachable:
+                    acked = self._send(frame)
+                    if acked is None:
+                        continue # Can never be sent: not worth spooling
+                    reachable = acked
+                if not reachable:
+                    self._spool(frame) # Aggregator down: spool the rest without waiting for more acks
+        if not reachable:
+            return
+
+        for _ in range(min(SPOOL_RETRY_FRAMES, len(self.spool_files))):
+            path = os.path.join(self.spool_dir, self.spool_files[0][0])
+            try:
+                with open(path, 'rb') as f:
+                    frame = f.read()
+            except OSError:
+                frame = None
+            if frame is not None and self._send(frame) is False:
+                return
+            # Acked, rejected or unreadable: the frame leaves the spool
+            self._unspool()
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _send(self, frame: bytes):
+        """
+        Send a frame and wait for its ack.
+
+        Returns:
+            True once acknowledged, False without an ack (worth retrying later), None when the
+            frame can never be sent (e.g. above the datagram size limit)
+        """
+        try:
+            self.sock.sendto(frame, self.address)
+        except OSError as e:
+            if e.errno == errno.EMSGSIZE:
+                self.frames_rejected += 1
+                logging.warning(f"Telemetry frame of {len(frame)} bytes dropped: {e}")
+                return None
+            return False # Network down, or connection refused reported on the socket
+        self.frames_sent += 1
+        try:
+            deadline = time.monotonic() + self.ack_timeout
+            while time.monotonic() < deadline:
+                ack, _ = self.sock.recvfrom(64)
+                if ack == frame[:HEADER.size]:
+                    self.frames_acked += 1
+                    return True
+        except OSError: # Timeout, or connection refused reported on the socket
+            pass
+        return False
+
+    def _load_spool(self):
+        """Index the frames spooled by previous runs; the spool is only listed here, at start."""
+        try:
+            names = sorted(name for name in os.listdir(self.spool_dir) if name.endswith('.frame'))
+        except OSError:
+            names = []
+        for name in names:
+            try:
+                size = os.path.getsize(os.path.join(self.spool_dir, name))
+            except OSError:
+                continue
+            self.spool_files.append((name, size))
+            self.spool_bytes += size
+
+    def _unspool(self) -> str:
+        """Forget the oldest spooled frame, returns its name."""
+        name, size = self.spool_files.popleft()
+        self.spool_bytes -= size
+        return name
+
+    def _spool(self, frame: bytes):
+        """Keep an unacknowledged frame on disk, dropping the oldest ones over the size limit."""
+        seq = HEADER.unpack_from(frame)[3]
+        name = f"{time.time_ns():020d}-{seq:010d}.frame" # Sorted by name = sent order
+        try:
+            with open(os.path.join(self.spool_dir, name), 'wb') as f:
+                f.write(frame)
+        except OSError as e:
+            logging.error(f"Failed to spool telemetry frame: {e}")
+            return
+        self.frames_spooled += 1
+        self.spool_files.append((name, len(frame)))
+        self.spool_bytes += len(frame)
+
+        while self.spool_bytes > self.spool_max_bytes and self.spool_files:
+            try:
+                os.unlink(os.path.join(self.spool_dir, self._unspool()))
+            except OSError:
+                pass
+            self.spool_dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            'queued': len(self.events),
+            'dropped': self.dropped,
+            'frames_sent': self.frames_sent,
+            'frames_acked': self.frames_acked,
+            'frames_spooled': self.frames_spooled,
+            'spool_dropped': self.spool_dropped,
+            'spooled_bytes': self.spool_bytes,
+            'frames_rejected': self.frames_rejected,
+        }
+
+    def stop(self, timeout: float = 5.0):
+        """Ship (or spool) what is queued and stop. Idempotent."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        logging.info(f"Telemetry stopped: {self.stats()}")
@@ -0,0 +1,206 @@
+"""
+Telemetry Aggregator
+
+Daemon collecting the telemetry frames of all units (see src/telemetry.py) over UDP. Every
+frame is acknowledged, duplicates (resent from a unit's spool after a lost ack) are dropped,
+and the event streams are merged into per-unit and fleet-wide rollups, appended as JSON lines
+to the output file once per rollup interval.
+
+    $ python -m src.telemetry_aggregator --bind 0.0.0.0:9870 --output logs/fleet_rollups.jsonl
+"""
+
+import json
+import time
+import socket
+import logging
+import argparse
+from collections import Counter, deque
+
+from .telemetry import HEADER, decode_frame
+
+RECENT_FRAMES = 4096 # Frame ids remembered per unit for duplicate detection
+
+
+def _number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _valid_event(event) -> bool:
+    """An event as recorded by TelemetryShipper: [time, kind, {fields}]."""
+    return (
+        isinstance(event, list) and len(event) == 3 and _number(event[0])
+        and isinstance(event[1], str) and isinstance(event[2], dict)
+    )
+
+
+class _UnitRollup:
+    __slots__ = ('events', 'engagements', 'engaged_seconds', 'hits', 'fps_sum', 'fps_samples', 'last_health')
+
+    def __init__(self):
+        self.events = Counter()
+        self.engagements = 0
+        self.engaged_seconds = 0.0
+        self.hits = 0
+        self.fps_sum = 0.0
+        self.fps_samples = 0
+        self.last_health = None
+
+
+class TelemetryAggregator:
+    def __init__(self):
+        self.units = {} # unit -> _UnitRollup of the current interval
+        self.last_seen = {} # unit -> time of the last frame, kept across intervals
+        self.recent = {} # unit -> (deque, set) of recent (boot_id, seq)
+        self.interval_started = time.time()
+        self.frames = 0
+        self.duplicates = 0
+        self.malformed = 0
+
+    def handle_datagram(self, data: bytes):
+        """
+        Merge one frame. Returns the ack to send back (None for a malformed frame).
+        Duplicates are acknowledged again but not merged twice. A frame is checked as a whole
+        before anything is merged, so a malformed one leaves the rollups untouched.
+        """
+        try:
+            boot_id, seq, message = decode_frame(data)
+        except ValueError:
+            self.malformed += 1
+            return None
+        if not isinstance(message, dict):
+            self.malformed += 1
+            return None
+        events = message.get('events', [])
+        if not isinstance(events, list) or not all(_valid_event(event) for event in events):
+            self.malformed += 1
+            return None
+        unit = str(message.get('unit', 'unknown'))
+
+        order, seen = self.recent.setdefault(unit, (deque(), set()))
+        frame_id = (boot_id, seq)
+        if frame_id in seen:
+            self.duplicates += 1
+            return data[:HEADER.size]
+        seen.add(frame_id)
+        order.append(frame_id)
+        if len(order) > RECENT_FRAMES:
+            seen.discard(order.popleft())
+
+        self.frames += 1
+        rollup = self.units.get(unit)
+        if rollup is None:
+            rollup = self.units[unit] = _UnitRollup()
+        for _, kind, fields in events:
+            self._merge(rollup, kind, fields)
+        self.last_seen[unit] = time.time()
+        return data[:HEADER.size]
+
+    @staticmethod
+    def _merge(rollup: _UnitRollup, kind: str, fields: dict):
+        """Merge one event. Fields of the wrong type are ignored, the event is still counted."""
+        rollup.events[kind] += 1
+        if kind == 'engagement_start':
+            rollup.engagements += 1
+        elif kind == 'engagement_end':
+            duration = fields.get('duration')
+            if _number(duration):
+                rollup.engaged_seconds += duration
+        elif kind == 'health':
+            rollup.last_health = fields
+            pipeline = fields.get('pipeline')
+            fps = pipeline.get('fps') if isinstance(pipeline, dict) else None
+            if _number(fps):
+                rollup.fps_sum += fps
+                rollup.fps_samples += 1
+            scheduler = fields.get('scheduler')
+            if isinstance(scheduler, dict) and _number(scheduler.get('hits')):
+                rollup.hits = scheduler['hits'] # Cumulative on the unit, keep the latest
+
+    def rollup(self, stale_after: float = 300.0) -> dict:
+        """Produce the rollup of the current interval and start a new one."""
+        now = time.time()
+        units = {}
+        for unit, rollup in self.units.items():
+            units[unit] = {
+                'events': dict(rollup.events),
+                'engagements': rollup.engagements,
+                'engaged_seconds': round(rollup.engaged_seconds, 3),
+                'hits': rollup.hits,
+                'mean_fps': rollup.fps_sum / rollup.fps_samples if rollup.fps_samples else None,
+                'last_health': rollup.last_health,
+            }
+        fps = [u['mean_fps'] for u in units.values() if u['mean_fps'] is not None]
+        result = {
+            'start': self.interval_started,
+            'end': now,
+            'fleet': {
+                'units_reporting': len(units),
+                'units_stale': sorted(unit for unit, seen in self.last_seen.items() if now - seen > stale_after),
+                'engagements': sum(u['engagements'] for u in units.values()),
+                'engaged_seconds': round(sum(u['engaged_seconds'] for u in units.values()), 3),
+                'mean_fps': sum(fps) / len(fps) if fps else None,
+                'frames': self.frames,
+                'duplicates': self.duplicates,
+                'malformed': self.malformed,
+            },
+            'units': units,
+        }
+        self.units = {}
+        self.interval_started = now
+        self.frames = self.duplicates = self.malformed = 0
+        return result
+
+
+def serve(bind: str, output: str, rollup_interval: float):
+    host, port = bind.rsplit(':', 1)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, int(port)))
+    sock.settimeout(1.0)
+    aggregator = TelemetryAggregator()
+    next_rollup = time.monotonic() + rollup_interval
+    logging.info(f"Telemetry aggregator listening on {bind}, rollups every {rollup_interval}s to {output}")
+
+    try:
+        while True:
+            try:
+                data, address = sock.recvfrom(65535)
+                ack = aggregator.handle_datagram(data)
+                if ack is not None:
+                    sock.sendto(ack, address)
+            except socket.timeout:
+                pass
+            except OSError as e:
+                logging.warning(f"Failed to answer a telemetry frame: {e}")
+            except Exception as e:
+                # One bad frame must not take the daemon down with the rollups of the whole fleet
+                aggregator.malformed += 1
+                logging.exception(f"Failed to merge a telemetry frame: {e}")
+
+            if time.monotonic() >= next_rollup:
+                next_rollup += rollup_interval
+                rollup = aggregator.rollup()
+                try:
+                    with open(output, 'a') as f:
+                        f.write(json.dumps(rollup, default=str) + '\n')
+                except OSError as e:
+                    logging.error(f"Failed to write rollup to {output}: {e}")
+                logging.info(f"Rollup: {json.dumps(rollup['fleet'])}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fleet telemetry aggregator')
+    parser.add_argument('--bind', default='127.0.0.1:9870', help='UDP address to listen on (host:port)')
+    parser.add_argument('--output', default='fleet_rollups.jsonl', help='File the rollups are appended to (JSON lines)')
+    parser.add_argument('--rollup-interval', type=float, default=60.0, help='Seconds between rollups')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    serve(args.bind, args.output, args.rollup_interval)
+
+
+if __name__ == "__main__":
+    main()
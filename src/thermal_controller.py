@@ -0,0 +1,134 @@
+"""
+Thermal Controller Module
+
+Keeps the unit out of thermal throttling by degrading gracefully instead of letting the SoC
+throttle (which makes the FPS collapse unpredictably). The SoC temperature (sysfs) and the CPU
+load (procfs) are polled; under pressure the controller applies the next degradation step, and
+once temperature and load are back below the hysteresis band it reverts the last one. Steps are
+registered by the application in the order they should be applied (see
+ObjectTargetingApp._register_thermal_steps).
+
+The file paths come from the configuration, so a fake file tree can stand in for /sys and /proc.
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Callable, Optional
+
+from .config import ThermalConfig
+
+
+class ThermalController:
+    def __init__(self, config: ThermalConfig, clock=time.monotonic):
+        """
+        Initialize the thermal controller (no step applied).
+
+        Args:
+            config (ThermalConfig): The thermal section of the configuration
+            clock: Monotonic time source in seconds
+        """
+        self.temperature_path = config.temperature_path
+        self.stat_path = config.stat_path
+        self.step_up_celsius = config.step_up_celsius
+        self.step_down_celsius = config.step_up_celsius - config.hysteresis_celsius
+        self.high_load = config.high_load
+        self.low_load = config.low_load
+        self.min_dwell_seconds = config.min_dwell_seconds
+        self.clock = clock
+
+        self.steps = [] # (name, apply, revert), applied in order under pressure
+        self.level = 0 # Number of steps applied
+        self.last_transition = None
+        self.on_transition: Optional[Callable[[dict], None]] = None # Metric sink (e.g. telemetry)
+        self.transitions = deque(maxlen=64)
+        self._previous_cpu = None
+        self.temperature = None
+        self.load = None
+
+    def add_step(self, name: str, apply: Callable[[], None], revert: Callable[[], None]):
+        self.steps.append((name, apply, revert))
+
+    def read_temperature(self) -> Optional[float]:
+        """SoC temperature in °C (the thermal zone reports millidegrees), None if unreadable."""
+        try:
+            with open(self.temperature_path) as f:
+                return int(f.read().strip()) / 1000.0
+        except (OSError, ValueError):
+            return None
+
+    def read_cpu_load(self) -> Optional[float]:
+        """Fraction of CPU time busy since the previous call, from the aggregate line of /proc/stat."""
+        try:
+            with open(self.stat_path) as f:
+                fields = [int(value) for value in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        if len(fields) < 4:
+            return None # Not a 'cpu user nice system idle ...' line
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0) # idle + iowait
+        total = sum(fields)
+        previous, self._previous_cpu = self._previous_cpu, (idle, total)
+        if previous is None or total <= previous[1]:
+            return None
+        return 1.0 - (idle - previous[0]) / (total - previous[1])
+
+    def poll(self) -> bool:
+        """
+        Sample temperature and load, step down or up if needed. Meant for a GLib timer.
+
+        Returns:
+            bool: Always True (keeps the timer)
+        """
+        self.temperature = self.read_temperature()
+        self.load = self.read_cpu_load()
+        now = self.clock()
+        if self.last_transition is not None and now - self.last_transition < self.min_dwell_seconds:
+            return True # Give the last transition time to take effect
+
+        temperature = self.temperature
+        if temperature is None:
+            return True # Unreadable sensor: no decision, hold the current level
+        load = self.load if self.load is not None else 0.0 # Unknown on the first sample
+        pressure = temperature >= self.step_up_celsius or load >= self.high_load
+        relief = temperature <= self.step_down_celsius and load <= self.low_load
+
+        if pressure and self.level < len(self.steps):
+            name, apply, _ = self.steps[self.level]
+            self._transition(apply, name, 'down', self.level + 1, now)
+        elif relief and self.level > 0:
+            name, _, revert = self.steps[self.level - 1]
+            self._transition(revert, name, 'up', self.level - 1, now)
+        return True
+
+    def _transition(self, action: Callable[[], None], name: str, direction: str, level: int, now: float):
+        try:
+            action()
+        except Exception as e:
+            logging.error(f"Thermal step '{name}' failed to {'apply' if direction == 'down' else 'revert'}: {e}")
+            return
+        self.level = level
+        self.last_transition = now
+        metric = {
+            'step': name,
+            'direction': direction,
+            'level': level,
+            'temperature_c': self.temperature,
+            'cpu_load': self.load,
+        }
+        self.transitions.append(metric)
+        logging.info(
+            "metric thermal_transition step=%s direction=%s level=%d temperature_c=%s cpu_load=%s",
+            name, direction, level, self.temperature, None if self.load is None else round(self.load, 3),
+        )
+        if self.on_transition is not None:
+            self.on_transition(metric)
+
+    def stats(self) -> dict:
+        return {
+            'level': self.level,
+            'applied_steps': [name for name, _, _ in self.steps[:self.level]],
+            'temperature_c': self.temperature,
+            'cpu_load': self.load,
+            'transitions': len(self.transitions),
+        }
@@ -0,0 +1,123 @@
+"""
+Track Evidence Module
+
+Temporal confidence fusion per track, so that a single frame above the score threshold does not
+fire the laser and a single missed frame does not switch it off. Every frame, each known track
+gets a sample: its detection confidence, or 0 when it was not detected. The fused score is the
+mean of the last window_frames samples; a track is engaged once it has min_frames samples and a
+fused score of at least engage_threshold, and stays engaged until the score falls below
+release_threshold.
+
+The samples live in one fixed (max_tracks, window_frames) array with a shared ring column, so a
+frame is a single column write and a vectorized mean. Track IDs map to rows through an LRU; rows
+of tracks not seen for a whole window are freed and, when all rows are taken, the least recently
+seen track is evicted. Memory does not grow with the number of track IDs handed out.
+"""
+
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List
+
+from .config import EvidenceConfig
+
+
+class TrackEvidence:
+    def __init__(self, config: EvidenceConfig):
+        """
+        Initialize the evidence store.
+
+        Args:
+            config (EvidenceConfig): The evidence section of the configuration
+        """
+        self.window = config.window_frames
+        self.min_frames = config.min_frames
+        self.engage_threshold = config.engage_threshold
+        self.release_threshold = config.release_threshold
+        self.capacity = config.max_tracks
+
+        self.scores = np.zeros((self.capacity, self.window), dtype=np.float32)
+        self.samples = np.zeros(self.capacity, dtype=np.int32) # Samples held per row, up to window
+        self.last_frame = np.zeros(self.capacity, dtype=np.int64)
+        self.active = np.zeros(self.capacity, dtype=bool)
+        self.engaged = np.zeros(self.capacity, dtype=bool)
+        self.fused = np.zeros(self.capacity, dtype=np.float32)
+        self._column = np.zeros(self.capacity, dtype=np.float32)
+
+        self.rows = OrderedDict() # track_id -> row, least recently seen first
+        self.free_rows = list(range(self.capacity - 1, -1, -1))
+        self.frame = 0
+        self.evicted = 0
+
+    def _allocate(self, track_id: int) -> int:
+        if not self.free_rows:
+            _, row = self.rows.popitem(last=False) # Still alive, but seen least recently
+            self.active[row] = False
+            self.free_rows.append(row)
+            self.evicted += 1
+        row = self.free_rows.pop()
+        self.rows[track_id] = row
+        self.scores[row] = 0.0
+        self.samples[row] = 0
+        self.engaged[row] = False
+        self.active[row] = True
+        return row
+
+    def update(self, observations: Dict[int, float]) -> List[int]:
+        """
+        Add one frame of evidence. Must be called every frame, also when nothing was detected,
+        since a frame without a track is evidence against it.
+
+        Args:
+            observations (dict): track_id -> detection confidence of this frame
+
+        Returns:
+            list: IDs of the tracks observed in this frame that are engaged
+        """
+        self.frame += 1
+        frame = self.frame
+
+        # Free the rows of tracks not seen for a whole window (the LRU front is the oldest)
+        while self.rows:
+            track_id, row = next(iter(self.rows.items()))
+            if frame - self.last_frame[row] < self.window:
+                break
+            del self.rows[track_id]
+            self.active[row] = False
+            self.engaged[row] = False
+            self.free_rows.append(row)
+
+        column = self._column
+        column.fill(0.0)
+        for track_id, confidence in observations.items():
+            row = self.rows.get(track_id)
+            if row is None:
+                row = self._allocate(track_id)
+            else:
+                self.rows.move_to_end(track_id)
+            column[row] = confidence
+            self.last_frame[row] = frame
+
+        # One column of the ring per frame, so rows never need their own write index
+        self.scores[:, frame % self.window] = column
+        np.minimum(self.samples + self.active, self.window, out=self.samples)
+        np.divide(self.scores.sum(axis=1), np.maximum(self.samples, 1), out=self.fused)
+
+        engage = (self.samples >= self.min_frames) & (self.fused >= self.engage_threshold)
+        self.engaged = self.active & ((self.engaged & (self.fused >= self.release_threshold)) | engage)
+
+        engaged, rows = self.engaged, self.rows
+        return [track_id for track_id in observations if track_id in rows and engaged[rows[track_id]]]
+
+    def holding(self) -> bool:
+        """True while an engaged track is kept alive by its evidence despite missing detections."""
+        return bool(self.engaged.any())
+
+    def stats(self) -> dict:
+        return {
+            'tracks': len(self.rows),
+            'engaged': int(self.engaged.sum()),
+            'evicted': self.evicted,
+            'capacity': self.capacity,
+            'memory_bytes': int(self.scores.nbytes + self.samples.nbytes + self.last_frame.nbytes
+                                + self.active.nbytes + self.engaged.nbytes + self.fused.nbytes),
+        }
@@ -0,0 +1,239 @@
+"""
+Visual Servoing Module
+
+Closes the targeting loop using the laser spot visible in the camera frame. A vectorized NumPy
+detector looks for the spot in a small, downsampled region of interest around where it is
+expected, and the error between the spot and the target drives a PID correction that is added
+on top of the open-loop angles from PanTiltController.calculate_angles.
+
+Only the region of interest is copied out of the frame buffer, so the per-frame cost stays small
+and independent of the frame resolution.
+"""
+
+import gi
+gi.require_version('Gst', '1.0')
+from gi.repository import Gst
+
+import time
+import logging
+import numpy as np
+from collections import deque
+from typing import Optional, Tuple
+
+from .config import VisualServoConfig, FovConfig
+
+
+class PIDController:
+    def __init__(self, kp: float, ki: float, kd: float, output_limit: float):
+        """
+        Initialize a PID controller with a symmetric output limit (and anti-windup on the integral).
+
+        Args:
+            kp, ki, kd (float): Proportional, integral and derivative gains
+            output_limit (float): Maximum absolute output
+        """
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.output_limit = output_limit
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.previous_error = None
+        self.output = 0.0
+
+    def update(self, error: float, dt: float) -> float:
+        """Advance the controller by dt seconds with the given error and return the new output."""
+        if dt <= 0:
+            return self.output
+        self.integral += error * dt
+        if self.ki:
+            # Anti-windup: the integral term alone can never exceed the output limit
+            integral_limit = self.output_limit / self.ki
+            self.integral = max(-integral_limit, min(self.integral, integral_limit))
+        derivative = 0.0 if self.previous_error is None else (error - self.previous_error) / dt
+        self.previous_error = error
+
+        output = self.kp * error + self.ki * self.integral + self.kd * derivative
+        self.output = max(-self.output_limit, min(output, self.output_limit))
+        return self.output
+
+
+class LaserSpotDetector:
+    def __init__(self, downsample: int = 2, roi_size: float = 0.2, min_brightness: int = 60):
+        """
+        Initialize the laser spot detector.
+
+        Args:
+            downsample (int): Pixel stride used inside the region of interest
+            roi_size (float): Side of the square region of interest, as a fraction of the frame
+            min_brightness (int): Minimum red excess (R - (G + B) / 2) of a spot pixel
+        """
+        self.downsample = downsample
+        self.roi_size = roi_size
+        self.min_brightness = min_brightness
+
+    def roi_bounds(self, width: int, height: int, expected: Tuple[float, float]) -> Tuple[int, int, int, int]:
+        """Pixel bounds (x0, y0, x1, y1) of the region of interest around a normalized position."""
+        half_w = int(self.roi_size * width / 2)
+        half_h = int(self.roi_size * height / 2)
+        cx = int(expected[0] * width)
+        cy = int(expected[1] * height)
+        x0 = min(max(cx - half_w, 0), max(width - 2 * half_w, 0))
+        y0 = min(max(cy - half_h, 0), max(height - 2 * half_h, 0))
+        return x0, y0, min(x0 + 2 * half_w, width), min(y0 + 2 * half_h, height)
+
+    def detect(self, roi: np.ndarray, bounds: Tuple[int, int, int, int], width: int, height: int) -> Optional[Tuple[float, float]]:
+        """
+        Find the laser spot in an RGB region of interest.
+
+        Args:
+            roi (np.ndarray): Downsampled RGB pixels of the region of interest, shape (h, w, 3)
+            bounds (tuple): Pixel bounds of the region of interest in the full frame
+            width, height (int): Full frame size
+
+        Returns:
+            Optional[Tuple[float, float]]: Normalized (x, y) of the spot, None if no spot was found
+        """
+        pixels = roi.astype(np.int16)
+        red_excess = pixels[..., 0] - ((pixels[..., 1] + pixels[..., 2]) >> 1)
+        mask = red_excess >= self.min_brightness
+        if not mask.any():
+            return None
+
+        # Brightness-weighted centroid of the spot pixels
+        ys, xs = np.nonzero(mask)
+        weights = red_excess[ys, xs].astype(np.float32)
+        spot_x = bounds[0] + float(np.dot(xs, weights) / weights.sum()) * self.downsample
+        spot_y = bounds[1] + float(np.dot(ys, weights) / weights.sum()) * self.downsample
+        return spot_x / width, spot_y / height
+
+
+class VisualServo:
+    def __init__(self, config: VisualServoConfig, fov: FovConfig):
+        """
+        Initialize closed-loop visual servoing.
+
+        Args:
+            config (VisualServoConfig): The visual_servo section of the configuration
+            fov (FovConfig): Camera field of view, maps image errors to angle errors
+        """
+        self.detector = LaserSpotDetector(config.downsample, config.roi_size, config.min_brightness)
+        self.pan_pid = PIDController(config.kp, config.ki, config.kd, config.max_correction_degrees)
+        self.tilt_pid = PIDController(config.kp, config.ki, config.kd, config.max_correction_degrees)
+        self.fov = fov
+        self.tolerance = config.tolerance
+        self.budget_seconds = config.budget_ms / 1000.0
+
+        self.track_id = None
+        self.last_spot = None
+        self.last_update = None
+        self.engaged_at = None
+        self.converged = False
+
+        # Statistics
+        self.convergence_times = deque(maxlen=256) # Most recent engagements only, memory stays bounded
+        self.converged_count = 0
+        self.frames = 0
+        self.spots_found = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.over_budget = 0
+
+    def reset(self):
+        """Forget the current target (called when the engagement ends or the target changes)."""
+        self.pan_pid.reset()
+        self.tilt_pid.reset()
+        self.track_id = None
+        self.last_spot = None
+        self.last_update = None
+        self.engaged_at = None
+        self.converged = False
+
+    def _extract_roi(self, buffer: Gst.Buffer, width: int, height: int, stride: int, expected: Tuple[float, float]):
+        """Copy only the downsampled region of interest out of an RGB frame buffer with rows of stride bytes."""
+        success, map_info = buffer.map(Gst.MapFlags.READ)
+        if not success:
+            return None, None
+        try:
+            frame = np.ndarray(shape=(height, width, 3), dtype=np.uint8, buffer=map_info.data, strides=(stride, 3, 1))
+            bounds = self.detector.roi_bounds(width, height, expected)
+            step = self.detector.downsample
+            roi = frame[bounds[1]:bounds[3]:step, bounds[0]:bounds[2]:step].copy()
+            return roi, bounds
+        finally:
+            buffer.unmap(map_info)
+
+    def update(self, buffer: Gst.Buffer, width: int, height: int, target: Tuple[float, float], track_id: int,
+               stride: Optional[int] = None) -> Tuple[float, float]:
+        """
+        Measure the spot in the frame and return the PID angle correction for the target.
+
+        Args:
+            buffer (Gst.Buffer): RGB frame in which the laser spot is searched
+            width, height (int): Frame size
+            target (tuple): Normalized (x, y) of the target
+            track_id (int): Tracking ID of the target, the loop is reset when it changes
+            stride (int): Bytes per row of the frame (GStreamer pads RGB rows to 4 bytes), width * 3 if None
+
+        Returns:
+            Tuple[float, float]: (pan, tilt) corrections in degrees, to add to the open-loop angles
+        """
+        start = time.perf_counter()
+        now = time.monotonic()
+        if track_id != self.track_id:
+            self.reset()
+            self.track_id = track_id
+            self.engaged_at = now
+
+        # Look for the spot where it was last seen, or at the target if it was never seen
+        roi, bounds = self._extract_roi(buffer, width, height, stride or width * 3, self.last_spot or target)
+        spot = self.detector.detect(roi, bounds, width, height) if roi is not None else None
+
+        if spot is not None:
+            self.spots_found += 1
+            self.last_spot = spot
+            error_x = target[0] - spot[0]
+            error_y = target[1] - spot[1]
+            dt = now - self.last_update if self.last_update is not None else 0.0
+            self.last_update = now
+
+            # Same sign convention as calculate_angles: pan is mirrored, tilt follows the image
+            self.pan_pid.update(-error_x * self.fov.horizontal, dt)
+            self.tilt_pid.update(error_y * self.fov.vertical, dt)
+
+            if not self.converged and abs(error_x) <= self.tolerance and abs(error_y) <= self.tolerance:
+                self.converged = True
+                self.converged_count += 1
+                self.convergence_times.append(now - self.engaged_at)
+                logging.debug("Laser spot converged on track %s in %.3fs", track_id, now - self.engaged_at)
+
+        elapsed = time.perf_counter() - start
+        self.frames += 1
+        self.total_seconds += elapsed
+        self.max_seconds = max(self.max_seconds, elapsed)
+        if elapsed > self.budget_seconds:
+            self.over_budget += 1
+
+        return self.pan_pid.output, self.tilt_pid.output
+
+    def stats(self) -> dict:
+        """
+        Get visual servoing statistics.
+
+        Returns:
+            dict: frames, spot detection rate, mean/max per-frame cost (ms), frames over budget,
+                  engagements converged and mean (over recent engagements) / last convergence time (s)
+        """
+        times = self.convergence_times
+        return {
+            'frames': self.frames,
+            'spot_rate': self.spots_found / self.frames if self.frames else 0.0,
+            'mean_ms': 1000.0 * self.total_seconds / self.frames if self.frames else 0.0,
+            'max_ms': 1000.0 * self.max_seconds,
+            'over_budget': self.over_budget,
+            'converged': self.converged_count,
+            'mean_convergence_s': sum(times) / len(times) if times else None,
+            'last_convergence_s': times[-1] if times else None,
+        }
@@ -0,0 +1,79 @@
+# tests/test_async_logging.py
+#
+# Rate limiting, dropping and the shutdown report of the logging pipeline, pure Python:
+#   $ python -m pytest tests/test_async_logging.py
+
+import queue
+import logging
+
+import pytest
+
+from src.async_logging import AsyncLogPipeline, CallSiteRateLimiter, DroppingQueueHandler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def record(lineno=10, level=logging.INFO, pathname='src/object_targeting_app.py'):
+    return logging.LogRecord('test', level, pathname, lineno, 'frame %d', (1,), None)
+
+
+def passed(limiter, count, **kwargs):
+    return sum(limiter.filter(record(**kwargs)) for _ in range(count))
+
+
+def test_token_bucket_per_call_site():
+    clock = FakeClock()
+    limiter = CallSiteRateLimiter(per_second=2.0, burst=3, clock=clock)
+    assert passed(limiter, 5) == 3 # The burst, then suppressed
+    assert passed(limiter, 5, lineno=11) == 3 # Another call-site has its own bucket
+    assert limiter.suppressed == 4
+
+    clock.now += 1.0 # Two tokens refilled
+    assert passed(limiter, 5) == 2
+    clock.now += 60.0 # Refilled up to the burst only
+    assert passed(limiter, 5) == 3
+    assert limiter.suppressed == 9
+
+
+def test_warnings_bypass_the_limiter():
+    limiter = CallSiteRateLimiter(per_second=1.0, burst=1, clock=FakeClock())
+    assert passed(limiter, 5, level=logging.WARNING) == 5
+    assert passed(limiter, 5, level=logging.ERROR) == 5
+    assert passed(limiter, 5) == 1
+    assert passed(CallSiteRateLimiter(per_second=0, burst=1), 5) == 5 # 0 disables it
+
+
+def test_full_queue_drops_and_counts():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    for _ in range(5):
+        handler.handle(record()) # Never blocks
+    assert (handler.enqueued, handler.dropped) == (2, 3)
+    assert handler.queue.get_nowait().getMessage() == 'frame 1' # Formatted later, on the listener
+
+
+@pytest.fixture
+def root_logger():
+    root = logging.getLogger()
+    level = root.level
+    yield root
+    root.setLevel(level)
+
+
+def test_stop_writes_the_drop_count_to_the_file(tmp_path, root_logger):
+    log_path = tmp_path / 'app.log'
+    pipeline = AsyncLogPipeline(str(log_path), queue_size=1)
+    logging.info("before the stop")
+    pipeline.queue_handler.dropped = 7 # As if the queue had been full
+    pipeline.stop()
+    pipeline.stop() # Idempotent
+
+    text = log_path.read_text()
+    assert 'before the stop' in text
+    assert 'Async logging dropped 7 records (queue full) and rate-limited 0 records' in text
+    assert pipeline.queue_handler not in root_logger.handlers
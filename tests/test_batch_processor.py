@@ -0,0 +1,87 @@
+# tests/test_batch_processor.py
+#
+# Clip discovery, result aggregation and the report, with the per-clip worker stubbed out (no
+# GStreamer, no Hailo):
+#   $ python -m pytest tests/test_batch_processor.py
+
+import json
+
+import pytest
+
+from benchmarks.fakes import install_import_stubs
+
+install_import_stubs(('gi', 'hailo', 'setproctitle', 'cv2'))
+
+from src import batch_processor
+from src.batch_processor import CLIP_TIMEOUT_MARGIN, DEFAULT_CLIP_TIMEOUT, build_report, clip_timeout_from_duration, run_batch
+
+
+class InlinePool:
+    """Runs the tasks in this process, completing them in reverse order like an unordered pool may."""
+
+    def __init__(self, processes, maxtasksperchild=None):
+        self.processes = processes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def imap_unordered(self, function, tasks):
+        return [function(task) for task in reversed(tasks)]
+
+
+def fake_process_clip(clip_path, config, output_base, output_format, multi_process, clip_timeout=0.0):
+    stalled = 'stalled' in clip_path
+    return {
+        'clip': clip_path,
+        'frames': 0 if stalled else 100,
+        'detections': 0 if stalled else 7,
+        'seconds': clip_timeout if stalled else 2.0,
+        'fps': 0.0 if stalled else 50.0,
+        'output': None if stalled else f'{output_base}.{output_format}',
+        'error': f"Timed out after {clip_timeout:.0f}s, the clip stalled" if stalled else None,
+    }
+
+
+@pytest.fixture
+def clips_dir(tmp_path):
+    clips = tmp_path / 'recordings'
+    (clips / 'roof').mkdir(parents=True)
+    for name in ('b.mp4', 'a.h264', 'roof/c.MOV', 'roof/stalled.mp4', 'notes.txt'):
+        (clips / name).touch()
+    return clips
+
+
+def test_report_aggregates_the_clips(clips_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_processor, 'process_clip', fake_process_clip)
+    monkeypatch.setattr(batch_processor.multiprocessing, 'get_context', lambda method: type('Context', (), {'Pool': InlinePool}))
+    output = tmp_path / 'output'
+
+    report = run_batch(str(clips_dir), None, str(output), workers=2, output_format='npz', clip_timeout=30.0)
+    assert (report['clips'], report['failed'], report['workers']) == (4, 1, 2)
+    assert (report['frames'], report['detections']) == (300, 21)
+    assert [stats['clip'] for stats in report['results']] == sorted(stats['clip'] for stats in report['results'])
+    assert report['results'][0]['output'] == str(output / 'a.npz') # Mirrors the input tree
+    stalled = [stats for stats in report['results'] if stats['error']]
+    assert stalled[0]['clip'].endswith('stalled.mp4')
+    assert stalled[0]['error'] == "Timed out after 30s, the clip stalled"
+
+    assert json.loads((output / 'report.json').read_text()) == report
+
+
+def test_report_of_an_empty_batch(tmp_path):
+    report = build_report([], 0, 3, 0.0)
+    assert (report['clips'], report['failed'], report['frames'], report['aggregate_fps']) == (0, 0, 0, 0.0)
+
+
+def test_aggregate_fps_is_over_the_wall_time():
+    results = [fake_process_clip(f'clip{index}.mp4', None, f'out/clip{index}', 'npz', True) for index in range(3)]
+    assert build_report(results, 3, 3, 4.0)['aggregate_fps'] == pytest.approx(300 / 4.0)
+
+
+def test_clip_timeout_follows_the_duration():
+    assert clip_timeout_from_duration(30.0) == pytest.approx(CLIP_TIMEOUT_MARGIN + 4.0 * 30.0)
+    assert clip_timeout_from_duration(None) == DEFAULT_CLIP_TIMEOUT
+    assert clip_timeout_from_duration(0.0) == DEFAULT_CLIP_TIMEOUT
@@ -0,0 +1,134 @@
+# tests/test_config.py
+#
+# Validation of the repository config.yaml and of broken variants, with empty resource files:
+#   $ python -m pytest tests/test_config.py
+
+import os
+import copy
+
+import pytest
+import yaml
+
+from src.config import ConfigurationError, build_config, load_config
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+with open(os.path.join(REPO_DIR, 'config.yaml')) as f:
+    RAW = yaml.safe_load(f)
+
+
+@pytest.fixture
+def base_dir(tmp_path):
+    """A directory holding the resources of config.yaml (relative 'resources'), as empty files."""
+    resources = tmp_path / 'resources'
+    resources.mkdir()
+    model = RAW['paths']['model']
+    for name in (model['hef_file'], model['post_process_so'], *RAW['models']['hef_files'].values()):
+        (resources / name).touch()
+    return tmp_path
+
+
+def build(base_dir, **changes):
+    """Build config.yaml with changes, e.g. servo__pan__channel=3 (None deletes the key)."""
+    raw = copy.deepcopy(RAW)
+    for key, value in changes.items():
+        *parents, leaf = key.split('__')
+        section = raw
+        for parent in parents:
+            section = section.setdefault(parent, {})
+        if value is None:
+            section.pop(leaf, None)
+        else:
+            section[leaf] = value
+    return build_config(raw, str(base_dir))
+
+
+def assert_invalid(base_dir, match, **changes):
+    with pytest.raises(ConfigurationError, match=match):
+        build(base_dir, **changes)
+
+
+def test_repository_config_is_valid(base_dir):
+    config = build(base_dir)
+    assert config.servo.pan.angle_scale == pytest.approx(config.fov.horizontal * 0.9)
+    assert config.models.idle_model == 'yolov8n'
+
+
+def test_load_config_reports_a_missing_file(tmp_path):
+    with pytest.raises(ConfigurationError, match='not found'):
+        load_config(str(tmp_path / 'missing.yaml'))
+
+
+@pytest.mark.parametrize('key, match', [
+    ('fov', r'^fov: missing required section'),
+    ('servo__tilt', r'^servo\.tilt: missing required section'),
+    ('detection__nms_score_threshold', r'^detection\.nms_score_threshold: missing required setting'),
+    ('servo__pan__channel', r'^servo\.pan\.channel: missing required setting'),
+    ('laser__pin', r'^laser\.pin: missing required setting'),
+])
+def test_missing_keys_name_their_path(base_dir, key, match):
+    assert_invalid(base_dir, match, **{key: None})
+
+
+@pytest.mark.parametrize('key, value, match', [
+    ('detection__nms_score_threshold', 1.5, 'above the maximum of 1'),
+    ('servo__pan__channel', 16, 'above the maximum of 15'),
+    ('servo__tilt__min_angle', -200, 'below the minimum of -180'),
+    ('servo__i2c_address', 0x80, 'above the maximum'),
+    ('fov__horizontal', 'wide', 'expected a number'),
+    ('servo__pan__channel', 1.0, 'expected an integer'),
+    ('servo__pan__channel', True, 'expected an integer'),
+    ('laser__mode', 'pulse', "'pulse' is not one of gpio, pwm"),
+    ('operating_windows__windows', [{'start': '24:30', 'end': '06:00'}], r'windows\[0\]\.start: invalid time'),
+])
+def test_out_of_range_and_wrongly_typed_values(base_dir, key, value, match):
+    assert_invalid(base_dir, match, **{key: value})
+
+
+def test_relative_paths_are_resolved_against_the_base_dir(base_dir):
+    config = build(base_dir)
+    assert config.paths.resources_dir == os.path.join(str(base_dir), 'resources')
+    assert config.paths.hef_path == os.path.join(str(base_dir), 'resources', RAW['paths']['model']['hef_file'])
+
+    frames = base_dir / 'scene.rgb'
+    frames.touch()
+    assert build(base_dir, source__type='raw', source__raw_path='scene.rgb').source.raw_path == str(frames)
+    assert build(base_dir, source__type='raw', source__raw_path=str(frames)).source.raw_path == str(frames)
+
+    # An absolute resources_dir is kept as is
+    config = build(base_dir, paths__resources_dir=str(base_dir / 'resources'))
+    assert config.paths.resources_dir == str(base_dir / 'resources')
+
+
+def test_missing_files_are_reported(base_dir):
+    assert_invalid(base_dir, 'HEF file not found', paths__resources_dir='elsewhere')
+    assert_invalid(base_dir, 'raw frame file not found', source__type='raw', source__raw_path='missing.rgb')
+    (base_dir / 'resources' / RAW['models']['hef_files']['yolov8n']).unlink()
+    build(base_dir) # Only checked when model switching is enabled
+    assert_invalid(base_dir, r'models\.hef_files\.yolov8n: HEF file not found', models__enabled=True)
+
+
+@pytest.mark.parametrize('changes, match', [
+    ({'servo__pan__min_angle': 90}, r'servo\.pan: min_angle \(90\.0\) must be below max_angle'),
+    ({'servo__tilt__channel': 0}, 'cannot share PCA9685 channel 0'),
+    ({'laser__mode': 'pwm', 'laser__pwm__channel': 1}, 'already used by a servo'),
+    ({'laser__pwm__pattern': 'disco'}, r"laser\.pwm\.pattern: 'disco' is not one of"),
+    ({'evidence__window_frames': 4, 'evidence__min_frames': 5}, 'min_frames must not exceed window_frames'),
+    ({'evidence__engage_threshold': 0.3, 'evidence__release_threshold': 0.5}, 'release_threshold must not exceed engage_threshold'),
+    ({'models__idle_model': 'yolov8x'}, r"models\.idle_model: 'yolov8x' is not one of the hef_files models \(yolov8n, yolov8s\)"),
+    ({'models__engaged_model': ''}, r'models\.engaged_model'),
+    ({'models__enabled': True, 'models__hef_files': {}}, 'at least one model is needed'),
+])
+def test_cross_field_checks(base_dir, changes, match):
+    assert_invalid(base_dir, match, **changes)
+
+
+def test_models_without_hef_files_while_disabled(base_dir):
+    config = build(base_dir, models__hef_files={}, models__idle_model=None, models__engaged_model=None)
+    assert (config.models.hef_paths, config.models.idle_model) == ((), '')
+
+
+def test_preview_listens_locally_unless_exposed(base_dir):
+    assert build(base_dir).preview.host == '127.0.0.1'
+    assert build(base_dir, preview__host=None).preview.host == '127.0.0.1'
+    assert build(base_dir, preview__host='0.0.0.0').preview.host == '0.0.0.0'
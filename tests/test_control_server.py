@@ -0,0 +1,111 @@
+# tests/test_control_server.py
+#
+# JSON-RPC handling of the control API, without a main loop (GLib is stubbed when not installed):
+#   $ python -m pytest tests/test_control_server.py
+
+import os
+import json
+import stat
+
+import pytest
+
+from benchmarks.fakes import install_import_stubs
+
+install_import_stubs(('gi',))
+
+from src.config import ControlConfig
+from src.control_server import ControlServer, INTERNAL_ERROR, INVALID_PARAMS, INVALID_REQUEST, METHOD_NOT_FOUND, PARSE_ERROR
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = ControlServer(ControlConfig(enabled=True, socket_path=str(tmp_path / 'control.sock'), max_clients=2, max_request_bytes=4096))
+    server.register('add', lambda a, b: a + b)
+    server.register('status', lambda: {'laser': 'paused'})
+
+    def fail():
+        raise RuntimeError("servo bus down")
+    server.register('fail', fail)
+
+    def buggy(value):
+        return len(value) + 1 # A TypeError from the body for a number
+    server.register('buggy', buggy)
+
+    def checked(value):
+        if value < 0:
+            raise ValueError("value must be non-negative")
+        return value
+    server.register('checked', checked)
+    return server
+
+
+def call(server, line):
+    response = server.handle_line(line.encode() if isinstance(line, str) else line)
+    return None if response is None else json.loads(response)
+
+
+def test_request_returns_the_result(server):
+    assert call(server, '{"jsonrpc": "2.0", "id": 7, "method": "add", "params": {"a": 2, "b": 3}}') == {'jsonrpc': '2.0', 'id': 7, 'result': 5}
+    assert call(server, '{"jsonrpc": "2.0", "id": "s", "method": "status"}')['result'] == {'laser': 'paused'}
+    assert server.requests == 2
+
+
+def test_notifications_get_no_response(server):
+    assert call(server, '{"jsonrpc": "2.0", "method": "status"}') is None
+    assert call(server, '[{"jsonrpc": "2.0", "method": "status"}]') is None
+    assert server.requests == 2
+
+
+def test_batch_keeps_the_order_and_skips_notifications(server):
+    responses = call(server, json.dumps([
+        {'jsonrpc': '2.0', 'id': 1, 'method': 'add', 'params': {'a': 1, 'b': 1}},
+        {'jsonrpc': '2.0', 'method': 'status'},
+        {'jsonrpc': '2.0', 'id': 2, 'method': 'missing'},
+    ]))
+    assert [response['id'] for response in responses] == [1, 2]
+    assert responses[0]['result'] == 2
+    assert responses[1]['error']['code'] == METHOD_NOT_FOUND
+
+
+@pytest.mark.parametrize('line, code', [
+    ('{"jsonrpc": "2.0", "id": 1, "method": ', PARSE_ERROR),
+    (b'\xff\xfe', PARSE_ERROR),
+    ('{"jsonrpc": "2.0", "id": 1}', INVALID_REQUEST),
+    ('{"jsonrpc": "2.0", "id": 1, "method": 3}', INVALID_REQUEST),
+    ('"status"', INVALID_REQUEST),
+    ('{"jsonrpc": "2.0", "id": 1, "method": "laser.fire"}', METHOD_NOT_FOUND),
+    ('{"jsonrpc": "2.0", "id": 1, "method": "add", "params": [1, 2]}', INVALID_PARAMS),
+    ('{"jsonrpc": "2.0", "id": 1, "method": "add", "params": {"a": 1}}', INVALID_PARAMS),
+    ('{"jsonrpc": "2.0", "id": 1, "method": "add", "params": {"a": 1, "b": 2, "c": 3}}', INVALID_PARAMS),
+    ('{"jsonrpc": "2.0", "id": 1, "method": "checked", "params": {"value": -1}}', INVALID_PARAMS),
+    ('{"jsonrpc": "2.0", "id": 1, "method": "fail"}', INTERNAL_ERROR),
+    ('{"jsonrpc": "2.0", "id": 1, "method": "buggy", "params": {"value": 3}}', INTERNAL_ERROR),
+])
+def test_errors(server, line, code):
+    assert call(server, line)['error']['code'] == code
+
+
+def test_dispatch_answers_errors_of_notifications_only_when_unparseable(server):
+    assert server.dispatch({'jsonrpc': '2.0', 'method': 'missing'}) is None
+    assert server.dispatch({'jsonrpc': '2.0', 'method': 'fail'}) is None
+    assert server.dispatch(['not', 'a', 'request'])['error']['code'] == INVALID_REQUEST
+
+
+def test_handler_bugs_are_logged_as_internal_errors(server, caplog):
+    assert call(server, '{"jsonrpc": "2.0", "id": 1, "method": "buggy", "params": {"value": 3}}')['error']['code'] == INTERNAL_ERROR
+    assert 'Control API method buggy failed' in caplog.text
+    assert 'Traceback' in caplog.text
+
+
+def test_socket_is_owner_only_and_the_umask_untouched(server, tmp_path):
+    (tmp_path / 'control.sock').touch() # Stale socket of a previous run
+    umask = os.umask(0o022)
+    try:
+        server.start()
+        assert stat.S_ISSOCK(os.stat(server.socket_path).st_mode)
+        assert stat.S_IMODE(os.stat(server.socket_path).st_mode) == 0o600
+        assert os.umask(0o022) == 0o022
+    finally:
+        os.umask(umask)
+        server.stop()
+    assert os.listdir(tmp_path) == [] # Neither the socket nor the private directory is left behind
@@ -0,0 +1,98 @@
+# tests/test_engagement_scheduler.py
+#
+# Pure Python, runs anywhere:
+#   $ python -m pytest tests/test_engagement_scheduler.py
+
+import pytest
+
+from src.config import SchedulerConfig
+from src.engagement_scheduler import EngagementScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler(dwell=2.0, cooldown=10.0):
+    clock = FakeClock()
+    scheduler = EngagementScheduler(SchedulerConfig(enabled=True, dwell_seconds=dwell, cooldown_seconds=cooldown), clock=clock)
+    return scheduler, clock
+
+
+def test_rotates_to_the_nearest_target_after_each_dwell():
+    scheduler, clock = make_scheduler()
+    candidates = {1: (30.0, 0.0), 2: (-5.0, 0.0), 3: (10.0, 5.0)}
+    assert scheduler.select(candidates, aim=(0.0, 0.0)) == 2 # Nearest from the aim
+    clock.now += 1.0
+    assert scheduler.select(candidates, aim=(-5.0, 0.0)) == 2 # Dwell not over
+    clock.now += 1.0
+    assert scheduler.select(candidates, aim=(-5.0, 0.0)) == 3 # 2 cools down, 3 is nearer than 1
+    clock.now += 2.0
+    assert scheduler.select(candidates, aim=(10.0, 5.0)) == 1
+    assert scheduler.stats()['hits'] == 2
+
+
+def test_lost_target_is_abandoned_not_hit():
+    scheduler, clock = make_scheduler()
+    scheduler.select({1: (0.0, 0.0), 2: (20.0, 0.0)}, aim=(0.0, 0.0))
+    clock.now += 0.5
+    assert scheduler.select({2: (20.0, 0.0)}, aim=(0.0, 0.0)) == 2
+    stats = scheduler.stats()
+    assert (stats['hits'], stats['abandoned']) == (0, 1)
+
+
+def test_cooldown_expires():
+    scheduler, clock = make_scheduler(dwell=2.0, cooldown=5.0)
+    candidates = {1: (0.0, 0.0), 2: (20.0, 0.0)}
+    assert scheduler.select(candidates, aim=(0.0, 0.0)) == 1
+    clock.now = 102.0
+    assert scheduler.select(candidates, aim=(0.0, 0.0)) == 2 # 1 cools down until 107
+    clock.now = 104.0
+    assert scheduler.select(candidates, aim=(20.0, 0.0)) == 2 # Both cooling down: the nearest, rather than idle
+    assert scheduler.stats()['cooling_down'] == 2
+    clock.now = 107.5
+    assert scheduler.select(candidates, aim=(20.0, 0.0)) == 1 # 1 expired, 2 cools down again although nearer
+
+    scheduler.reset()
+    clock.now += 30.0
+    scheduler.select({}, aim=(0.0, 0.0))
+    assert scheduler.stats()['cooling_down'] == 0 # The cache is emptied as entries expire
+
+
+def test_lone_target_is_counted_once_per_cooldown():
+    scheduler, clock = make_scheduler(dwell=2.0, cooldown=10.0)
+    for _ in range(6): # Re-engaged after every dwell, for 12 s
+        assert scheduler.select({1: (0.0, 0.0)}, aim=(0.0, 0.0)) == 1
+        clock.now += 2.0
+    assert scheduler.select({1: (0.0, 0.0)}, aim=(0.0, 0.0)) == 1
+    stats = scheduler.stats()
+    assert (stats['hits'], stats['birds_per_minute']) == (2, 2) # At 102 and 112, not 5
+    assert stats['switches'] == 1
+
+
+def test_travel_between_targets():
+    scheduler, clock = make_scheduler(dwell=1.0)
+    candidates = {1: (10.0, 4.0), 2: (10.0, -20.0)}
+    scheduler.select(candidates, aim=(0.0, 0.0)) # 10° away (pan dominates)
+    clock.now += 1.0
+    scheduler.select(candidates, aim=(10.0, 4.0)) # 24° away (tilt dominates)
+    stats = scheduler.stats()
+    assert stats['switches'] == 2
+    assert stats['mean_travel_degrees'] == pytest.approx((10.0 + 24.0) / 2)
+
+
+def test_birds_per_minute_is_a_sliding_window():
+    scheduler, clock = make_scheduler(dwell=1.0, cooldown=1.0)
+    candidates = {1: (0.0, 0.0), 2: (1.0, 0.0)}
+    for _ in range(4):
+        scheduler.select(candidates, aim=(0.0, 0.0))
+        clock.now += 1.0
+    scheduler.select(candidates, aim=(0.0, 0.0))
+    assert scheduler.stats()['birds_per_minute'] == 4
+    clock.now += 61.0
+    assert scheduler.stats()['birds_per_minute'] == 0
+    assert scheduler.stats()['hits'] == 4
@@ -0,0 +1,153 @@
+# tests/test_event_recorder.py
+#
+# The pre-roll ring and the clip writer with fake encoded frames, no pipeline (GStreamer is stubbed
+# when not installed):
+#   $ python -m pytest tests/test_event_recorder.py
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.fakes import install_import_stubs
+
+install_import_stubs(('gi',))
+
+from src.config import RecordingConfig
+from src.event_recorder import EventClipRecorder
+
+SECOND = 1_000_000_000
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBuffer:
+    """Stands in for an encoded Gst.Buffer."""
+
+    def __init__(self, pts, data, keyframe):
+        self.pts = pts
+        self.data = data
+        self.keyframe = keyframe
+
+    def map(self, flags):
+        return True, SimpleNamespace(data=self.data)
+
+    def unmap(self, map_info):
+        pass
+
+    def has_flags(self, flags):
+        return not self.keyframe # Only asked for DELTA_UNIT
+
+
+class FakeAppsink:
+    def __init__(self):
+        self.buffer = None
+
+    def emit(self, signal):
+        return SimpleNamespace(get_buffer=lambda: self.buffer)
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    clock = FakeClock()
+    recorder = EventClipRecorder(RecordingConfig(
+        enabled=True, output_dir=str(tmp_path), pre_roll_seconds=1.0, post_roll_seconds=2.0,
+        max_buffer_mb=1.0, width=640, height=360, bitrate_kbps=1000,
+    ), clock=clock)
+    recorder.appsink = FakeAppsink()
+    recorder.fake_clock = clock
+    yield recorder
+    recorder.stop()
+
+
+def push(recorder, pts, data, keyframe=False):
+    recorder.appsink.buffer = FakeBuffer(pts, data, keyframe)
+    recorder._on_new_sample(recorder.appsink)
+
+
+def clips(tmp_path):
+    return [path.read_bytes() for path in sorted(tmp_path.glob('clip_*.h264'))]
+
+
+def test_ring_is_trimmed_to_the_pre_roll(recorder):
+    for index in range(12): # 0 .. 2.75 s
+        recorder._push_ring(index * SECOND // 4, b'x' * 10, is_keyframe=False)
+    assert [pts for pts, _, _ in recorder._ring] == [index * SECOND // 4 for index in range(7, 12)]
+    assert recorder._ring_bytes == 5 * 10
+
+
+def test_ring_is_trimmed_to_the_byte_limit(recorder):
+    frame = b'x' * (300 * 1024)
+    for index in range(5):
+        recorder._push_ring(index, frame, is_keyframe=True)
+    assert len(recorder._ring) == 3 # 900 kB under the 1 MB limit
+    assert recorder._ring[0][0] == 2
+    assert recorder._ring_bytes == 3 * len(frame)
+
+
+def test_pre_roll_starts_at_a_keyframe(recorder, tmp_path):
+    push(recorder, 0, b'd0')
+    push(recorder, 1, b'K1', keyframe=True)
+    push(recorder, 2, b'd2')
+    recorder.trigger()
+    push(recorder, 3, b'd3') # Starts the clip with the ring, this frame included
+    push(recorder, 4, b'd4')
+    recorder.stop()
+    assert clips(tmp_path) == [b'K1d2d3d4']
+    assert recorder.clips_written == 1
+
+
+def test_trigger_extends_the_post_roll(recorder, tmp_path):
+    clock = recorder.fake_clock
+    recorder.trigger()
+    push(recorder, 0, b'K0', keyframe=True) # Clip until 102
+    clock.now = 101.5
+    recorder.trigger() # Still engaged: until 103.5
+    clock.now = 102.5
+    push(recorder, 1, b'd1')
+    clock.now = 103.5
+    push(recorder, 2, b'd2') # The last frame of the clip
+    push(recorder, 3, b'd3')
+    recorder.stop()
+    assert clips(tmp_path) == [b'K0d1d2']
+    assert recorder.clips_written == 1
+
+
+def test_dropped_frame_skips_to_the_next_keyframe(recorder, tmp_path):
+    recorder.trigger()
+    push(recorder, 0, b'K0', keyframe=True)
+    recorder.max_queued_writes = 0 # Writer behind: frames are dropped, never 'open' or 'close'
+    push(recorder, 1, b'd1')
+    recorder.max_queued_writes = 512
+    push(recorder, 2, b'd2') # Depends on the dropped frame
+    push(recorder, 3, b'K3', keyframe=True)
+    push(recorder, 4, b'd4')
+    assert recorder.dropped_writes == 2
+
+    recorder.max_queued_writes = 0
+    recorder.fake_clock.now = 103.0
+    push(recorder, 5, b'd5') # Dropped, but the clip is still closed
+    recorder.max_queued_writes = 512
+    time.sleep(0.002) # Clip names have a millisecond resolution
+    recorder.trigger()
+    push(recorder, 6, b'K6', keyframe=True) # A new clip, not appended to the previous one
+    recorder.stop()
+    assert clips(tmp_path) == [b'K0K3d4', b'K0d1d2K3d4d5K6'] # The second one from the ring
+    assert recorder.clips_written == 2
+
+
+def test_stop_closes_the_open_clip(recorder, tmp_path):
+    recorder.trigger()
+    push(recorder, 0, b'K0', keyframe=True)
+    push(recorder, 1, b'd1')
+    recorder.stop()
+    assert clips(tmp_path) == [b'K0d1']
+    assert recorder.clips_written == 1
+    assert not recorder._writer.is_alive()
+    recorder.stop() # Idempotent
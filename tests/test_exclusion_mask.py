@@ -0,0 +1,75 @@
+# tests/test_exclusion_mask.py
+#
+# Pure numpy, runs anywhere:
+#   $ python -m pytest tests/test_exclusion_mask.py
+
+import pytest
+
+from src.config import ExclusionConfig, ExclusionZone
+from src.exclusion_mask import ExclusionMask
+
+PAN_LIMITS = (-45.0, 45.0)
+TILT_LIMITS = (-30.0, 30.0)
+SQUARE = ((10.0, 10.0), (20.0, 10.0), (20.0, 20.0), (10.0, 20.0))
+
+
+def make_mask(*polygons, margin=0.0, resolution=1.0):
+    return ExclusionMask(ExclusionConfig(
+        enabled=True,
+        resolution_degrees=resolution,
+        margin_degrees=margin,
+        servo_seconds_per_degree=0.002,
+        zones=tuple(ExclusionZone(f'zone{index}', polygon) for index, polygon in enumerate(polygons)),
+    ), PAN_LIMITS, TILT_LIMITS)
+
+
+def test_polygon_blocks_the_cells_inside_it():
+    mask = make_mask(SQUARE)
+    assert (mask.columns, mask.rows) == (91, 61)
+    assert mask.blocked_cells == 10 * 10 # Cell centers 10.5 .. 19.5 on both axes
+    assert mask.is_blocked(15.0, 15.0)
+    assert mask.is_blocked(10.2, 19.8)
+    assert not mask.is_blocked(9.5, 15.0)
+    assert not mask.is_blocked(15.0, 20.5)
+    assert not mask.is_blocked(0.0, 0.0)
+
+
+def test_triangle_follows_its_diagonal():
+    mask = make_mask(((0.0, 0.0), (10.0, 0.0), (0.0, 10.0)))
+    assert mask.blocked_cells == pytest.approx(50, abs=6)
+    assert mask.is_blocked(2.0, 2.0)
+    assert mask.is_blocked(6.5, 2.5)
+    assert not mask.is_blocked(7.5, 7.5) # Beyond the hypotenuse
+
+
+def test_margin_dilates_the_zone():
+    mask = make_mask(SQUARE, margin=2.0)
+    assert mask.blocked_cells == 14 * 14
+    assert mask.is_blocked(8.5, 15.0)
+    assert mask.is_blocked(21.5, 21.5) # Square margin: corners too
+    assert not mask.is_blocked(7.5, 15.0)
+    assert not mask.is_blocked(15.0, 22.5)
+
+    # A margin that is not a multiple of the resolution is rounded up, never down
+    assert make_mask(SQUARE, margin=0.5).blocked_cells == 12 * 12
+
+
+def test_path_crossing_a_zone_is_blocked():
+    mask = make_mask(SQUARE)
+    assert mask.path_blocked(0.0, 15.0, 30.0, 15.0) # Both ends clear, the middle is not
+    assert mask.path_blocked(30.0, 25.0, 0.0, 5.0) # Diagonal, through the square
+    assert not mask.path_blocked(0.0, 0.0, 30.0, 0.0)
+    assert not mask.path_blocked(0.0, 5.0, 5.0, 25.0)
+    assert mask.path_blocked(15.0, 15.0, 15.0, 15.0) # No move, inside
+    assert not mask.path_blocked(0.0, 0.0, 0.0, 0.0)
+
+
+def test_points_outside_the_servo_limits_use_the_nearest_edge_cell():
+    # Zone along the pan max edge of the servo range
+    mask = make_mask(((40.0, -5.0), (50.0, -5.0), (50.0, 5.0), (40.0, 5.0)))
+    assert mask.is_blocked(60.0, 0.0)
+    assert mask.is_blocked(1e6, 0.0)
+    assert not mask.is_blocked(60.0, 20.0)
+    assert not mask.is_blocked(-60.0, 0.0)
+    assert not mask.is_blocked(0.0, -100.0)
+    assert mask.path_blocked(0.0, 0.0, 90.0, 0.0) # The end of the move is clamped into the zone
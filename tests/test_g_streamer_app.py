@@ -0,0 +1,45 @@
+# tests/test_g_streamer_app.py
+#
+# Pipeline string builders, no GStreamer (the bindings are stubbed when not installed):
+#   $ python -m pytest tests/test_g_streamer_app.py
+
+from benchmarks.fakes import install_import_stubs
+
+install_import_stubs(('gi', 'hailo', 'setproctitle', 'cv2'))
+
+from src.g_streamer_app import DUAL_SOURCE_PIPELINE
+
+
+def test_inference_stream_comes_from_the_isp_at_network_resolution():
+    pipeline = DUAL_SOURCE_PIPELINE('rpi', video_width=640, video_height=640, full_width=1920, full_height=1080)
+    inference = pipeline[pipeline.index('source.src_0 !'):]
+    assert inference.startswith('source.src_0 ! video/x-raw, format=RGB, width=640, height=640 ! ')
+    assert '1920' not in inference
+    assert 'source.src ! video/x-raw, format=I420, width=1920, height=1080 ! ' in pipeline
+    assert 'videoconvert' not in pipeline # Nothing converts or scales a full-resolution frame
+    assert 'videoscale' not in pipeline
+    assert 'queue name=source_q ' in inference # Continues towards inference
+
+
+def test_full_resolution_tee_only_with_branches():
+    with_branches = DUAL_SOURCE_PIPELINE('rpi', full_res=True)
+    assert 'tee name=source_full_tee' in with_branches
+    assert 'source_full_q' in with_branches
+
+    without = DUAL_SOURCE_PIPELINE('rpi', full_res=False)
+    assert 'source_full' not in without
+    assert 'src_0' not in without # A single stream from the camera
+    assert without.startswith('libcamerasrc name=source ! video/x-raw, format=RGB, width=640, height=640 ! ')
+
+
+def test_videotest_variant_stands_in_with_two_sources():
+    pipeline = DUAL_SOURCE_PIPELINE('videotest', framerate=15)
+    assert pipeline.count('videotestsrc') == 2
+    assert 'videotestsrc name=source_full ' in pipeline
+    assert 'videotestsrc name=source ' in pipeline
+    assert 'video/x-raw, format=RGB, width=640, height=640, framerate=15/1' in pipeline
+    assert 'video/x-raw, format=I420, width=1920, height=1080, framerate=15/1' in pipeline
+    assert 'tee name=source_full_tee' in pipeline
+    assert 'libcamerasrc' not in pipeline
+
+    assert DUAL_SOURCE_PIPELINE('videotest', full_res=False).count('videotestsrc') == 1
@@ -0,0 +1,169 @@
+# tests/test_hardware_process.py
+#
+# The seqlock and the control loop with fake controllers, no I2C or GPIO:
+#   $ python -m pytest tests/test_hardware_process.py
+
+import os
+import ctypes
+import threading
+import multiprocessing
+from types import SimpleNamespace
+
+from benchmarks.fakes import install_import_stubs
+
+install_import_stubs(('board', 'busio', 'adafruit_pca9685', 'adafruit_motor')) # The servo driver bindings only
+
+from src import hardware_process
+from src.hardware_process import (
+    HardwareClient, RemoteLaser, read_slot, COMMAND_SIZE, STATUS_SIZE,
+    CMD_SEQ, CMD_LASER, CMD_LASER_FORCE, ST_LASER_ON, ST_WATCHDOG_TRIPS,
+)
+
+WRITES = 20000
+
+
+def make_writer(command):
+    """A HardwareClient that only owns the command slot, for HardwareClient._write."""
+    client = HardwareClient.__new__(HardwareClient)
+    client.command = command
+    client._write_lock = threading.Lock()
+    client.published = 0
+    return client
+
+
+def write_same_values(command):
+    writer = make_writer(command)
+    for value in range(1, WRITES + 1):
+        writer._write({index: float(value) for index in range(1, COMMAND_SIZE)})
+
+
+def test_read_slot_never_returns_a_torn_copy():
+    context = multiprocessing.get_context('fork')
+    command = context.RawArray(ctypes.c_double, COMMAND_SIZE)
+    process = context.Process(target=write_same_values, args=(command,))
+    process.start()
+    copies = 0
+    while process.is_alive():
+        values = read_slot(command)
+        if values is None:
+            continue
+        copies += 1
+        assert int(values[CMD_SEQ]) % 2 == 0
+        assert len(set(values[1:])) == 1 # Every field of the copy comes from the same write
+    process.join()
+    assert copies > 0
+    assert read_slot(command)[1:] == [float(WRITES)] * (COMMAND_SIZE - 1)
+
+
+def test_read_slot_gives_up_on_a_write_in_progress():
+    command = [0.0] * COMMAND_SIZE
+    command[CMD_SEQ] = 3.0 # Writer died between its two increments
+    assert read_slot(command, retries=10) is None
+
+
+class FakeLaser:
+    def __init__(self):
+        self.on = False
+        self.forced_offs = 0
+        self.safety_trips = 0
+
+    def turn_on(self):
+        self.on = True
+        return True
+
+    def turn_off(self, force=False):
+        self.forced_offs += force
+        self.on = False
+        return True
+
+    def is_on(self):
+        return self.on
+
+    def cleanup(self):
+        self.on = False
+
+
+class FakePanTilt:
+    current_pan = current_tilt = 0.0
+
+    def update_if_needed(self, center_x, center_y, correction):
+        return True
+
+    def move(self, pan_angle, tilt_angle):
+        pass
+
+    def sleep(self):
+        pass
+
+    def wake(self):
+        pass
+
+    def cleanup(self):
+        pass
+
+
+def run_hardware(monkeypatch, tmp_path, producer, watchdog_seconds=0.1):
+    """Run the control loop on this thread while producer(client, laser) drives it from another."""
+    laser = FakeLaser()
+    monkeypatch.setattr(hardware_process, 'init_hardware', lambda config: (FakePanTilt(), laser))
+    monkeypatch.setattr(hardware_process.signal, 'signal', lambda signum, handler: None)
+    monkeypatch.setattr(hardware_process.logging, 'basicConfig', lambda **kwargs: None)
+    monkeypatch.setattr(hardware_process.logging, 'shutdown', lambda: None)
+    config = SimpleNamespace(
+        paths=SimpleNamespace(logs_dir=str(tmp_path)),
+        logging=SimpleNamespace(level='INFO'),
+        control_plane=SimpleNamespace(control_rate_hz=200, watchdog_seconds=watchdog_seconds),
+    )
+    client = make_writer([0.0] * COMMAND_SIZE)
+    client.status = [0.0] * STATUS_SIZE
+    stop_event = threading.Event()
+
+    def drive():
+        try:
+            producer(client, laser)
+        finally:
+            stop_event.set()
+    thread = threading.Thread(target=drive)
+    thread.start()
+    hardware_process._hardware_main(config, client.command, client.status, stop_event, os.getppid())
+    thread.join()
+    return client, laser
+
+
+def test_watchdog_forces_the_laser_off_when_commands_stop(monkeypatch, tmp_path):
+    observed = {}
+
+    def producer(client, laser):
+        client.set_laser(True)
+        threading.Event().wait(0.05)
+        observed['on'] = laser.on
+        threading.Event().wait(0.2) # No command for longer than the watchdog period
+        observed['after_watchdog'] = laser.on
+        client.set_laser(True) # Resumed
+        threading.Event().wait(0.05)
+        observed['resumed'] = laser.on
+
+    client, laser = run_hardware(monkeypatch, tmp_path, producer)
+    assert observed == {'on': True, 'after_watchdog': False, 'resumed': True}
+    assert client.status[ST_WATCHDOG_TRIPS] == 1
+
+
+def test_forced_off_reaches_the_hardware_process(monkeypatch, tmp_path):
+    observed = {}
+
+    def producer(client, laser):
+        remote = RemoteLaser(client)
+        observed['first_turn_on'] = remote.turn_on() # Not applied by the hardware process yet
+        threading.Event().wait(0.03)
+        observed['turn_on'] = remote.turn_on()
+        remote.turn_off(force=True)
+        observed['force_flag'] = client.command[CMD_LASER_FORCE]
+        threading.Event().wait(0.03)
+        observed['forced_offs'] = laser.forced_offs
+        observed['is_on'] = remote.is_on()
+
+    client, laser = run_hardware(monkeypatch, tmp_path, producer, watchdog_seconds=5.0)
+    assert observed.pop('forced_offs') >= 1
+    assert observed == {'first_turn_on': False, 'turn_on': True, 'force_flag': 1.0, 'is_on': False}
+    assert client.command[CMD_LASER] == 0.0
+    assert client.status[ST_LASER_ON] == 0.0
@@ -0,0 +1,94 @@
+# tests/test_hotspot_map.py
+#
+# Pure numpy, runs anywhere:
+#   $ python -m pytest tests/test_hotspot_map.py
+
+from src.config import HotspotConfig
+from src.hotspot_map import HotspotMap
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_map(path, clock, min_weight=10.0, pan_limits=(-90, 90)):
+    config = HotspotConfig(
+        enabled=True,
+        park=True,
+        resolution_degrees=2.0,
+        smoothing_degrees=2.0,
+        half_life_hours=1.0,
+        min_weight=min_weight,
+        idle_seconds=5.0,
+        flush_interval_seconds=5.0,
+        save_interval_seconds=300.0,
+        max_pending=1000,
+    )
+    return HotspotMap(config, pan_limits, (-30, 60), str(path), clock=clock)
+
+
+def test_no_park_position_until_enough_weight(tmp_path):
+    hotspots = make_map(tmp_path / 'map.npz', FakeClock())
+    for _ in range(5):
+        hotspots.record(30.0, 10.0)
+    hotspots.flush()
+    assert hotspots.park_position is None
+
+
+def test_park_position_is_the_densest_neighbourhood(tmp_path):
+    hotspots = make_map(tmp_path / 'map.npz', FakeClock())
+    for _ in range(20):
+        hotspots.record(-45.0, 5.0)
+    for index in range(40): # A spread-out cluster, denser in total than the single cell above
+        hotspots.record(30.0 + (index % 3) * 2, 20.0 + (index % 2) * 2)
+    hotspots.flush()
+    pan, tilt = hotspots.park_position
+    assert 28 <= pan <= 36 and 18 <= tilt <= 24
+    assert hotspots.stats()['weight'] == 60
+
+
+def test_weight_decays_with_the_half_life(tmp_path):
+    clock = FakeClock()
+    hotspots = make_map(tmp_path / 'map.npz', clock)
+    for _ in range(40):
+        hotspots.record(0.0, 0.0)
+    hotspots.flush()
+    clock.now += 3600
+    hotspots.flush()
+    assert abs(hotspots.stats()['weight'] - 20) < 1e-6
+
+
+def test_map_and_first_hits_survive_a_restart(tmp_path):
+    clock = FakeClock()
+    hotspots = make_map(tmp_path / 'map.npz', clock)
+    for _ in range(40):
+        hotspots.record(10.0, 10.0)
+    hotspots.flush()
+    hotspots.record_first_hit(0.4, from_hotspot=False)
+    hotspots.record_first_hit(0.1, from_hotspot=True)
+    hotspots.record_first_hit(0.3, from_hotspot=True)
+    hotspots.save()
+
+    clock.now += 3600 # Down for one half-life
+    restarted = make_map(tmp_path / 'map.npz', clock)
+    assert restarted.park_position == hotspots.park_position
+    assert abs(restarted.stats()['weight'] - 20) < 1e-6
+    means = restarted.mean_time_to_first_hit()
+    assert abs(means['hotspot'] - 0.2) < 1e-9 and abs(means['elsewhere'] - 0.4) < 1e-9
+
+
+def test_map_of_other_servo_limits_is_ignored(tmp_path):
+    clock = FakeClock()
+    hotspots = make_map(tmp_path / 'map.npz', clock)
+    for _ in range(40):
+        hotspots.record(10.0, 10.0)
+    hotspots.flush()
+    hotspots.save()
+
+    other = make_map(tmp_path / 'map.npz', clock, pan_limits=(-60, 60))
+    assert other.stats()['weight'] == 0
+    assert other.park_position is None
@@ -0,0 +1,178 @@
+# tests/test_laser_controller.py
+#
+# Runs without laser hardware: the controller drives a fake GPIO line that counts writes.
+#   $ python -m pytest tests/test_laser_controller.py
+
+import time
+
+from src.config import LaserConfig, StrobePattern
+from src.laser_controller import LaserController, ON, OFF, LOCKOUT
+
+
+class FakeLine:
+    """Stands in for a requested gpiod output line, counting set_value() syscalls."""
+
+    def __init__(self):
+        self.value = None
+        self.set_value_calls = 0
+        self.released = False
+
+    def set_value(self, value):
+        self.value = value
+        self.set_value_calls += 1
+
+    def release(self):
+        self.released = True
+
+
+class FakeChannel:
+    """Stands in for a PCA9685 channel, counting duty cycle register writes."""
+
+    def __init__(self):
+        self._duty_cycle = None
+        self.writes = 0
+
+    @property
+    def duty_cycle(self):
+        return self._duty_cycle
+
+    @duty_cycle.setter
+    def duty_cycle(self, value):
+        self._duty_cycle = value
+        self.writes += 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+PATTERNS = (
+    StrobePattern(name='steady', duty=1.0, duty_cycle=0xFFFF),
+    StrobePattern(name='strobe', duty=0.5, duty_cycle=0x8000),
+)
+
+
+def make_config(**overrides):
+    settings = dict(
+        gpio_chip='gpiochip0', pin=13, min_on_seconds=0.0, min_off_seconds=0.0, max_on_seconds=0.0, lockout_seconds=5.0,
+        mode='gpio', pwm_channel=15, pattern='steady', patterns=PATTERNS,
+    )
+    settings.update(overrides)
+    return LaserConfig(**settings)
+
+
+def make_laser(**overrides):
+    line, clock = FakeLine(), FakeClock()
+    return LaserController(make_config(**overrides), line=line, clock=clock), line, clock
+
+
+def test_redundant_writes_are_skipped():
+    laser, line, clock = make_laser()
+    assert line.set_value_calls == 1 and line.value == 0  # Initial OFF
+
+    # One on/off cycle per 30 frames, as the detection callback would call it every frame
+    for frame in range(300):
+        clock.now += 1 / 30
+        if (frame // 30) % 2 == 0:
+            laser.turn_on()
+        else:
+            laser.turn_off()
+
+    assert line.set_value_calls == 1 + 10  # Only the 10 transitions reached the line
+    assert laser.stats()['skipped_writes'] >= 289
+
+
+def test_minimum_dwell_times():
+    laser, line, clock = make_laser(min_on_seconds=0.5, min_off_seconds=0.3)
+    clock.now += 1.0
+    assert laser.turn_on()
+
+    clock.now += 0.1
+    assert not laser.turn_off()  # Still within the on dwell
+    assert laser.state == ON
+    clock.now += 0.5
+    assert laser.turn_off()
+
+    clock.now += 0.1
+    assert not laser.turn_on()  # Still within the off dwell
+    clock.now += 0.3
+    assert laser.turn_on()
+
+
+def test_force_off_ignores_dwell():
+    laser, line, clock = make_laser(min_on_seconds=10.0)
+    laser.turn_on()
+    assert laser.turn_off(force=True)
+    assert line.value == 0
+
+
+def test_safety_timeout_locks_out():
+    laser, line, clock = make_laser(max_on_seconds=0.05, lockout_seconds=2.0)
+    laser.turn_on()
+    time.sleep(0.2)  # The safety timer runs on real time
+    assert laser.state == LOCKOUT
+    assert line.value == 0
+    assert laser.stats()['safety_trips'] == 1
+
+    assert not laser.turn_on()  # Locked out
+    clock.now += 2.0
+    assert laser.turn_on()
+    laser.cleanup()
+
+
+def test_cumulative_duty():
+    laser, line, clock = make_laser()
+    clock.now += 1.0
+    laser.turn_on()
+    clock.now += 1.0
+    laser.turn_off()
+    clock.now += 2.0
+    stats = laser.stats()
+    assert stats['state'] == OFF
+    assert abs(stats['on_seconds'] - 1.0) < 1e-9
+    assert abs(stats['duty'] - 0.25) < 1e-9
+
+
+def test_cleanup_turns_off_and_releases():
+    laser, line, clock = make_laser(min_on_seconds=10.0)
+    laser.turn_on()
+    laser.cleanup()
+    assert line.value == 0 and line.released
+
+
+def test_pwm_patterns_only_write_on_change():
+    channel, clock = FakeChannel(), FakeClock()
+    laser = LaserController(make_config(mode='pwm', pattern='strobe'), clock=clock, pwm_channel=channel)
+    assert channel.duty_cycle == 0
+
+    for _ in range(100):
+        clock.now += 1 / 30
+        laser.turn_on()
+    assert channel.duty_cycle == 0x8000
+    assert channel.writes == 2  # Initial off + on
+
+    laser.set_pattern('steady')
+    assert channel.duty_cycle == 0xFFFF and channel.writes == 3
+    laser.set_pattern('steady')
+    assert channel.writes == 3  # Same pattern, no register write
+
+    laser.cleanup()
+    assert channel.duty_cycle == 0
+
+
+def test_interlock_blanks_laser():
+    laser, line, clock = make_laser(min_on_seconds=10.0)
+    safe = [True]
+    laser.set_interlock(lambda: safe[0])
+    assert laser.turn_on()
+
+    safe[0] = False  # e.g. the servos are crossing an exclusion zone
+    assert not laser.turn_on()
+    assert laser.state == OFF and line.value == 0  # Off at once, despite the minimum on time
+
+    safe[0] = True
+    assert laser.turn_on()
@@ -0,0 +1,80 @@
+# tests/test_memory_planner.py
+#
+# Budget fitting and RSS parsing in pure Python (GStreamer is stubbed when not installed), caps sizes
+# with GStreamer only:
+#   $ python -m pytest tests/test_memory_planner.py
+
+import pytest
+
+from benchmarks.fakes import install_import_stubs
+
+install_import_stubs(('gi',))
+
+from src.config import MemoryConfig
+from src.memory_planner import MB, MemoryPlanner, QueuePlan, frame_bytes_from_caps, read_rss_kb
+
+
+def make_planner(budget_mb):
+    return MemoryPlanner(MemoryConfig(enabled=True, budget_mb=budget_mb, mode='auto', report_interval_seconds=0))
+
+
+def test_largest_queue_is_shrunk_first():
+    plan = [
+        QueuePlan('full_queue', 'video/x-raw', max_size_buffers=4, frame_bytes=3 * MB),
+        QueuePlan('inference_queue', 'video/x-raw', max_size_buffers=4, frame_bytes=1 * MB),
+    ]
+    resized = make_planner(12).fit_to_budget(plan)
+    assert [item.name for item in resized] == ['full_queue']
+    assert [item.max_size_buffers for item in plan] == [2, 4] # 6 + 4 MB
+    assert sum(item.worst_case_bytes for item in plan) <= 12 * MB
+
+
+def test_shrinking_moves_on_once_the_largest_is_no_longer_largest():
+    plan = [
+        QueuePlan('a', 'video/x-raw', max_size_buffers=3, frame_bytes=2 * MB),
+        QueuePlan('b', 'video/x-raw', max_size_buffers=5, frame_bytes=1 * MB),
+    ]
+    resized = make_planner(6).fit_to_budget(plan)
+    assert [item.max_size_buffers for item in plan] == [1, 4] # 6+5, 4+5, 4+4, then the first of the tie
+    assert {item.name for item in resized} == {'a', 'b'}
+
+
+def test_queues_keep_at_least_one_buffer():
+    plan = [
+        QueuePlan('a', 'video/x-raw', max_size_buffers=3, frame_bytes=4 * MB),
+        QueuePlan('encoded', 'video/x-h264', max_size_buffers=30, frame_bytes=0),
+    ]
+    make_planner(1).fit_to_budget(plan)
+    assert [item.max_size_buffers for item in plan] == [1, 30] # Over budget still, encoded queues are not counted
+
+
+def test_plan_within_budget_is_left_alone():
+    plan = [QueuePlan('a', 'video/x-raw', max_size_buffers=3, frame_bytes=MB)]
+    assert make_planner(3).fit_to_budget(plan) == []
+    assert plan[0].max_size_buffers == 3
+
+
+def test_read_rss(tmp_path):
+    status = tmp_path / 'status'
+    status.write_text('Name:\tpython\nVmHWM:\t  204800 kB\nVmRSS:\t  102400 kB\nThreads:\t4\n')
+    assert read_rss_kb(str(status)) == (102400, 204800)
+    assert read_rss_kb(str(tmp_path / 'missing')) == (0, 0)
+
+
+@pytest.mark.parametrize('caps, expected', [
+    ('video/x-raw,format=RGB,width=320,height=240', 320 * 3 * 240),
+    ('video/x-raw,format=RGB,width=322,height=240', 968 * 240), # Rows padded to 4 bytes
+    ('video/x-raw,format=NV12,width=320,height=240', 320 * 240 * 3 // 2),
+    ('video/x-raw,format=I420,width=320,height=240', 320 * 240 * 3 // 2),
+    ('video/x-h264,stream-format=byte-stream', 0),
+])
+def test_frame_bytes_from_caps(caps, expected):
+    # Importing the bindings themselves skips when gi is missing or a stub
+    Gst = pytest.importorskip('gi.repository.Gst')
+    pytest.importorskip('gi.repository.GstVideo')
+    Gst.init(None)
+    assert frame_bytes_from_caps(Gst.Caps.from_string(caps)) == expected
+
+
+def test_frame_bytes_without_caps():
+    assert frame_bytes_from_caps(None) == 0
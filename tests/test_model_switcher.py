@@ -0,0 +1,112 @@
+# tests/test_model_switcher.py
+#
+# Switching policy with stand-in selectors, no pipeline:
+#   $ python -m pytest tests/test_model_switcher.py
+
+import pytest
+
+from src.config import ModelsConfig
+from src.model_switcher import ModelSwitcher
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSelector:
+    def __init__(self):
+        self.active_pad = None
+
+    def set_property(self, name, value):
+        assert name == 'active-pad'
+        self.active_pad = value
+
+
+def make_switcher(clock, frame_budget_ms=0.0):
+    switcher = ModelSwitcher(ModelsConfig(
+        enabled=True,
+        hef_paths=(('light', '/light.hef'), ('heavy', '/heavy.hef')),
+        idle_model='light',
+        engaged_model='heavy',
+        frame_budget_ms=frame_budget_ms,
+        budget_backoff_seconds=30.0,
+        min_dwell_seconds=3.0,
+        poll_interval_seconds=1.0,
+    ), clock=clock, schedule=lambda callback: None) # Evaluations are run by hand
+    # What attach() finds in a pipeline
+    switcher.selector, switcher.join = FakeSelector(), FakeSelector()
+    switcher.pads = {model: (f'{model}_src', f'{model}_sink') for model in switcher.names}
+    switcher._select(switcher.active, clock())
+    return switcher
+
+
+def results(switcher, clock, model, count, interval):
+    for _ in range(count):
+        clock.now += interval
+        switcher.count_result(model)
+
+
+def test_heavier_model_while_engaged_with_dwell():
+    clock = FakeClock()
+    switcher = make_switcher(clock)
+    assert switcher.selector.active_pad == 'light_src'
+
+    switcher.set_engaged(True)
+    switcher._evaluate()
+    assert switcher.active == 'heavy'
+    assert (switcher.selector.active_pad, switcher.join.active_pad) == ('heavy_src', 'heavy_sink')
+
+    # Targets gone right away: held back by the dwell time, then applied by the poll
+    switcher.set_engaged(False)
+    switcher._evaluate()
+    assert switcher.active == 'heavy'
+    clock.now += 3.0
+    switcher.poll()
+    assert switcher.active == 'light'
+    assert switcher.switches == 2
+
+
+def test_switch_latency_and_per_model_fps():
+    clock = FakeClock()
+    switcher = make_switcher(clock)
+    results(switcher, clock, 'light', 60, 1 / 60)
+
+    switcher.set_engaged(True)
+    switcher._evaluate()
+    results(switcher, clock, 'light', 2, 0.01) # In flight in the previous model, not counted
+    results(switcher, clock, 'heavy', 30, 1 / 30)
+
+    assert switcher.switch_latencies[-1] == {'model': 'heavy', 'latency_ms': 53.33}
+    fps = switcher.fps()
+    assert fps['light'] == pytest.approx(60, rel=0.01)
+    assert fps['heavy'] == pytest.approx(30 / (0.02 + 1.0), rel=0.01)
+
+
+def test_over_budget_falls_back_to_the_light_model():
+    clock = FakeClock()
+    switcher = make_switcher(clock, frame_budget_ms=40)
+    switcher.set_engaged(True)
+    switcher._evaluate()
+    results(switcher, clock, 'heavy', 60, 0.06) # 60 ms per frame, for longer than the dwell time
+    switcher.poll()
+    assert switcher.active == 'light'
+    assert switcher.stats()['over_budget']
+
+    clock.now += 30
+    switcher.poll()
+    assert switcher.active == 'heavy' # Retried after the back-off
+
+
+def test_forced_model_overrides_activity():
+    clock = FakeClock()
+    switcher = make_switcher(clock)
+    switcher.force('light')
+    switcher.set_engaged(True)
+    switcher._evaluate()
+    assert switcher.active == 'light'
+    switcher.force(None)
+    assert switcher.active == 'heavy'
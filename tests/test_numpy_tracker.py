@@ -0,0 +1,72 @@
+# tests/test_numpy_tracker.py
+#
+# Pure numpy, runs anywhere:
+#   $ python -m pytest tests/test_numpy_tracker.py
+
+import numpy as np
+
+from src.config import TrackerConfig
+from src.numpy_tracker import NumpyTracker, iou_matrix
+
+
+def make_tracker(max_tracks=64, confirm_seconds=0.1, max_center_distance=0.1):
+    return NumpyTracker(TrackerConfig(
+        backend='numpy',
+        iou_threshold=0.3,
+        max_center_distance=max_center_distance,
+        confirm_seconds=confirm_seconds,
+        keep_lost_seconds=0.5,
+        velocity_smoothing=0.5,
+        max_tracks=max_tracks,
+    ))
+
+
+def box(x, y, size=0.05):
+    return [x, y, x + size, y + size]
+
+
+def test_iou_matrix():
+    iou = iou_matrix(np.array([box(0, 0, 0.2)]), np.array([box(0, 0, 0.2), box(0.1, 0, 0.2), box(0.5, 0.5)]))
+    assert np.allclose(iou, [[1.0, 1 / 3, 0.0]])
+
+
+def test_new_track_is_tentative_then_confirmed():
+    tracker = make_tracker()
+    assert list(tracker.update([box(0.5, 0.5)], now=0.0)) == [0]
+    assert list(tracker.update([box(0.5, 0.5)], now=0.05)) == [0]
+    assert list(tracker.update([box(0.5, 0.5)], now=0.1)) == [1]
+
+
+def test_fast_target_keeps_its_id_and_time_based_lifetimes():
+    tracker = make_tracker(confirm_seconds=0.0)
+    # Moves one box width per frame: no overlap with the last box, but with the prediction
+    ids = [tracker.update([box(0.1 + 0.05 * i, 0.5)], now=i / 30)[0] for i in range(10)]
+    assert ids == [1] * 10
+
+    # Missed for 0.3 s: coasts on its velocity and is found again where it should be
+    assert list(tracker.update([box(0.1 + 0.05 * 19, 0.5)], now=19 / 30)) == [1]
+
+    # Missed for longer than keep_lost_seconds: a new track
+    assert list(tracker.update([box(0.1, 0.5)], now=19 / 30 + 0.6)) == [2]
+
+
+def test_zero_center_distance_matches_on_overlap_only():
+    tracker = make_tracker(confirm_seconds=0.0, max_center_distance=0.0)
+    with np.errstate(divide='raise', invalid='raise'):
+        assert list(tracker.update([box(0.1, 0.5)], now=0.0)) == [1]
+        assert list(tracker.update([box(0.12, 0.5)], now=0.05)) == [1] # Overlapping
+        assert list(tracker.update([box(0.3, 0.5)], now=0.1)) == [2] # Close, but no overlap
+
+
+def test_one_frame_detection_is_dropped():
+    tracker = make_tracker()
+    tracker.update([box(0.2, 0.2), box(0.7, 0.7)], now=0.0)
+    tracker.update([box(0.2, 0.2)], now=0.05)
+    assert tracker.stats()['tracks'] == 1
+
+
+def test_capacity_is_fixed():
+    tracker = make_tracker(max_tracks=4, confirm_seconds=0.0)
+    ids = tracker.update([box(0.1 * i, 0.1) for i in range(6)], now=0.0)
+    assert list(ids) == [1, 2, 3, 4, 0, 0]
+    assert tracker.stats()['dropped'] == 2
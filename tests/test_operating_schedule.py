@@ -0,0 +1,110 @@
+# tests/test_operating_schedule.py
+#
+# Pure Python, runs anywhere:
+#   $ python -m pytest tests/test_operating_schedule.py
+
+import datetime
+
+import pytest
+
+from src.config import ConfigurationError, OperatingWindow, OperatingWindowsConfig, _parse_time_of_day
+from src.operating_schedule import OperatingSchedule, sun_times
+
+LONDON = (51.5074, -0.1278)
+TROMSO = (69.65, 18.96)
+UTC = datetime.timezone.utc
+CEST = datetime.timezone(datetime.timedelta(hours=2))
+
+
+def make_schedule(*windows, position=LONDON):
+    return OperatingSchedule(OperatingWindowsConfig(
+        enabled=True,
+        latitude=position[0],
+        longitude=position[1],
+        check_interval_seconds=30.0,
+        windows=tuple(
+            OperatingWindow(start=_parse_time_of_day(start, 'start'), end=_parse_time_of_day(end, 'end'))
+            for start, end in windows
+        ),
+    ))
+
+
+def at(day, hour, minute=0, tz=UTC):
+    return datetime.datetime(2024, 6, day, hour, minute, tzinfo=tz)
+
+
+def assert_close(actual, hour, minute):
+    expected = actual.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    assert abs((actual - expected).total_seconds()) <= 120 # NOAA equations: a couple of minutes
+
+
+def test_sun_times_match_the_almanac():
+    # London, 2024: 03:43 / 20:21 UTC at the summer solstice, 08:04 / 15:54 at the winter solstice
+    sunrise, sunset = sun_times(datetime.date(2024, 6, 21), *LONDON)
+    assert_close(sunrise, 3, 43)
+    assert_close(sunset, 20, 21)
+    sunrise, sunset = sun_times(datetime.date(2024, 12, 21), *LONDON)
+    assert_close(sunrise, 8, 4)
+    assert_close(sunset, 15, 54)
+    assert sunrise.tzinfo == UTC
+
+
+def test_polar_night_and_polar_day():
+    assert sun_times(datetime.date(2024, 12, 21), *TROMSO) == (None, None)
+    sunrise, sunset = sun_times(datetime.date(2024, 6, 21), *TROMSO)
+    assert sunset - sunrise == datetime.timedelta(days=1)
+    assert (sunrise.hour, sunrise.minute) == (0, 0)
+
+
+def test_sun_windows_at_high_latitude():
+    schedule = make_schedule(('sunrise', 'sunset'), position=TROMSO)
+    assert schedule.is_active(at(21, 1)) # Midnight sun
+    assert schedule.is_active(at(21, 13))
+    winter = datetime.datetime(2024, 12, 21, 12, tzinfo=UTC)
+    assert not schedule.is_active(winter) # The sun does not rise: the window does not open
+
+
+def test_window_crossing_midnight():
+    schedule = make_schedule(('22:00', '02:00'))
+    assert schedule.is_active(at(21, 23, 30))
+    assert schedule.is_active(at(22, 1, 59)) # Opened the day before
+    assert not schedule.is_active(at(22, 2, 0))
+    assert not schedule.is_active(at(21, 21, 59))
+
+
+def test_sun_relative_window_in_local_time():
+    # 03:43 UTC is 05:43 local, opened 30 minutes before sunrise
+    schedule = make_schedule(('sunrise-30', '08:00'))
+    assert not schedule.is_active(at(21, 5, 5, tz=CEST))
+    assert schedule.is_active(at(21, 5, 20, tz=CEST))
+    assert not schedule.is_active(at(21, 8, 0, tz=CEST))
+
+
+def test_window_until_the_end_of_the_day():
+    schedule = make_schedule(('18:00', '24:00'))
+    assert schedule.is_active(at(21, 23, 59))
+    assert not schedule.is_active(at(22, 0, 0))
+    assert not schedule.is_active(at(22, 0, 30))
+
+
+def test_no_windows_is_always_active():
+    assert make_schedule().is_active(at(21, 3))
+
+
+@pytest.mark.parametrize('text, anchor, minutes', [
+    ('06:30', 'clock', 390),
+    ('0:05', 'clock', 5),
+    ('24:00', 'clock', 1440),
+    ('sunrise', 'sunrise', 0),
+    ('Sunset + 45', 'sunset', 45),
+    ('sunrise-30', 'sunrise', -30),
+])
+def test_time_of_day_parsing(text, anchor, minutes):
+    spec = _parse_time_of_day(text, 'start')
+    assert (spec.anchor, spec.offset_minutes) == (anchor, minutes)
+
+
+@pytest.mark.parametrize('text', ['24:01', '24:59', '25:00', '23:60', '7', 'noon', 'sunrise*2'])
+def test_invalid_times_are_rejected(text):
+    with pytest.raises(ConfigurationError, match='start'):
+        _parse_time_of_day(text, 'operating_windows.windows[0].start')
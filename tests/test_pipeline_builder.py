@@ -0,0 +1,103 @@
+# tests/test_pipeline_builder.py
+#
+# Needs GStreamer (videotestsrc, tee, fakesink), no camera or Hailo:
+#   $ python -m pytest tests/test_pipeline_builder.py
+
+import pytest
+
+gi = pytest.importorskip('gi')
+gi.require_version('Gst', '1.0')
+# Importing the bindings themselves also skips when gi is a stub of the benchmarks (tests/test_visual_servo.py)
+Gst = pytest.importorskip('gi.repository.Gst')
+GLib = pytest.importorskip('gi.repository.GLib')
+
+from src.pipeline_builder import BranchManager
+
+MAIN_PATH = (
+    'videotestsrc is-live=true ! video/x-raw,width=160,height=120,framerate=30/1 ! '
+    'tee name=source_tee ! queue ! fakesink name=main_sink sync=false'
+)
+DIAGNOSTIC_BRANCH = 'queue leaky=downstream max-size-buffers=2 ! fakesink name=diagnostic_sink sync=false'
+
+
+def run_loop(seconds):
+    loop = GLib.MainLoop()
+    GLib.timeout_add(int(seconds * 1000), loop.quit)
+    loop.run()
+
+
+@pytest.fixture
+def pipeline():
+    Gst.init(None)
+    pipeline = Gst.parse_launch(MAIN_PATH)
+    yield pipeline
+    pipeline.set_state(Gst.State.NULL)
+
+
+def count_buffers(pipeline, name):
+    counts = [0]
+
+    def probe(pad, info):
+        counts[0] += 1
+        return Gst.PadProbeReturn.OK
+    pipeline.get_by_name(name).get_static_pad('sink').add_probe(Gst.PadProbeType.BUFFER, probe)
+    return counts
+
+
+def test_attach_and_detach_while_playing(pipeline):
+    main_buffers = count_buffers(pipeline, 'main_sink')
+    branches = BranchManager(pipeline)
+    pipeline.set_state(Gst.State.PLAYING)
+    run_loop(0.3)
+
+    assert branches.attach('diagnostic', 'source_tee', DIAGNOSTIC_BRANCH)
+    assert not branches.attach('diagnostic', 'source_tee', DIAGNOSTIC_BRANCH)
+    diagnostic_buffers = count_buffers(pipeline, 'diagnostic_sink')
+    run_loop(0.3)
+    assert diagnostic_buffers[0] > 0
+
+    assert branches.detach('diagnostic')
+    run_loop(0.3)
+    assert pipeline.get_by_name('diagnostic_branch') is None
+    assert not branches.is_attached('diagnostic')
+
+    # The main path kept streaming through both reconfigurations
+    before = main_buffers[0]
+    run_loop(0.3)
+    assert main_buffers[0] > before
+    assert [metric['action'] for metric in branches.reconfigurations] == ['attach', 'detach']
+    assert all(metric['latency_ms'] >= 0 for metric in branches.reconfigurations)
+
+
+def test_attached_before_playing_starts_with_the_pipeline(pipeline):
+    branches = BranchManager(pipeline)
+    branches.attach('diagnostic', 'source_tee', DIAGNOSTIC_BRANCH)
+    diagnostic_buffers = count_buffers(pipeline, 'diagnostic_sink')
+    pipeline.set_state(Gst.State.PLAYING)
+    run_loop(0.3)
+    assert diagnostic_buffers[0] > 0
+    assert branches.stats()['attached'] == ['diagnostic']
+
+
+def test_unknown_tee_is_an_error(pipeline):
+    with pytest.raises(ValueError):
+        BranchManager(pipeline).attach('diagnostic', 'no_such_tee', DIAGNOSTIC_BRANCH)
+
+
+def test_attach_is_rejected_until_the_detached_bin_is_removed(pipeline):
+    branches = BranchManager(pipeline)
+    pipeline.set_state(Gst.State.PLAYING)
+    assert branches.attach('diagnostic', 'source_tee', DIAGNOSTIC_BRANCH)
+    run_loop(0.3)
+
+    assert branches.detach('diagnostic')
+    # The old bin is removed on the main loop, which has not run yet
+    assert not branches.attach('diagnostic', 'source_tee', DIAGNOSTIC_BRANCH)
+    assert branches.stats()['detaching'] == ['diagnostic']
+
+    run_loop(0.3)
+    assert branches.stats()['detaching'] == []
+    assert branches.attach('diagnostic', 'source_tee', DIAGNOSTIC_BRANCH)
+    diagnostic_buffers = count_buffers(pipeline, 'diagnostic_sink')
+    run_loop(0.3)
+    assert diagnostic_buffers[0] > 0
@@ -0,0 +1,56 @@
+# tests/test_sampling_profiler.py
+#
+# Sampling of Python threads and the collapsed-stack output, pure Python:
+#   $ python -m pytest tests/test_sampling_profiler.py
+
+import threading
+from collections import Counter
+
+from src.config import ProfilerConfig
+from src.sampling_profiler import SamplingProfiler
+
+
+def make_profiler(logs_dir, default_seconds=0.3):
+    return SamplingProfiler(ProfilerConfig(enabled=True, default_seconds=default_seconds, max_seconds=5.0, interval_ms=2.0), str(logs_dir))
+
+
+def spin_in_known_function(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+def test_profile_contains_the_spinning_stack(tmp_path):
+    stop = threading.Event()
+    spinner = threading.Thread(target=spin_in_known_function, args=(stop,), name='spinner', daemon=True)
+    spinner.start()
+    profiler = make_profiler(tmp_path)
+    try:
+        assert profiler.start()
+        assert not profiler.start() # One profile at a time
+        profiler._thread.join(timeout=5.0)
+    finally:
+        stop.set()
+        spinner.join()
+
+    assert not profiler.is_running()
+    assert profiler.last_output is not None and profiler.last_output.startswith(str(tmp_path))
+    lines = open(profiler.last_output).read().splitlines()
+    spinner_lines = [line for line in lines if line.startswith('spinner;')]
+    assert spinner_lines
+    assert any('spin_in_known_function (test_sampling_profiler.py:' in line for line in spinner_lines)
+    counts = [int(line.rsplit(' ', 1)[1]) for line in lines]
+    assert counts == sorted(counts, reverse=True) # Hottest stacks first
+    assert 'sampling-profiler' not in ' '.join(lines) # The sampler does not sample itself
+
+    assert profiler.start(0.05) # Free again once finished
+    profiler.stop()
+
+
+def test_write_collapsed_format(tmp_path):
+    profiler = make_profiler(tmp_path / 'logs')
+    path = profiler._write(Counter({'main;run;callback': 3, 'main;run': 7}), samples=10, elapsed=0.1)
+    assert open(path).read() == 'main;run 7\nmain;run;callback 3\n'
+
+    blocker = tmp_path / 'blocker'
+    blocker.touch()
+    assert make_profiler(blocker / 'logs')._write(Counter(), 0, 0.0) is None # Reported, not raised
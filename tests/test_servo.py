@@ -1,9 +1,18 @@
-# src/test_servo.py
+# tests/test_servo.py
+#
+# Needs the PCA9685 and the servos: centers the turret and prints the servo angles.
+#   $ python -m tests.test_servo
+
+import os
+
+from src.config import load_config
+from src.pan_tilt_controller import PanTiltController
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.yaml')
 
-from servo_control import PanTiltController
 
 def test_servo():
-    pan_tilt = PanTiltController()
+    pan_tilt = PanTiltController(load_config(CONFIG_PATH))
     pan_tilt.center()
     print(f"Pan Servo Position: {pan_tilt.pan_servo.angle}°")
     print(f"Tilt Servo Position: {pan_tilt.tilt_servo.angle}°")
@@ -0,0 +1,201 @@
+# tests/test_telemetry.py
+#
+# Frames, the shipper's spool (with a fake socket) and the aggregator, no network:
+#   $ python -m pytest tests/test_telemetry.py
+
+import os
+import json
+import zlib
+import errno
+import socket
+
+import pytest
+
+from src import telemetry
+from src.config import TelemetryConfig
+from src.telemetry import HEADER, MAGIC, MAX_FRAME_BYTES, MAX_MESSAGE_BYTES, VERSION, TelemetryShipper, encode_frame, decode_frame
+from src.telemetry_aggregator import TelemetryAggregator
+
+
+def raw_frame(message, boot_id=7, seq=1) -> bytes:
+    """A frame around any JSON payload, including shapes encode_frame never produces."""
+    return HEADER.pack(MAGIC, VERSION, boot_id, seq) + zlib.compress(json.dumps(message).encode())
+
+
+def test_encode_decode_round_trip():
+    events = [[1.5, 'engagement_start', {'track': 3}]]
+    frame = encode_frame('roof-1', 7, 42, events)
+    assert decode_frame(frame) == (7, 42, {'unit': 'roof-1', 'events': events})
+
+
+@pytest.mark.parametrize('data', [
+    b'BDT',
+    HEADER.pack(b'XXXX', VERSION, 1, 1) + zlib.compress(b'{}'),
+    HEADER.pack(MAGIC, VERSION + 1, 1, 1) + zlib.compress(b'{}'),
+    HEADER.pack(MAGIC, VERSION, 1, 1) + b'not zlib',
+    HEADER.pack(MAGIC, VERSION, 1, 1) + zlib.compress(b'not json'),
+])
+def test_decode_rejects_malformed_frames(data):
+    with pytest.raises(ValueError):
+        decode_frame(data)
+
+
+def test_decode_bounds_the_decompressed_size():
+    bomb = HEADER.pack(MAGIC, VERSION, 1, 1) + zlib.compress(b' ' * (MAX_MESSAGE_BYTES + 1))
+    assert len(bomb) < 10000
+    with pytest.raises(ValueError, match='above'):
+        decode_frame(bomb)
+    with pytest.raises(ValueError, match='Truncated'):
+        decode_frame(encode_frame('roof-1', 7, 1, [])[:-4])
+
+
+class FakeSocket:
+    """Acks every frame, or none (aggregator down); frames above max_bytes fail like a real datagram."""
+
+    def __init__(self, max_bytes=MAX_FRAME_BYTES):
+        self.max_bytes = max_bytes
+        self.up = True
+        self.sent = []
+        self.last = None
+
+    def sendto(self, frame, address):
+        if len(frame) > self.max_bytes:
+            raise OSError(errno.EMSGSIZE, 'Message too long')
+        self.sent.append(frame)
+        self.last = frame
+
+    def recvfrom(self, size):
+        if not self.up:
+            raise socket.timeout('timed out')
+        return self.last[:HEADER.size], ('127.0.0.1', 9870)
+
+
+def make_shipper(spool_dir, sock, spool_max_mb=1.0, max_batch_events=200):
+    shipper = TelemetryShipper(TelemetryConfig(
+        enabled=True, unit_id='roof-1', aggregator_host='127.0.0.1', aggregator_port=9870,
+        flush_interval_seconds=1.0, health_interval_seconds=30.0, max_batch_events=max_batch_events,
+        ack_timeout_seconds=0.01, queue_size=1000, spool_max_mb=spool_max_mb,
+    ), str(spool_dir))
+    shipper._load_spool()
+    shipper.sock = sock
+    return shipper
+
+
+def test_outage_spools_without_listing_the_spool(tmp_path, monkeypatch):
+    sock = FakeSocket()
+    shipper = make_shipper(tmp_path, sock, spool_max_mb=0.004, max_batch_events=1)
+
+    def listdir(path):
+        raise AssertionError("The spool is only listed at start")
+    monkeypatch.setattr(telemetry.os, 'listdir', listdir)
+    sock.up = False
+    for index in range(60):
+        shipper.record('engagement_start', track=index)
+    shipper._flush()
+    monkeypatch.undo()
+
+    files = sorted(os.listdir(tmp_path))
+    assert shipper.stats()['spool_dropped'] > 0 # Oldest dropped over the size limit
+    assert shipper.spool_bytes == sum(os.path.getsize(tmp_path / name) for name in files) <= 0.004 * 1024 * 1024
+    assert [name for name, _ in shipper.spool_files] == files
+
+    # The aggregator answers again: the spool drains in order, and a restart finds what is left
+    sock.up = True
+    shipper._flush()
+    assert len(files) > telemetry.SPOOL_RETRY_FRAMES
+    assert [name for name, _ in shipper.spool_files] == files[telemetry.SPOOL_RETRY_FRAMES:]
+    restarted = make_shipper(tmp_path, sock)
+    assert list(restarted.spool_files) == list(shipper.spool_files)
+    assert restarted.spool_bytes == shipper.spool_bytes
+
+
+def test_large_batches_are_split_to_fit_a_datagram(tmp_path):
+    sock = FakeSocket()
+    shipper = make_shipper(tmp_path, sock)
+    for index in range(40):
+        shipper.record('health', index=index, blob=os.urandom(3000).hex()) # Incompressible
+    shipper.record('health', blob=os.urandom(MAX_FRAME_BYTES).hex()) # Never fits
+    shipper._flush()
+
+    assert len(sock.sent) > 1
+    assert all(len(frame) <= MAX_FRAME_BYTES for frame in sock.sent)
+    events = [event for frame in sock.sent for event in decode_frame(frame)[2]['events']]
+    assert [event[2]['index'] for event in events] == list(range(40))
+    assert [decode_frame(frame)[1] for frame in sock.sent] == list(range(1, len(sock.sent) + 1))
+    assert shipper.stats()['frames_rejected'] == 1
+
+
+def test_frames_that_can_never_be_sent_are_not_spooled(tmp_path):
+    sock = FakeSocket(max_bytes=200)
+    shipper = make_shipper(tmp_path, sock)
+    shipper.record('health', blob=os.urandom(400).hex())
+    shipper._flush()
+    assert not shipper.spool_files
+    assert shipper.stats()['frames_rejected'] == 1
+
+    # One spooled by an earlier run is dropped rather than blocking the ones behind it
+    big = encode_frame('roof-1', 7, 1, [[1.0, 'health', {'blob': os.urandom(400).hex()}]])
+    small = encode_frame('roof-1', 7, 2, [[2.0, 'engagement_start', {}]])
+    (tmp_path / '00000000000000000001-0000000001.frame').write_bytes(big)
+    (tmp_path / '00000000000000000002-0000000002.frame').write_bytes(small)
+    shipper = make_shipper(tmp_path, sock)
+    shipper._flush()
+    assert sock.sent[-1] == small
+    assert os.listdir(tmp_path) == []
+
+
+def test_duplicates_are_acked_but_merged_once():
+    aggregator = TelemetryAggregator()
+    frame = encode_frame('roof-1', 7, 1, [[1.0, 'engagement_start', {}]])
+    assert aggregator.handle_datagram(frame) == frame[:HEADER.size]
+    assert aggregator.handle_datagram(frame) == frame[:HEADER.size] # Resent after a lost ack
+    # Same sequence number after a reboot: a new frame
+    assert aggregator.handle_datagram(encode_frame('roof-1', 8, 1, [[2.0, 'engagement_start', {}]]))
+
+    fleet = aggregator.rollup()['fleet']
+    assert (fleet['frames'], fleet['duplicates'], fleet['engagements']) == (2, 1, 2)
+
+
+def test_merge_builds_the_unit_and_fleet_rollups():
+    aggregator = TelemetryAggregator()
+    aggregator.handle_datagram(encode_frame('roof-1', 7, 1, [
+        [1.0, 'engagement_start', {}],
+        [4.0, 'engagement_end', {'duration': 3.0}],
+        [5.0, 'health', {'pipeline': {'fps': 28.0}, 'scheduler': {'hits': 4}}],
+        [6.0, 'health', {'pipeline': {'fps': 30.0}, 'scheduler': {'hits': 5}}],
+    ]))
+    aggregator.handle_datagram(encode_frame('roof-2', 3, 1, [[2.0, 'health', {'pipeline': {'fps': 20.0}}]]))
+
+    rollup = aggregator.rollup()
+    unit = rollup['units']['roof-1']
+    assert unit['events'] == {'engagement_start': 1, 'engagement_end': 1, 'health': 2}
+    assert (unit['engagements'], unit['engaged_seconds'], unit['hits'], unit['mean_fps']) == (1, 3.0, 5, 29.0)
+    assert rollup['fleet']['units_reporting'] == 2
+    assert rollup['fleet']['mean_fps'] == pytest.approx(24.5)
+    assert aggregator.rollup()['units'] == {} # A new interval
+
+
+@pytest.mark.parametrize('message', [
+    [1, 2, 3], # Not an object
+    {'unit': 'roof-1', 'events': {'kind': 'health'}},
+    {'unit': 'roof-1', 'events': [[1.0, 'health']]}, # Two fields
+    {'unit': 'roof-1', 'events': [[1.0, 'health', None]]},
+    {'unit': 'roof-1', 'events': [[1.0, 7, {}]]},
+])
+def test_wrongly_shaped_frames_are_counted_not_merged(message):
+    aggregator = TelemetryAggregator()
+    assert aggregator.handle_datagram(raw_frame(message)) is None
+    rollup = aggregator.rollup()
+    assert rollup['fleet']['malformed'] == 1
+    assert rollup['units'] == {}
+
+
+def test_fields_of_the_wrong_type_are_ignored():
+    aggregator = TelemetryAggregator()
+    assert aggregator.handle_datagram(raw_frame({'unit': 'roof-1', 'events': [
+        [1.0, 'engagement_end', {'duration': '3.0'}],
+        [2.0, 'health', {'pipeline': [], 'scheduler': {'hits': 'many'}}],
+    ]}))
+    unit = aggregator.rollup()['units']['roof-1']
+    assert (unit['engaged_seconds'], unit['hits'], unit['mean_fps']) == (0.0, 0, None)
+    assert unit['events'] == {'engagement_end': 1, 'health': 1}
@@ -0,0 +1,161 @@
+# tests/test_thermal_controller.py
+#
+# Runs without a Pi: a fake sysfs/procfs tree stands in for the thermal zone and /proc/stat.
+#   $ python -m pytest tests/test_thermal_controller.py
+
+from src.config import ThermalConfig
+from src.thermal_controller import ThermalController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSystem:
+    """Writes the files the controller polls; CPU load is accumulated into /proc/stat counters."""
+
+    def __init__(self, tmp_path):
+        self.temperature_path = tmp_path / 'temp'
+        self.stat_path = tmp_path / 'stat'
+        self.busy = 0
+        self.idle = 0
+        self.set_temperature(50.0)
+        self.add_load(0.5)
+
+    def set_temperature(self, celsius):
+        self.temperature_path.write_text(f"{int(celsius * 1000)}\n")
+
+    def add_load(self, load, ticks=1000):
+        self.busy += int(load * ticks)
+        self.idle += ticks - int(load * ticks)
+        self.stat_path.write_text(f"cpu  {self.busy} 0 0 {self.idle} 0 0 0 0 0 0\ncpu0 0 0 0 0 0 0 0 0 0 0\n")
+
+
+def make_controller(system, dwell=30.0):
+    config = ThermalConfig(
+        enabled=True,
+        temperature_path=str(system.temperature_path),
+        stat_path=str(system.stat_path),
+        poll_interval_seconds=5.0,
+        step_up_celsius=75.0,
+        hysteresis_celsius=8.0,
+        high_load=0.95,
+        low_load=0.8,
+        min_dwell_seconds=dwell,
+        reduced_inference_fps=10,
+        convert_threads=1,
+    )
+    clock = FakeClock()
+    controller = ThermalController(config, clock=clock)
+    applied = []
+    for name in ('inference_rate', 'convert_threads', 'preview'):
+        controller.add_step(name, lambda name=name: applied.append(name), lambda name=name: applied.remove(name))
+    return controller, clock, applied
+
+
+def test_reads_fake_tree(tmp_path):
+    system = FakeSystem(tmp_path)
+    controller, _, _ = make_controller(system)
+    assert controller.read_temperature() == 50.0
+    assert controller.read_cpu_load() is None # Needs two samples
+    system.add_load(0.25)
+    assert abs(controller.read_cpu_load() - 0.25) < 1e-9
+
+
+def test_steps_down_in_order_with_dwell(tmp_path):
+    system = FakeSystem(tmp_path)
+    controller, clock, applied = make_controller(system)
+    system.set_temperature(80.0)
+
+    controller.poll()
+    assert applied == ['inference_rate']
+    clock.now += 10
+    controller.poll() # Still within the dwell time
+    assert applied == ['inference_rate']
+    clock.now += 30
+    controller.poll()
+    clock.now += 30
+    controller.poll()
+    clock.now += 30
+    controller.poll() # No step left
+    assert applied == ['inference_rate', 'convert_threads', 'preview']
+    assert controller.level == 3
+
+
+def test_steps_up_only_below_hysteresis(tmp_path):
+    system = FakeSystem(tmp_path)
+    controller, clock, applied = make_controller(system, dwell=0.0)
+    transitions = []
+    controller.on_transition = transitions.append
+    system.set_temperature(76.0)
+    controller.poll()
+    controller.poll()
+    assert applied == ['inference_rate', 'convert_threads']
+
+    system.set_temperature(70.0) # Below the step-up point, inside the hysteresis band
+    controller.poll()
+    assert applied == ['inference_rate', 'convert_threads']
+
+    system.set_temperature(60.0)
+    controller.poll()
+    assert applied == ['inference_rate']
+    controller.poll()
+    assert applied == []
+    assert [t['direction'] for t in transitions] == ['down', 'down', 'up', 'up']
+
+
+def test_cpu_saturation_degrades_and_blocks_recovery(tmp_path):
+    system = FakeSystem(tmp_path)
+    controller, clock, applied = make_controller(system, dwell=0.0)
+    controller.poll() # First load sample
+    system.add_load(0.99)
+    controller.poll()
+    assert applied == ['inference_rate']
+
+    system.add_load(0.9) # Cool, but the CPU is still above low_load
+    controller.poll()
+    assert applied == ['inference_rate']
+    system.add_load(0.5)
+    controller.poll()
+    assert applied == []
+
+
+def test_failed_step_is_not_counted(tmp_path):
+    system = FakeSystem(tmp_path)
+    controller, _, _ = make_controller(system, dwell=0.0)
+    controller.steps.insert(0, ('broken', lambda: 1 / 0, lambda: None))
+    system.set_temperature(90.0)
+    controller.poll()
+    assert controller.level == 0
+    assert controller.stats()['transitions'] == 0
+
+
+def test_unreadable_temperature_holds_the_level(tmp_path):
+    system = FakeSystem(tmp_path)
+    controller, clock, applied = make_controller(system, dwell=0.0)
+    system.set_temperature(80.0)
+    controller.poll()
+    assert applied == ['inference_rate']
+
+    system.temperature_path.write_text("garbage\n") # Neither pressure nor relief
+    controller.poll()
+    controller.poll()
+    assert applied == ['inference_rate']
+    system.temperature_path.unlink()
+    controller.poll()
+    assert applied == ['inference_rate']
+    assert controller.stats()['temperature_c'] is None
+
+
+def test_short_or_empty_stat_line(tmp_path):
+    system = FakeSystem(tmp_path)
+    controller, _, _ = make_controller(system)
+    for line in ("", "\n", "cpu  10 20\n", "cpu\n"):
+        system.stat_path.write_text(line)
+        assert controller.read_cpu_load() is None
+    controller.poll() # Still polls with no load sample
+    assert controller.load is None
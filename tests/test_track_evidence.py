@@ -0,0 +1,70 @@
+# tests/test_track_evidence.py
+#
+# Pure numpy, runs anywhere:
+#   $ python -m pytest tests/test_track_evidence.py
+
+from src.config import EvidenceConfig
+from src.track_evidence import TrackEvidence
+
+
+def make_evidence(max_tracks=64):
+    return TrackEvidence(EvidenceConfig(
+        enabled=True,
+        window_frames=8,
+        min_frames=3,
+        engage_threshold=0.6,
+        release_threshold=0.4,
+        max_tracks=max_tracks,
+    ))
+
+
+def test_single_frame_does_not_engage():
+    evidence = make_evidence()
+    assert evidence.update({1: 0.95}) == []
+    assert evidence.update({}) == []
+    assert evidence.update({}) == []
+    assert not evidence.holding()
+
+
+def test_sustained_track_engages_and_rides_over_missed_frames():
+    evidence = make_evidence()
+    assert evidence.update({1: 0.8}) == []
+    assert evidence.update({1: 0.8}) == []
+    assert evidence.update({1: 0.8}) == [1]
+    for _ in range(5):
+        evidence.update({1: 0.8})
+
+    assert evidence.update({}) == [] # Not detected, but still engaged
+    assert evidence.holding()
+    assert evidence.update({1: 0.8}) == [1]
+
+    for _ in range(4):
+        evidence.update({})
+    assert not evidence.holding() # Mean of 4 misses and 4 detections at 0.8 is below 0.4
+
+
+def test_low_confidence_flicker_does_not_engage():
+    evidence = make_evidence()
+    for frame in range(16):
+        engaged = evidence.update({1: 0.8} if frame % 3 == 0 else {})
+        assert engaged == []
+
+
+def test_memory_is_bounded_by_max_tracks():
+    evidence = make_evidence(max_tracks=4)
+    nbytes = evidence.scores.nbytes
+    for track_id in range(1000):
+        evidence.update({track_id: 0.9, track_id + 1: 0.9, track_id + 2: 0.9, track_id + 3: 0.9, track_id + 4: 0.9})
+    assert len(evidence.rows) == 4
+    assert evidence.scores.nbytes == nbytes
+    assert evidence.evicted > 0
+
+
+def test_dead_tracks_are_freed():
+    evidence = make_evidence()
+    for _ in range(4):
+        evidence.update({1: 0.9, 2: 0.9})
+    for _ in range(8):
+        evidence.update({2: 0.9})
+    assert 1 not in evidence.rows
+    assert evidence.stats()['tracks'] == 1
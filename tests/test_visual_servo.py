@@ -0,0 +1,120 @@
+# tests/test_visual_servo.py
+#
+# Spot detection and the PID on synthetic frames, no camera or laser:
+#   $ python -m pytest tests/test_visual_servo.py
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from benchmarks.fakes import install_import_stubs
+
+install_import_stubs()
+
+from src.config import VisualServoConfig, FovConfig
+from src.visual_servo import LaserSpotDetector, PIDController, VisualServo
+
+WIDTH, HEIGHT = 320, 240
+
+
+def frame_with_spot(x, y, radius=3, width=WIDTH):
+    """Dull green background with a red laser spot centered on pixel (x, y)."""
+    frame = np.zeros((HEIGHT, width, 3), dtype=np.uint8)
+    frame[..., 1] = 80
+    ys, xs = np.ogrid[:HEIGHT, :width]
+    frame[(xs - x) ** 2 + (ys - y) ** 2 <= radius ** 2] = (255, 40, 40)
+    return frame
+
+
+class FakeBuffer:
+    """Stands in for a mapped RGB Gst.Buffer."""
+
+    def __init__(self, frame):
+        self.data = frame.tobytes()
+
+    def map(self, flags):
+        return True, SimpleNamespace(data=self.data)
+
+    def unmap(self, map_info):
+        pass
+
+
+def detect(detector, frame, expected):
+    bounds = detector.roi_bounds(WIDTH, HEIGHT, expected)
+    step = detector.downsample
+    roi = frame[bounds[1]:bounds[3]:step, bounds[0]:bounds[2]:step]
+    return detector.detect(roi, bounds, WIDTH, HEIGHT)
+
+
+def test_detector_finds_the_spot_in_the_region_of_interest():
+    detector = LaserSpotDetector(downsample=2, roi_size=0.2, min_brightness=60)
+    frame = frame_with_spot(200, 100)
+    spot = detect(detector, frame, (0.6, 0.45))
+    assert spot == pytest.approx((200 / WIDTH, 100 / HEIGHT), abs=1.5 / WIDTH)
+
+    # Outside the region of interest, or not red enough: no spot
+    assert detect(detector, frame, (0.1, 0.9)) is None
+    frame[...] = 255
+    assert detect(detector, frame, (0.6, 0.45)) is None
+
+
+def test_roi_stays_inside_the_frame():
+    detector = LaserSpotDetector(roi_size=0.2)
+    assert detector.roi_bounds(WIDTH, HEIGHT, (0.0, 1.0)) == (0, HEIGHT - 48, 64, HEIGHT)
+
+
+def test_pid_output_limit_and_anti_windup():
+    pid = PIDController(kp=1.0, ki=1.0, kd=0.0, output_limit=2.0)
+    for _ in range(100):
+        pid.update(10.0, 0.1)
+    assert pid.output == 2.0
+    assert pid.integral == 2.0 # Clamped, so the output recovers as soon as the error changes sign
+    assert pid.update(-1.0, 0.1) == pytest.approx(-1.0 + 1.9)
+    assert pid.update(5.0, 0.0) == pid.output # No time elapsed: unchanged
+
+
+def test_pid_derivative():
+    pid = PIDController(kp=0.0, ki=0.0, kd=0.5, output_limit=10.0)
+    assert pid.update(1.0, 0.1) == 0.0 # No previous error yet
+    assert pid.update(2.0, 0.1) == pytest.approx(5.0)
+
+
+def test_correction_drives_the_spot_onto_the_target():
+    servo = VisualServo(VisualServoConfig(
+        enabled=True, downsample=2, roi_size=0.3, min_brightness=60, kp=1.0, ki=0.0, kd=0.0,
+        max_correction_degrees=5.0, tolerance=0.02, budget_ms=50.0,
+    ), FovConfig(horizontal=60.0, vertical=45.0))
+    target = (0.6, 0.5)
+
+    # Spot left of and above the target: pan mirrored (negative), tilt positive
+    buffer = FakeBuffer(frame_with_spot(176, 108))
+    servo.update(buffer, WIDTH, HEIGHT, target, track_id=1)
+    pan, tilt = servo.update(buffer, WIDTH, HEIGHT, target, track_id=1)
+    assert pan == pytest.approx(-(0.6 - 176 / WIDTH) * 60.0, abs=0.3)
+    assert tilt == pytest.approx((0.5 - 108 / HEIGHT) * 45.0, abs=0.3)
+    assert not servo.converged
+
+    servo.update(FakeBuffer(frame_with_spot(192, 120)), WIDTH, HEIGHT, target, track_id=1)
+    assert servo.converged
+    stats = servo.stats()
+    assert (stats['frames'], stats['spot_rate'], stats['converged']) == (3, 1.0, 1)
+    assert stats['last_convergence_s'] is not None
+
+    # A new target restarts the loop: corrections reset, convergence timed again
+    assert servo.update(FakeBuffer(frame_with_spot(192, 120)), WIDTH, HEIGHT, target, track_id=2) == (0.0, 0.0)
+    assert servo.stats()['converged'] == 2
+
+
+def test_padded_rows_are_read_with_their_stride():
+    servo = VisualServo(VisualServoConfig(
+        enabled=True, downsample=1, roi_size=0.3, min_brightness=100, kp=1.0, ki=0.0, kd=0.0,
+        max_correction_degrees=5.0, tolerance=0.02, budget_ms=50.0,
+    ), FovConfig(horizontal=60.0, vertical=45.0))
+    width = 322 # 966 bytes per row, padded to 968 like GStreamer does for RGB
+    padded = np.zeros((HEIGHT, 968), dtype=np.uint8)
+    padded[:, :width * 3] = frame_with_spot(250, 200, width=width).reshape(HEIGHT, -1)
+
+    # Target off the spot, so a skewed read cannot pass for a detection at the center of the region
+    servo.update(FakeBuffer(padded), width, HEIGHT, (0.7, 0.8), track_id=1, stride=968)
+    assert servo.last_spot == pytest.approx((250 / width, 200 / HEIGHT), abs=1.5 / width)